@@ -1,21 +1,59 @@
-from .central_cognitive_agent import CentralCognitiveAgent
-from .sensory_agent import SensoryAgent
-from .planning_agent import PlanningAgent
-from .manipulation_agent import ManipulationAgent
-from .motor_control_agent import MotorControlAgent
-from .energy_management_agent import EnergyManagementAgent
-from .learning_agent import LearningAgent
-from .communication_agent import CommunicationAgent
+import importlib
+
+# Public API of the `agents` package, mapped to the submodule defining each name.
+# Submodules are imported lazily on first attribute access, so a process that only needs
+# motor control or planning does not pay for transformers, gTTS or scikit-learn at startup.
+_LAZY_ATTRIBUTES = {
+    "CentralCognitiveAgent": ".central_cognitive_agent",
+    "SensoryAgent": ".sensory_agent",
+    "PlanningAgent": ".planning_agent",
+    "ManipulationAgent": ".manipulation_agent",
+    "MotorControlAgent": ".motor_control_agent",
+    "EnergyManagementAgent": ".energy_management_agent",
+    "LearningAgent": ".learning_agent",
+    "CommunicationAgent": ".communication_agent",
+    "GraspPlanCache": ".grasp_cache",
+    "WorkflowBlackboard": ".blackboard",
+    "CommandParser": ".command_parser",
+    "FleetCoordinator": ".fleet_coordinator",
+    "AgentProcessProxy": ".agent_process",
+    "AgentHealthMonitor": ".health_monitor",
+    "AdmissionController": ".admission_control",
+    "WorkflowJournal": ".workflow_journal",
+    "BatchInferenceServer": ".inference_server",
+    "SpeechAudioCache": ".tts_cache",
+    "IntentMatcher": ".intent_matcher",
+    "SpeechOutputQueue": ".speech_output",
+    "ReplayBuffer": ".replay_buffer",
+    "TrainingWorker": ".training_worker",
+    "RewardEvaluator": ".reward_evaluation",
+    "BanditSampler": ".reward_evaluation",
+    "ModelCheckpointStore": ".model_checkpoint",
+}
 
 # Define the public API of the `agents` package
-__all__ = [
-    "CentralCognitiveAgent",
-    "SensoryAgent",
-    "PlanningAgent",
-    "ManipulationAgent",
-    "MotorControlAgent",
-    "EnergyManagementAgent",
-    "LearningAgent",
-    "CommunicationAgent",
-]
+__all__ = list(_LAZY_ATTRIBUTES) + ["preload"]
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+def preload(*names):
+    """
+    Import lazily loaded agents up front (e.g., at production startup) so the first request doesn't pay for it.
+    Args:
+        *names (str): Public names to load; all of them if omitted.
 
+    Returns:
+        list: Loaded objects, in the requested order.
+    """
+    return [__getattr__(name) for name in (names or _LAZY_ATTRIBUTES)]
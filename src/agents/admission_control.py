@@ -0,0 +1,152 @@
+import threading
+from collections import OrderedDict
+
+from utils.clock import RealClock
+from utils.latency_histogram import LatencyHistogram
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: allows `rate` events per second on average with bursts of up to `burst` events.
+    """
+
+    def __init__(self, rate, burst, clock):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock.now()
+
+    def try_acquire(self):
+        """
+        Take one token if available.
+        Returns:
+            bool: True if the event is allowed, False if it exceeds the rate limit.
+        """
+        now = self.clock.now()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class AdmissionController:
+    """
+    Admission Controller: Bounded ingress queue for operator commands that keeps end-to-end latency predictable
+    under bursty input. When full, new commands are rejected, the oldest command of the lowest non-empty class
+    at or below the new command's priority is dropped to make room (stale commands are shed, but never for a
+    command of lower priority), or (with coalescing) duplicates of already queued commands are merged. Each
+    priority class can have its own rate limit, and queue depth and wait time are tracked as metrics.
+    """
+
+    POLICIES = ("reject", "drop_oldest", "coalesce")
+
+    def __init__(self, max_queue=100, policy="reject", priority_classes=("critical", "normal", "background"),
+                 rate_limits=None, clock=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown admission policy: {policy}")
+        self.max_queue = max_queue  # Maximum number of queued commands across all classes
+        self.policy = policy
+        self.priority_classes = tuple(priority_classes)  # Highest priority first
+        self.clock = clock or RealClock()
+        # Priority class -> TokenBucket, from {class: (commands per second, burst size)}
+        self.rate_limiters = {
+            priority_class: TokenBucket(rate, burst, self.clock)
+            for priority_class, (rate, burst) in (rate_limits or {}).items()
+        }
+        self.queues = {priority_class: OrderedDict() for priority_class in self.priority_classes}
+        self.depth = 0
+        self.max_depth = 0
+        self.counters = {"admitted": 0, "rejected": 0, "dropped": 0, "coalesced": 0, "rate_limited": 0}
+        self.wait_times = LatencyHistogram(clock=self.clock)
+        self.sequence = 0
+        self._lock = threading.Lock()
+
+    def offer(self, command, priority_class="normal"):
+        """
+        Try to admit a command into the ingress queue.
+        Args:
+            command (str): User command.
+            priority_class (str): Priority class of the command.
+
+        Returns:
+            str: "admitted", "coalesced", "rejected" or "rate_limited".
+        """
+        queue = self.queues[priority_class]
+        key = " ".join(command.lower().split())
+        with self._lock:
+            if self.policy == "coalesce" and key in queue:
+                self.counters["coalesced"] += 1
+                return "coalesced"
+            victim = None
+            if self.depth >= self.max_queue:
+                victim = self._drop_candidate(priority_class) if self.policy == "drop_oldest" else None
+                if victim is None:
+                    self.counters["rejected"] += 1
+                    return "rejected"
+            # Only commands that would be admitted spend a rate limit token
+            limiter = self.rate_limiters.get(priority_class)
+            if limiter is not None and not limiter.try_acquire():
+                self.counters["rate_limited"] += 1
+                return "rate_limited"
+            if victim is not None:
+                self.queues[victim].popitem(last=False)
+                self.depth -= 1
+                self.counters["dropped"] += 1
+            if key in queue:
+                key = (key, self.sequence)  # Keep duplicates as separate entries unless coalescing
+            self.sequence += 1
+            queue[key] = (command, self.clock.now())
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            self.counters["admitted"] += 1
+            return "admitted"
+
+    def _drop_candidate(self, priority_class):
+        # Lowest priority class at or below the incoming command's class that has queued commands, so a
+        # command never displaces one of higher priority
+        candidate_classes = self.priority_classes[self.priority_classes.index(priority_class):]
+        for candidate_class in reversed(candidate_classes):
+            if self.queues[candidate_class]:
+                return candidate_class
+        return None
+
+    def take(self):
+        """
+        Remove the next command, highest priority class first and oldest first within a class.
+        Returns:
+            tuple: (command, priority class), or None if the queue is empty.
+        """
+        with self._lock:
+            for priority_class in self.priority_classes:
+                queue = self.queues[priority_class]
+                if queue:
+                    _, (command, enqueued_at) = queue.popitem(last=False)
+                    self.depth -= 1
+                    break
+            else:
+                return None
+        self.wait_times.record(self.clock.now() - enqueued_at)
+        return command, priority_class
+
+    def metrics(self):
+        """
+        Report queue depth, admission outcomes and wait-time percentiles.
+        Returns:
+            dict: Admission metrics; wait times are in seconds.
+        """
+        percentiles = self.wait_times.percentiles((50, 95, 99))
+        with self._lock:
+            return {
+                "depth": self.depth,
+                "max_depth": self.max_depth,
+                **self.counters,
+                "wait_p50": percentiles[50],
+                "wait_p95": percentiles[95],
+                "wait_p99": percentiles[99],
+            }
+
+    def __len__(self):
+        return self.depth
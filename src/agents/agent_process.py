@@ -0,0 +1,193 @@
+import io
+import multiprocessing
+import pickle
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class MessagePickler(pickle.Pickler):
+    """Pickler that moves large NumPy arrays into shared memory and only sends a reference to them."""
+
+    def __init__(self, file, shared_memory_threshold):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared_memory_threshold = shared_memory_threshold
+        self.blocks = []  # Shared memory blocks created for the message being pickled
+
+    def persistent_id(self, obj):
+        if type(obj) is np.ndarray and obj.nbytes >= self.shared_memory_threshold and not obj.dtype.hasobject:
+            block = shared_memory.SharedMemory(create=True, size=obj.nbytes)
+            self.blocks.append(block)
+            np.ndarray(obj.shape, dtype=obj.dtype, buffer=block.buf)[...] = obj
+            return ("ndarray", block.name, obj.shape, obj.dtype.str)
+        return None
+
+    def dump(self, obj):
+        try:
+            super().dump(obj)
+        except BaseException:
+            # The message will never be sent, so nobody else would unlink its blocks
+            for block in self.blocks:
+                block.close()
+                block.unlink()
+            raise
+        finally:
+            for block in self.blocks:
+                block.close()  # The receiver copies the data out and unlinks the block
+            self.blocks = []
+
+
+class MessageUnpickler(pickle.Unpickler):
+    """Unpickler that restores arrays sent through shared memory."""
+
+    def persistent_load(self, pid):
+        kind, name, shape, dtype = pid
+        if kind != "ndarray":
+            raise pickle.UnpicklingError(f"Unknown persistent reference: {kind}")
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf).copy()
+        finally:
+            block.close()
+            block.unlink()
+
+
+def encode_message(message, shared_memory_threshold=64 * 1024):
+    """
+    Encode a message in the compact binary IPC format.
+    Args:
+        message (object): Picklable message.
+        shared_memory_threshold (int): Arrays of at least this many bytes are passed through shared memory.
+
+    Returns:
+        bytes: Encoded message.
+    """
+    buffer = io.BytesIO()
+    MessagePickler(buffer, shared_memory_threshold).dump(message)
+    return buffer.getvalue()
+
+
+def decode_message(data):
+    """
+    Decode a message produced by encode_message.
+    Args:
+        data (bytes): Encoded message.
+
+    Returns:
+        object: Decoded message.
+    """
+    return MessageUnpickler(io.BytesIO(data)).load()
+
+
+def run_agent_worker(agent_factory, connection, shared_memory_threshold):
+    """
+    Worker process loop: builds the agent and serves method calls until told to stop.
+    Args:
+        agent_factory (function): Picklable callable returning the agent instance (e.g., the agent class).
+        connection (multiprocessing.connection.Connection): Pipe end used for requests and replies.
+        shared_memory_threshold (int): Array size (bytes) above which replies use shared memory.
+
+    Returns:
+        None
+    """
+    agent = agent_factory()
+    connection.send_bytes(encode_message(("ready", getattr(agent, "name", None))))
+    while True:
+        try:
+            method, args, kwargs = decode_message(connection.recv_bytes())
+        except EOFError:
+            break
+        if method is None:
+            break
+        try:
+            if method == "__getattr__":
+                reply = ("ok", getattr(agent, args[0]))
+            else:
+                reply = ("ok", getattr(agent, method)(*args, **kwargs))
+        except Exception as e:
+            reply = ("error", e)
+        try:
+            connection.send_bytes(encode_message(reply, shared_memory_threshold))
+        except Exception as e:  # e.g., an unpicklable result
+            connection.send_bytes(encode_message(("error", RuntimeError(f"Cannot send result of '{method}': {e}"))))
+    connection.close()
+
+
+class AgentProcessProxy:
+    """
+    Agent Process Proxy: Runs an agent in its own worker process and exposes the same perform_task interface,
+    so slow agents (e.g., ML inference) no longer share the interpreter and GIL with latency-sensitive agents.
+    Messages use a compact binary format and large NumPy arrays are passed through shared memory.
+    """
+
+    def __init__(self, agent_factory, shared_memory_threshold=64 * 1024):
+        self.shared_memory_threshold = shared_memory_threshold
+        self._connection, worker_connection = multiprocessing.Pipe()
+        self._lock = threading.Lock()
+        self.process = multiprocessing.Process(
+            target=run_agent_worker,
+            args=(agent_factory, worker_connection, shared_memory_threshold),
+            daemon=True,
+        )
+        self.process.start()
+        worker_connection.close()
+        _, self.name = decode_message(self._connection.recv_bytes())
+
+    def call(self, method, *args, **kwargs):
+        """
+        Call a method of the remote agent.
+        Args:
+            method (str): Method name.
+            *args: Positional arguments.
+            **kwargs: Keyword arguments.
+
+        Returns:
+            object: Return value of the method; exceptions raised remotely are re-raised here.
+        """
+        request = encode_message((method, args, kwargs), self.shared_memory_threshold)
+        with self._lock:
+            self._connection.send_bytes(request)
+            status, value = decode_message(self._connection.recv_bytes())
+        if status == "error":
+            raise value
+        return value
+
+    def perform_task(self, details):
+        """
+        Perform a task on the remote agent.
+        Args:
+            details (object): Task details passed to the agent's perform_task.
+
+        Returns:
+            object: Result of the agent's perform_task.
+        """
+        return self.call("perform_task", details)
+
+    def get_attribute(self, attribute):
+        """
+        Read an attribute of the remote agent.
+        Args:
+            attribute (str): Attribute name.
+
+        Returns:
+            object: Attribute value.
+        """
+        return self.call("__getattr__", attribute)
+
+    def close(self, timeout=5.0):
+        """
+        Stop the worker process.
+        Args:
+            timeout (float): Time to wait for the worker to exit before terminating it.
+
+        Returns:
+            None
+        """
+        if self.process.is_alive():
+            with self._lock:
+                self._connection.send_bytes(encode_message((None, (), {})))
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        self._connection.close()
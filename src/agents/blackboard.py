@@ -0,0 +1,65 @@
+import threading
+
+
+class WorkflowBlackboard:
+    """
+    Workflow Blackboard: Per-workflow dataflow store where each task publishes its output and
+    downstream tasks read the outputs they declare as inputs. Values are stored and handed out by
+    reference (never copied), so large payloads such as NumPy point clouds are shared between stages.
+    """
+
+    def __init__(self):
+        self.outputs = {}  # Task id -> output of the task
+        self._lock = threading.Lock()
+
+    def publish(self, task_id, value):
+        """
+        Publish the output of a task.
+        Args:
+            task_id (str): Id of the task that produced the value.
+            value (object): Task output (stored by reference).
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.outputs[task_id] = value
+
+    def get(self, task_id):
+        """
+        Get the output of an upstream task.
+        Args:
+            task_id (str): Id of the upstream task.
+
+        Returns:
+            object: Published output of the task.
+        """
+        with self._lock:
+            if task_id not in self.outputs:
+                raise KeyError(f"No output published for task '{task_id}'")
+            return self.outputs[task_id]
+
+    def resolve_inputs(self, inputs):
+        """
+        Resolve a task's declared inputs against published outputs.
+        Args:
+            inputs (dict): Input name -> reference {"from": task_id, "type": expected type, "field": optional key
+                to select from a dict output}.
+
+        Returns:
+            dict: Input name -> resolved value.
+        """
+        resolved = {}
+        for name, reference in inputs.items():
+            value = self.get(reference["from"])
+            if "field" in reference:
+                value = value[reference["field"]]
+            expected_type = reference.get("type")
+            if expected_type is not None and not isinstance(value, expected_type):
+                raise TypeError(f"Input '{name}' from task '{reference['from']}' should be {expected_type}, "
+                                f"got {type(value).__name__}")
+            resolved[name] = value
+        return resolved
+
+    def __contains__(self, task_id):
+        return task_id in self.outputs
@@ -1,5 +1,16 @@
+import heapq
+import itertools
 import random
-from queue import PriorityQueue
+import threading
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from utils.clock import RealClock
+from utils.indexed_priority_queue import IndexedPriorityQueue
+from .admission_control import AdmissionController
+from .agent_process import AgentProcessProxy
+from .blackboard import WorkflowBlackboard
+from .command_parser import CommandParser
+from .health_monitor import AgentHealthMonitor
 
 
 class CentralCognitiveAgent:
@@ -8,10 +19,23 @@ class CentralCognitiveAgent:
     task parsing, delegation, prioritization, and real-time coordination among agents.
     """
 
-    def __init__(self, name="Central Cognitive Agent"):
+    def __init__(self, name="Central Cognitive Agent", clock=None, max_workers=4, journal=None):
         self.name = name
-        self.task_queue = PriorityQueue()  # Priority queue for dynamic task prioritization
+        self.clock = clock or RealClock()  # Share a VirtualClock with other agents to run simulations in virtual time
+        self.task_queue = IndexedPriorityQueue()  # Priority queue keyed by task id for dynamic task prioritization
         self.agent_registry = {}  # Registry to store and manage available agents
+        self.max_workers = max_workers  # Maximum number of tasks dispatched concurrently
+        self.task_ids = itertools.count(1)  # Source of unique task ids
+        self.blackboard = WorkflowBlackboard()  # Outputs of the current (or last) workflow's tasks
+        self.command_parser = CommandParser()  # Extracts intent, object and coordinates from commands
+        self.health_monitor = AgentHealthMonitor(clock=self.clock)  # Heartbeats and task latency per agent
+        self.admission = AdmissionController(clock=self.clock)  # Bounded ingress queue for incoming commands
+        self.workflow_lock = threading.Lock()  # Workflows run one at a time
+        self.journal = journal  # Optional WorkflowJournal used to checkpoint and resume workflows
+        if journal is not None:
+            # Continue numbering after recovered tasks so new ids don't collide with them
+            recovered = [int(task_id.rsplit("-", 1)[1]) for task_id in journal.tasks if task_id.rsplit("-", 1)[-1].isdigit()]
+            self.task_ids = itertools.count(max(recovered, default=0) + 1)
 
     def log(self, message):
         """Log messages with the agent's name."""
@@ -28,8 +52,23 @@ class CentralCognitiveAgent:
             None
         """
         self.agent_registry[agent_type] = agent_instance
+        self.health_monitor.register(agent_type)
         self.log(f"Agent '{agent_type}' registered successfully.")
 
+    def register_isolated_agent(self, agent_type, agent_factory):
+        """
+        Register an agent that runs in its own worker process behind a proxy with the same perform_task interface.
+        Args:
+            agent_type (str): Type of the agent (e.g., "communication", "learning").
+            agent_factory (function): Picklable callable building the agent in the worker (e.g., the agent class).
+
+        Returns:
+            AgentProcessProxy: Proxy for the isolated agent.
+        """
+        proxy = AgentProcessProxy(agent_factory)
+        self.register_agent(agent_type, proxy)
+        return proxy
+
     def parse_command(self, command):
         """
         Parse the high-level user command into subtasks and assign priorities.
@@ -37,38 +76,143 @@ class CentralCognitiveAgent:
             command (str): User command.
 
         Returns:
-            None
+            list: Ids of the queued subtasks.
         """
         self.log(f"Parsing command: '{command}'")
-        # Simulate parsing logic using keywords and natural language patterns
-        if "fetch" in command:
-            object_name = "target_object"  # Extracted from NLP parsing
-            destination = [1, 2, 0]  # Simulated position (x, y, z)
-            self.task_queue.put((1, {"type": "sensory", "details": {"task_type": "object_recognition", "object_name": object_name}}))
-            self.task_queue.put((2, {"type": "planning", "details": {"task_type": "path_planning", "start": [0, 0, 0], "goal": destination}}))
-            self.task_queue.put((3, {"type": "manipulation", "details": {"task_type": "grasping", "object_name": object_name}}))
-            self.task_queue.put((4, {"type": "motor_control", "details": {"task_type": "movement", "destination": destination}}))
+        return self.plan_subtasks(self.command_parser.parse(command))
+
+    def parse_commands(self, commands):
+        """
+        Parse a batch of user commands (e.g., a replayed command script) and queue their subtasks.
+        Args:
+            commands (list): User commands.
+
+        Returns:
+            list: Ids of the queued subtasks, one list per command.
+        """
+        self.log(f"Parsing {len(commands)} commands...")
+        return [self.plan_subtasks(parsed) for parsed in self.command_parser.parse_commands(commands)]
+
+    def plan_subtasks(self, parsed):
+        """
+        Decompose a parsed command into prioritized subtasks and queue them.
+        Args:
+            parsed (dict): Parsed command from the command parser.
+
+        Returns:
+            list: Ids of the queued subtasks.
+        """
+        destination = parsed["destination"]
+        if parsed["intent"] == "fetch":
+            object_name = parsed["object"] or "target_object"
+            destination = destination or [0, 0, 0]  # Without a location, bring the object back to the start
+            # Path planning does not depend on recognition, so both can run concurrently
+            recognize_id, path_id, grasp_id, move_id = (self.next_task_id(name) for name in ("recognize", "plan_path", "grasp", "move"))
+            self.enqueue_task(1, {"id": recognize_id, "depends_on": [], "type": "sensory", "details": {"task_type": "object_recognition", "object_name": object_name}})
+            self.enqueue_task(2, {"id": path_id, "depends_on": [], "type": "planning", "details": {"task_type": "path_planning", "start": [0, 0, 0], "goal": destination}})
+            self.enqueue_task(3, {"id": grasp_id, "depends_on": [recognize_id], "type": "manipulation", "details": {"task_type": "grasping", "object_name": object_name},
+                                 "inputs": {"object_metadata": {"from": recognize_id, "type": dict}}})
+            self.enqueue_task(4, {"id": move_id, "depends_on": [path_id, grasp_id], "type": "motor_control", "details": {"task_type": "movement", "destination": destination},
+                                 "inputs": {"path": {"from": path_id, "type": list}}})
+            return [recognize_id, path_id, grasp_id, move_id]
+        elif parsed["intent"] == "move" and destination is not None:
+            return [self.enqueue_task(1, {"depends_on": [], "type": "motor_control", "details": {"task_type": "movement", "destination": destination}})]
         else:
             self.log("Unable to parse command. Please provide a valid instruction.")
+            return []
 
-    def delegate_task(self, task):
+    def enqueue_task(self, priority, task):
         """
-        Delegate a task to the appropriate agent.
+        Add a task to the task queue, assigning it an id if it has none.
         Args:
+            priority (int): Task priority (lower runs first).
             task (dict): Task details including type and parameters.
 
+        Returns:
+            str: Id of the queued task.
+        """
+        task.setdefault("id", self.next_task_id(task["type"]))
+        self.task_queue.put((priority, task))
+        self.journal_event("queued", task["id"], priority=priority, task=task)
+        return task["id"]
+
+    def update_task_priority(self, task_id, priority):
+        """
+        Change the priority of a queued task.
+        Args:
+            task_id (str): Id of the queued task.
+            priority (int): New priority (lower runs first).
+
         Returns:
             None
         """
+        self.task_queue.update(task_id, priority)
+        self.journal_event("priority", task_id, priority=priority)
+        self.log(f"Priority of task '{task_id}' set to {priority}.")
+
+    def next_task_id(self, name):
+        """
+        Generate a unique task id.
+        Args:
+            name (str): Readable prefix for the id (e.g., "grasp").
+
+        Returns:
+            str: Unique task id.
+        """
+        return f"{name}-{next(self.task_ids)}"
+
+    def delegate_task(self, task, blackboard=None):
+        """
+        Delegate a task to the appropriate agent.
+        Declared inputs are resolved from upstream outputs on the blackboard and passed to the agent
+        by reference alongside the task details; a successful result is published under the task id.
+        Args:
+            task (dict): Task details including type, parameters and optional "inputs".
+            blackboard (WorkflowBlackboard): Dataflow store of the running workflow.
+
+        Returns:
+            object: Result returned by the agent, or None if no agent is registered.
+        """
         agent_type = task["type"]
         details = task["details"]
 
         if agent_type in self.agent_registry:
             self.log(f"Delegating task to '{agent_type}' agent: {details}")
+            if task.get("inputs"):
+                blackboard = blackboard if blackboard is not None else self.blackboard
+                details = {**details, **blackboard.resolve_inputs(task["inputs"])}
             agent_instance = self.agent_registry[agent_type]
-            agent_instance.perform_task(details)
+            token = self.health_monitor.task_started(agent_type)
+            try:
+                result = agent_instance.perform_task(details)
+            except Exception:
+                self.health_monitor.task_finished(token, success=False)
+                raise
+            succeeded = self.task_succeeded(result)
+            self.health_monitor.task_finished(token, success=succeeded)
+            if succeeded and blackboard is not None and "id" in task:
+                blackboard.publish(task["id"], result)  # Failed results are never passed downstream
+            return result
         else:
             self.log(f"No registered agent for task type '{agent_type}'.")
+            return None
+
+    @staticmethod
+    def task_succeeded(result):
+        """
+        Decide whether an agent's result means its task succeeded.
+        Args:
+            result (object): Result returned by delegate_task.
+
+        Returns:
+            bool: False for falsy results (False, None when no agent ran, an empty path, ...) and results
+                reporting {"success": False}; True otherwise.
+        """
+        if isinstance(result, dict) and result.get("success") is False:
+            return False
+        if hasattr(result, "__len__"):
+            return len(result) > 0  # Also works for arrays, whose truth value is ambiguous
+        return bool(result)
 
     def prioritize_tasks(self):
         """
@@ -77,51 +221,268 @@ class CentralCognitiveAgent:
             None
         """
         self.log("Reassessing task priorities...")
-        updated_queue = PriorityQueue()
-        while not self.task_queue.empty():
-            priority, task = self.task_queue.get()
-            # Example: Increase priority if task involves handling critical objects
+        # Example: Increase priority if task involves handling critical objects
+        raised = []
+
+        def is_critical(task):
             if "critical" in task.get("details", {}).get("object_name", "").lower():
-                priority = 0
-            updated_queue.put((priority, task))
-        self.task_queue = updated_queue
-        self.log("Task priorities updated.")
+                raised.append(task["id"])
+                return True
+            return False
+
+        self.task_queue.reprioritize(is_critical, 0)
+        for task_id in raised:
+            self.journal_event("priority", task_id, priority=0)
+        self.log(f"Task priorities updated ({len(raised)} raised).")
 
     def execute_workflow(self):
         """
-        Execute all tasks in the task queue, prioritizing dynamically as needed.
+        Execute all tasks in the task queue, running independent tasks concurrently.
         Returns:
-            None
+            dict: Final status per task id.
         """
         self.log("Executing workflow...")
+        start_time = self.clock.now()
+        tasks = []
         while not self.task_queue.empty():
-            _, task = self.task_queue.get()
-            self.delegate_task(task)
-        self.log("All tasks completed.")
+            tasks.append(self.task_queue.get())
+        self.blackboard = WorkflowBlackboard()
+        statuses = self.run_task_graph(tasks, self.blackboard)
+        self.log(f"All tasks completed in {self.clock.now() - start_time:.2f}s.")
+        return statuses
 
-    def monitor_agents(self):
+    def run_task_graph(self, tasks, blackboard=None):
         """
-        Monitor the status of registered agents and log their availability.
+        Run tasks as a dependency graph: every task whose dependencies have completed is dispatched
+        concurrently on a thread pool, so the workflow takes roughly as long as its critical path.
+        Ready tasks are dispatched in priority order, and an agent only runs one task at a time.
+        A task fails if its agent raises or returns a failed result (see task_succeeded); tasks depending
+        on a failed task are skipped.
+        Args:
+            tasks (list): (priority, task) pairs; tasks may carry an "id", a "depends_on" list of ids and
+                "inputs" referencing upstream outputs (which imply dependencies).
+            blackboard (WorkflowBlackboard): Dataflow store for task outputs; a new one is created if omitted.
+
+        Returns:
+            dict: Final status ("completed", "failed" or "skipped") per task id.
+        """
+        blackboard = blackboard if blackboard is not None else WorkflowBlackboard()
+        order = itertools.count()
+        graph = {}
+        for priority, task in tasks:
+            task.setdefault("id", self.next_task_id(task["type"]))
+            graph[task["id"]] = (priority, next(order), task)
+
+        # Dependencies outside this workflow are treated as already satisfied
+        waiting_on = {}
+        for task_id, (_, _, task) in graph.items():
+            deps = set(task.get("depends_on", [])) | {ref["from"] for ref in task.get("inputs", {}).values()}
+            waiting_on[task_id] = {dep for dep in deps if dep in graph}
+        # Only outputs consumed by downstream inputs are journaled, since resume only needs those
+        consumed = {ref["from"] for _, _, task in graph.values() for ref in task.get("inputs", {}).values()}
+        dependents = defaultdict(list)
+        for task_id, deps in waiting_on.items():
+            for dep in deps:
+                dependents[dep].append(task_id)
+        ready = [(priority, seq, task_id) for task_id, (priority, seq, _) in graph.items() if not waiting_on[task_id]]
+        heapq.heapify(ready)
+
+        statuses = {}
+        busy_agents = set()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while ready or running:
+                deferred, degraded = [], []
+                while ready and len(running) < self.max_workers:
+                    entry = heapq.heappop(ready)
+                    task = graph[entry[2]][2]
+                    if task["type"] in busy_agents:
+                        deferred.append(entry)
+                        continue
+                    if not self.health_monitor.is_available(task["type"]):
+                        degraded.append(entry)  # Route around degraded agents while other work is ready
+                        continue
+                    busy_agents.add(task["type"])
+                    running[executor.submit(self.delegate_task, task, blackboard)] = task
+                if not running and degraded:
+                    # Only degraded agents have work left, so run it anyway
+                    task = graph[degraded.pop(0)[2]][2]
+                    busy_agents.add(task["type"])
+                    running[executor.submit(self.delegate_task, task, blackboard)] = task
+                for entry in deferred + degraded:
+                    heapq.heappush(ready, entry)
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    busy_agents.discard(task["type"])
+                    if future.exception() is not None:
+                        self.log(f"Task '{task['id']}' failed: {future.exception()}")
+                        statuses[task["id"]] = "failed"
+                        self.journal_event("failed", task["id"])
+                        self.skip_dependents(task["id"], dependents, statuses)
+                        continue
+                    if not self.task_succeeded(future.result()):
+                        self.log(f"Task '{task['id']}' failed: agent returned {future.result()!r}")
+                        statuses[task["id"]] = "failed"
+                        self.journal_event("failed", task["id"])
+                        self.skip_dependents(task["id"], dependents, statuses)
+                        continue
+                    statuses[task["id"]] = "completed"
+                    if task["id"] in consumed:
+                        self.journal_event("completed", task["id"], result=future.result())
+                    else:
+                        self.journal_event("completed", task["id"])
+                    for dependent in dependents[task["id"]]:
+                        waiting_on[dependent].discard(task["id"])
+                        if not waiting_on[dependent] and dependent not in statuses:
+                            priority, seq, _ = graph[dependent]
+                            heapq.heappush(ready, (priority, seq, dependent))
+        for task_id in graph:
+            self.journal_event("retired", task_id)  # The workflow finished, so resume won't run it again
+        return statuses
+
+    def skip_dependents(self, task_id, dependents, statuses):
+        """
+        Mark every task that transitively depends on a failed task as skipped.
+        Args:
+            task_id (str): Id of the failed task.
+            dependents (dict): Task id -> ids of tasks depending on it.
+            statuses (dict): Task statuses, updated in place.
+
         Returns:
             None
         """
+        stack = list(dependents[task_id])
+        while stack:
+            dependent = stack.pop()
+            if dependent not in statuses:
+                statuses[dependent] = "skipped"
+                self.journal_event("skipped", dependent)
+                self.log(f"Skipping task '{dependent}' because '{task_id}' failed.")
+                stack.extend(dependents[dependent])
+
+    def journal_event(self, event, task_id, **fields):
+        """
+        Record a task state transition in the workflow journal, if one is configured. Event data the journal
+        can't store (e.g., an arbitrary object returned by an agent) is left out and listed as unrecorded, so
+        the workflow goes on and a resume runs the task again rather than using a missing value.
+        Args:
+            event (str): Journal event (e.g., "queued", "completed").
+            task_id (str): Id of the task.
+            **fields: Event data.
+
+        Returns:
+            None
+        """
+        if self.journal is None:
+            return
+        try:
+            self.journal.record(event, task_id, **fields)
+        except (TypeError, ValueError) as e:  # Unsupported or circular values
+            self.log(f"Journaling '{event}' for task '{task_id}' without {', '.join(fields)}: {e}")
+            self.journal.record(event, task_id, unrecorded=sorted(fields))
+
+    def resume_workflow(self):
+        """
+        Resume the workflow interrupted by a restart from the journal: tasks that completed before the restart
+        are not run again (their journaled results feed downstream inputs), and the remaining tasks are executed.
+        Returns:
+            dict: Final status per resumed task id.
+        """
+        if self.journal is None:
+            self.log("No workflow journal configured; nothing to resume.")
+            return {}
+        tasks = self.journal.pending_tasks()
+        self.blackboard = WorkflowBlackboard()
+        for task_id, result in self.journal.completed_results().items():
+            self.blackboard.publish(task_id, result)
+        self.log(f"Resuming workflow: {len(tasks)} tasks pending, {len(self.blackboard.outputs)} already completed.")
+        with self.workflow_lock:
+            statuses = self.run_task_graph(tasks, self.blackboard)
+        # Tasks completed before the restart belong to the resumed workflow, which has now finished
+        for task_id in self.blackboard.outputs:
+            if task_id not in statuses:
+                self.journal_event("retired", task_id)
+        return statuses
+
+    def monitor_agents(self):
+        """
+        Monitor the health of registered agents and log their status and task latency.
+        Returns:
+            dict: Health report per agent type (status, in-flight tasks, p50/p95/p99 latency).
+        """
         self.log("Monitoring agents...")
-        for agent_type, agent_instance in self.agent_registry.items():
-            # Simulated status check (can be replaced with actual agent health checks)
-            self.log(f"Agent '{agent_type}' is operational.")
+        report = self.health_monitor.report()
+        for agent_type, health in report.items():
+            latency = ", ".join(f"{q} {health[q] * 1000:.1f}ms" for q in ("p50", "p95", "p99") if health[q] is not None)
+            self.log(f"Agent '{agent_type}' is {health['status']}: {health['in_flight']} in flight, "
+                     f"{health['completed']} completed, {health['failed']} failed" + (f", latency {latency}." if latency else "."))
+        return report
 
-    def perform_task(self, command):
+    def submit_command(self, command, priority_class="normal"):
         """
-        High-level function to perform a complete workflow based on user command.
+        Offer a command to the bounded ingress queue without executing it.
+        Args:
+            command (str): User command.
+            priority_class (str): Priority class used for ordering and rate limiting (e.g., "critical").
+
+        Returns:
+            str: Admission outcome ("admitted", "coalesced", "rejected" or "rate_limited").
+        """
+        outcome = self.admission.offer(command, priority_class)
+        if outcome in ("rejected", "rate_limited"):
+            self.log(f"Command '{command}' {outcome.replace('_', ' ')} (ingress queue depth {len(self.admission)}).")
+        return outcome
+
+    def process_commands(self, max_commands=None):
+        """
+        Execute admitted commands from the ingress queue, one workflow at a time.
+        Args:
+            max_commands (int): Maximum number of commands to process; all queued commands if None.
+
+        Returns:
+            int: Number of commands processed.
+        """
+        processed = 0
+        with self.workflow_lock:
+            while max_commands is None or processed < max_commands:
+                entry = self.admission.take()
+                if entry is None:
+                    break
+                self.run_command(entry[0])
+                processed += 1
+        return processed
+
+    def run_command(self, command):
+        """
+        Run the complete workflow for one command: parse, prioritize, execute and monitor.
         Args:
             command (str): User command.
 
         Returns:
             None
         """
-        self.log(f"Received command: '{command}'")
         self.parse_command(command)
         self.prioritize_tasks()
         self.execute_workflow()
         self.monitor_agents()
 
+    def perform_task(self, command, priority_class="normal"):
+        """
+        High-level function to perform a complete workflow based on user command.
+        The command passes admission control first, so bursts of commands cannot grow the queue without bound.
+        Args:
+            command (str): User command.
+            priority_class (str): Priority class of the command.
+
+        Returns:
+            bool: False if the command was not admitted, True otherwise.
+        """
+        self.log(f"Received command: '{command}'")
+        if self.submit_command(command, priority_class) in ("rejected", "rate_limited"):
+            return False
+        self.process_commands()
+        return True
@@ -0,0 +1,97 @@
+import re
+from functools import lru_cache
+
+
+class CommandParser:
+    """
+    Command Parser: Extracts the intent, verb, object and target coordinates from operator commands
+    using precompiled patterns. Results for repeated commands are memoized in an LRU cache, and
+    parse_commands() parses whole command scripts in one call.
+    """
+
+    # Verb synonyms per intent; the first matching verb in a command decides its intent
+    INTENT_VERBS = {
+        "fetch": ("fetch", "bring", "retrieve", "get", "pick up", "grab"),
+        "move": ("move", "go", "navigate", "walk"),
+    }
+
+    VERB_PATTERN = re.compile(
+        r"\b(?P<verb>" + "|".join(
+            verb.replace(" ", r"\s+") for verbs in INTENT_VERBS.values() for verb in verbs
+        ) + r")\b",
+        re.IGNORECASE,
+    )
+    OBJECT_PATTERN = re.compile(
+        r"\b(?:the|a|an)\s+(?P<object>[a-z][\w-]*(?:\s+[a-z][\w-]*)*?)"
+        r"(?=\s+(?:and|to|from|at|into|onto|on|in|near|then)\b|\s*[.,!?\[]|\s*$)",
+        re.IGNORECASE,
+    )
+    NUMBER = r"\s*(-?\d+(?:\.\d+)?)\s*"
+    COORDINATE_PATTERN = re.compile(r"\[" + NUMBER + "," + NUMBER + "(?:," + NUMBER + r")?\]")
+
+    def __init__(self, cache_size=4096):
+        self.verb_intents = {
+            verb: intent for intent, verbs in self.INTENT_VERBS.items() for verb in verbs
+        }
+        self.cached_parse = lru_cache(maxsize=cache_size)(self.parse_uncached)
+
+    def parse(self, command):
+        """
+        Parse a command, reusing the cached result for repeated commands.
+        Args:
+            command (str): Operator command.
+
+        Returns:
+            dict: Parsed command with "intent", "verb", "object" and "destination" (None when absent).
+        """
+        intent, verb, object_name, destination = self.cached_parse(command)
+        return {
+            "intent": intent,
+            "verb": verb,
+            "object": object_name,
+            "destination": list(destination) if destination is not None else None,
+        }
+
+    def parse_commands(self, commands):
+        """
+        Parse a batch of commands (e.g., a replayed command script).
+        Args:
+            commands (list): Operator commands.
+
+        Returns:
+            list: Parsed commands, in the same order.
+        """
+        return [self.parse(command) for command in commands]
+
+    def parse_uncached(self, command):
+        """
+        Parse a command without the cache.
+        Args:
+            command (str): Operator command.
+
+        Returns:
+            tuple: (intent, verb, object name, destination tuple), with None for missing parts.
+        """
+        verb_match = self.VERB_PATTERN.search(command)
+        if verb_match is None:
+            return ("unknown", None, None, None)
+        verb = " ".join(verb_match.group("verb").lower().split())
+        intent = self.verb_intents[verb]
+
+        object_match = self.OBJECT_PATTERN.search(command, verb_match.end())
+        object_name = "_".join(object_match.group("object").lower().split()) if object_match else None
+
+        destination = None
+        coordinate_match = self.COORDINATE_PATTERN.search(command, verb_match.end())
+        if coordinate_match:
+            destination = tuple(self.to_number(value) for value in coordinate_match.groups() if value is not None)
+            destination += (0,) * (3 - len(destination))  # 2D targets lie on the floor
+        return (intent, verb, object_name, destination)
+
+    def to_number(self, text):
+        """Convert a numeric string to int when it has no fractional part, float otherwise."""
+        return float(text) if "." in text else int(text)
+
+    def cache_info(self):
+        """Return hit/miss statistics of the parse cache."""
+        return self.cached_parse.cache_info()
@@ -1,8 +1,14 @@
 import random
-from transformers import pipeline
-from gtts import gTTS
 import os
 import tempfile
+import threading
+from concurrent.futures import Future
+
+from .inference_server import BatchInferenceServer
+from .intent_matcher import IntentMatcher
+from .speech_output import NullAudioSink, SpeechOutputQueue, SystemAudioSink
+from .speech_stream import SpeechStream
+from .tts_cache import SpeechAudioCache
 
 
 class CommunicationAgent:
@@ -11,15 +17,149 @@ class CommunicationAgent:
     Utilizes state-of-the-art NLP and text-to-speech (TTS) technologies for effective interaction.
     """
 
-    def __init__(self, name="Communication Agent"):
+    # Fixed responses, which make up most utterances and are pre-warmed in the speech cache
+    RESPONSES = {
+        "command": "Executing your command now. Please wait...",
+        "positive_feedback": "Thank you for your positive feedback! I'll keep improving.",
+        "feedback": "I appreciate your feedback and will work on improvements.",
+        "unknown": "I'm sorry, I didn't understand your request. Could you please rephrase?",
+    }
+
+    def __init__(self, name="Communication Agent", warm_up=False, max_batch_size=16, max_wait=0.01, inference_threads=1,
+                 speech_cache=None, intent_keywords=None, audio_sink=None, max_speech_queue=32):
         self.name = name
-        self.text_generator = pipeline("text-generation", model="gpt2")  # For generating text-based responses
-        self.sentiment_analyzer = pipeline("sentiment-analysis")  # For understanding user sentiment
+        self.audio_sink = audio_sink  # Plays speech; the system player (or a null sink without one) if None
+        self.max_speech_queue = max_speech_queue  # Maximum number of utterances waiting to be played
+        self._speech_output = None  # SpeechOutputQueue, started on first use
+        self.intent_matcher = IntentMatcher(intent_keywords)  # Word-boundary keyword matcher for intent detection
+        self._speech_cache = speech_cache  # SpeechAudioCache of synthesized responses, created on first use
+        # HuggingFace pipelines are heavy to import and load, so they are built on first use (or by warm_up())
+        self._text_generator = None  # For generating text-based responses
+        self._sentiment_analyzer = None  # For understanding user sentiment
+        self._model_lock = threading.Lock()
+        # Concurrent requests (e.g., many robots' conversations) are micro-batched into single pipeline calls
+        self.max_batch_size = max_batch_size  # Requests per pipeline call
+        self.max_wait = max_wait  # Maximum seconds a request waits for its batch to fill
+        self.inference_threads = inference_threads  # CPU thread budget per pipeline
+        self._servers = {}  # Pipeline name -> BatchInferenceServer, started on first use
+        if warm_up:
+            self.warm_up()
 
     def log(self, message):
         """Log messages with the agent's name."""
         print(f"[{self.name}] {message}")
 
+    @property
+    def text_generator(self):
+        """GPT-2 text generation pipeline, loaded on first use."""
+        if self._text_generator is None:
+            with self._model_lock:
+                if self._text_generator is None:
+                    from transformers import pipeline
+                    self.log("Loading text generation model...")
+                    generator = pipeline("text-generation", model="gpt2")
+                    # GPT-2 has no padding token, which batched generation needs
+                    generator.tokenizer.pad_token_id = generator.model.config.eos_token_id
+                    self._text_generator = generator
+        return self._text_generator
+
+    @text_generator.setter
+    def text_generator(self, generator):
+        self._text_generator = generator
+
+    @property
+    def sentiment_analyzer(self):
+        """Sentiment analysis pipeline, loaded on first use."""
+        if self._sentiment_analyzer is None:
+            with self._model_lock:
+                if self._sentiment_analyzer is None:
+                    from transformers import pipeline
+                    self.log("Loading sentiment analysis model...")
+                    self._sentiment_analyzer = pipeline("sentiment-analysis")
+        return self._sentiment_analyzer
+
+    @sentiment_analyzer.setter
+    def sentiment_analyzer(self, analyzer):
+        self._sentiment_analyzer = analyzer
+
+    def warm_up(self):
+        """
+        Load the NLP models now instead of on the first request (e.g., at production startup).
+        Returns:
+            None
+        """
+        self.log("Warming up NLP models...")
+        _ = self.text_generator, self.sentiment_analyzer
+        self.log("NLP models ready.")
+
+    def inference_server(self, pipeline_name):
+        """
+        Get the micro-batching inference server of an NLP pipeline, starting it on first use.
+        Args:
+            pipeline_name (str): "sentiment" or "generation".
+
+        Returns:
+            BatchInferenceServer: Server batching requests to the pipeline.
+        """
+        if pipeline_name not in self._servers:
+            with self._model_lock:
+                if pipeline_name not in self._servers:
+                    # Resolve the pipeline per batch so models stay lazily loaded (and replaceable in tests)
+                    model = {
+                        "sentiment": lambda texts, **kwargs: self.sentiment_analyzer(texts, batch_size=len(texts), **kwargs),
+                        "generation": lambda prompts, **kwargs: self.text_generator(prompts, batch_size=len(prompts), **kwargs),
+                    }[pipeline_name]
+                    self._servers[pipeline_name] = BatchInferenceServer(
+                        model, max_batch_size=self.max_batch_size, max_wait=self.max_wait,
+                        num_threads=self.inference_threads, name=f"{self.name} {pipeline_name} server")
+        return self._servers[pipeline_name]
+
+    def analyze_sentiment_async(self, user_input):
+        """
+        Queue sentiment analysis of a user input for batched inference.
+        Args:
+            user_input (str): User's input message.
+
+        Returns:
+            Future: Resolves to the sentiment (label and score).
+        """
+        return self.inference_server("sentiment").submit(user_input)
+
+    def generate_text_async(self, prompt, max_length=50):
+        """
+        Queue text generation for batched inference.
+        Args:
+            prompt (str): Prompt to continue.
+            max_length (int): Maximum length of the generated text in tokens.
+
+        Returns:
+            Future: Resolves to the generated text.
+        """
+        future = self.inference_server("generation").submit(prompt, max_length=max_length)
+        text_future = Future()
+
+        def resolve(done):
+            if done.exception() is not None:
+                text_future.set_exception(done.exception())
+            else:
+                text_future.set_result(done.result()[0]["generated_text"])
+
+        future.add_done_callback(resolve)
+        return text_future
+
+    def close(self):
+        """
+        Stop the inference servers and the speech output after serving queued requests.
+        Returns:
+            None
+        """
+        for server in self._servers.values():
+            server.close()
+        self._servers.clear()
+        if self._speech_output is not None:
+            self._speech_output.close()
+            self._speech_output = None
+
     def analyze_user_input(self, user_input):
         """
         Analyze user input for intent and sentiment.
@@ -33,7 +173,7 @@ class CommunicationAgent:
         # Simulate intent detection
         intent = self.detect_intent(user_input)
         # Analyze sentiment
-        sentiment = self.sentiment_analyzer(user_input)[0]
+        sentiment = self.analyze_sentiment_async(user_input).result()
         self.log(f"Detected intent: {intent}, Sentiment: {sentiment}")
         return {"intent": intent, "sentiment": sentiment}
 
@@ -46,15 +186,19 @@ class CommunicationAgent:
         Returns:
             str: Detected intent (e.g., "query", "command", "feedback").
         """
-        # Simple intent detection based on keywords
-        if any(keyword in user_input.lower() for keyword in ["what", "how", "why"]):
-            return "query"
-        elif any(keyword in user_input.lower() for keyword in ["do", "perform", "execute"]):
-            return "command"
-        elif any(keyword in user_input.lower() for keyword in ["good", "bad", "suggest"]):
-            return "feedback"
-        else:
-            return "unknown"
+        # Simple intent detection based on whole-word keywords
+        return self.intent_matcher.match(user_input)
+
+    def detect_intents(self, user_inputs):
+        """
+        Detect the intents of many user inputs (e.g., replayed chat logs).
+        Args:
+            user_inputs (list): User messages.
+
+        Returns:
+            list: Detected intent per message.
+        """
+        return self.intent_matcher.match_batch(user_inputs)
 
     def generate_response(self, intent, sentiment):
         """
@@ -68,34 +212,158 @@ class CommunicationAgent:
         """
         self.log(f"Generating response for intent: {intent}, sentiment: {sentiment}")
         if intent == "query":
-            response = self.text_generator("This is a response to your query.", max_length=50)[0]["generated_text"]
+            response = self.generate_text_async("This is a response to your query.", max_length=50).result()
         elif intent == "command":
-            response = "Executing your command now. Please wait..."
+            response = self.RESPONSES["command"]
         elif intent == "feedback":
             if sentiment["label"] == "POSITIVE":
-                response = "Thank you for your positive feedback! I'll keep improving."
+                response = self.RESPONSES["positive_feedback"]
             else:
-                response = "I appreciate your feedback and will work on improvements."
+                response = self.RESPONSES["feedback"]
         else:
-            response = "I'm sorry, I didn't understand your request. Could you please rephrase?"
+            response = self.RESPONSES["unknown"]
         self.log(f"Generated response: '{response}'")
         return response
 
-    def text_to_speech(self, response):
+    @property
+    def speech_cache(self):
+        """Cache of synthesized speech, created in the temp directory on first use."""
+        if self._speech_cache is None:
+            self._speech_cache = SpeechAudioCache(os.path.join(tempfile.gettempdir(), "humanoid_tts_cache"))
+        return self._speech_cache
+
+    def prewarm_speech(self, phrases=None, lang="en", voice=None):
+        """
+        Synthesize known phrases ahead of time so they are spoken without synthesis latency.
+        Args:
+            phrases (list): Phrases to cache; the fixed responses if omitted.
+            lang (str): Language code.
+            voice (str): Voice or accent (None for the default).
+
+        Returns:
+            int: Number of phrases that had to be synthesized.
+        """
+        synthesized = self.speech_cache.prewarm(phrases or list(self.RESPONSES.values()), lang, voice)
+        self.log(f"Speech cache pre-warmed ({synthesized} phrases synthesized).")
+        return synthesized
+
+    def stream_text(self, prompt, max_length=50):
+        """
+        Generate text token by token, starting with the prompt (like generate_text_async's output).
+        Generation runs on the generation inference server, so streams share its queue and thread budget with
+        batched requests; each stream is a batch of its own, as a streamer follows a single sequence.
+        Args:
+            prompt (str): Prompt to continue.
+            max_length (int): Maximum length of the generated text in tokens.
+
+        Yields:
+            str: Text chunks as soon as they are generated.
+        """
+        # Imported from its module: resolving transformers' lazy top-level names isn't safe across threads
+        from transformers.generation.streamers import TextIteratorStreamer
+        streamer = TextIteratorStreamer(self.text_generator.tokenizer, skip_prompt=True)
+        # Requests only share a batch when their options are equal, and every stream has its own streamer
+        future = self.inference_server("generation").submit(prompt, max_length=max_length, streamer=streamer)
+
+        def end_on_failure(done):
+            if done.cancelled() or done.exception() is not None:
+                streamer.end()  # Unblock the consumer
+
+        future.add_done_callback(end_on_failure)
+        yield prompt + " "
+        yield from streamer
+        future.result()  # Raises the generation error, if any
+
+    def stream_response(self, intent, sentiment):
+        """
+        Stream the response for a detected intent and sentiment; fixed responses are yielded whole.
+        Args:
+            intent (str): User's detected intent.
+            sentiment (dict): User's sentiment analysis result.
+
+        Yields:
+            str: Text chunks of the response.
+        """
+        if intent == "query":
+            yield from self.stream_text("This is a response to your query.", max_length=50)
+        else:
+            yield self.generate_response(intent, sentiment)
+
+    def speak_streaming(self, tokens, lang="en", voice=None):
+        """
+        Speak text while it is being generated: phrases are synthesized and played as soon as they are complete.
+        Args:
+            tokens (iterable): Streamed text chunks (e.g., from stream_response()).
+            lang (str): Language code.
+            voice (str): Voice or accent (None for the default).
+
+        Returns:
+            SpeechStream: Handle to wait for the full text and read the time to first audio.
+        """
+        return SpeechStream(tokens, lambda phrase: self.speech_cache.get_audio(phrase, lang, voice), self.play_audio)
+
+    @property
+    def speech_output(self):
+        """Playback queue of the agent's speech, started on first use."""
+        if self._speech_output is None:
+            sink = self.audio_sink
+            if sink is None:
+                if SystemAudioSink.available():
+                    sink = SystemAudioSink()
+                else:
+                    self.log("No audio player found; speech will not be audible.")
+                    sink = NullAudioSink()
+            self._speech_output = SpeechOutputQueue(sink, max_queue=self.max_speech_queue)
+        return self._speech_output
+
+    def play_audio(self, audio_path, priority="normal"):
+        """
+        Queue an audio file for playback without waiting for it to play.
+        Args:
+            audio_path (str): Path of the audio file.
+            priority (str): "safety" to interrupt other speech, or "normal".
+
+        Returns:
+            bool: False if the utterance was dropped because the speech queue is full.
+        """
+        queued = self.speech_output.enqueue(audio_path, priority)
+        if not queued:
+            self.log(f"Speech queue full; dropped '{audio_path}'.")
+        return queued
+
+    def announce_safety(self, message, lang="en", voice=None):
+        """
+        Speak a safety announcement, interrupting other speech.
+        Args:
+            message (str): Announcement text (e.g., "Stand clear, the arm is moving.").
+            lang (str): Language code.
+            voice (str): Voice or accent (None for the default).
+
+        Returns:
+            str: Path of the audio file.
+        """
+        self.log(f"Safety announcement: '{message}'")
+        audio_path = self.speech_cache.get_audio(message, lang, voice)
+        self.play_audio(audio_path, priority="safety")
+        return audio_path
+
+    def text_to_speech(self, response, lang="en", voice=None):
         """
         Convert the generated response to speech using a TTS engine.
+        Audio is content-addressed in the speech cache, so repeated responses are not synthesized again.
         Args:
             response (str): The text response to convert to speech.
+            lang (str): Language code.
+            voice (str): Voice or accent (None for the default).
 
         Returns:
-            None
+            str: Path of the audio file.
         """
         self.log("Converting response to speech...")
-        tts = gTTS(text=response, lang="en")
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio:
-            tts.save(temp_audio.name)
-            os.system(f"start {temp_audio.name}")
-        self.log("Response played as speech.")
+        audio_path = self.speech_cache.get_audio(response, lang, voice)
+        self.play_audio(audio_path)
+        self.log("Response queued for speech.")
+        return audio_path
 
     def multimodal_feedback(self, response):
         """
@@ -137,11 +405,12 @@ class CommunicationAgent:
         # Analyze input
         analysis = self.analyze_user_input(user_input)
 
-        # Generate response
-        response = self.generate_response(analysis["intent"], analysis["sentiment"])
+        # Generate the response and speak it phrase by phrase while it is being generated
+        stream = self.speak_streaming(self.stream_response(analysis["intent"], analysis["sentiment"]))
+        response = stream.wait()
+        self.log(f"Spoke response in {len(stream.phrases)} phrases (first audio after {stream.time_to_first_audio:.2f}s).")
 
-        # Provide verbal and non-verbal feedback
-        self.text_to_speech(response)
+        # Provide non-verbal feedback
         self.multimodal_feedback(response)
 
         # Report final status
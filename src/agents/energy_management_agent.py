@@ -1,7 +1,7 @@
-import time
 import random
 import numpy as np
 from scipy.interpolate import interp1d
+from utils.clock import RealClock
 
 
 class EnergyManagementAgent:
@@ -10,8 +10,9 @@ class EnergyManagementAgent:
     and provides predictive capabilities to maintain operational continuity.
     """
 
-    def __init__(self, name="Energy Management Agent"):
+    def __init__(self, name="Energy Management Agent", clock=None):
         self.name = name
+        self.clock = clock or RealClock()  # Use a VirtualClock to simulate charging without blocking
         self.current_battery_level = 100.0  # Battery level as a percentage
         self.energy_consumption_rate = 1.0  # Simulated rate in % per minute
         self.battery_capacity = 5000  # Battery capacity in mAh
@@ -79,11 +80,12 @@ class EnergyManagementAgent:
             None
         """
         self.log("Starting battery charging process...")
+        start_time = self.clock.now()
         while self.current_battery_level < 100.0:
             self.current_battery_level = min(100.0, self.current_battery_level + 10.0)
             self.log(f"Battery charging: {self.current_battery_level:.2f}%")
-            time.sleep(1)  # Simulate charging time
-        self.log("Battery fully charged.")
+            self.clock.sleep(1)  # Simulate charging time
+        self.log(f"Battery fully charged in {self.clock.now() - start_time:.2f}s.")
 
     def log_energy_usage(self, task_type, energy_consumed):
         """
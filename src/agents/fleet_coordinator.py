@@ -0,0 +1,334 @@
+import itertools
+import multiprocessing
+import queue
+import threading
+
+import numpy as np
+
+from .central_cognitive_agent import CentralCognitiveAgent
+from .command_parser import CommandParser
+
+
+def default_robot_agents():
+    """
+    Build the agent registry of one simulated robot.
+    Returns:
+        dict: Agent type -> agent instance.
+    """
+    from .energy_management_agent import EnergyManagementAgent
+    from .manipulation_agent import ManipulationAgent
+    from .motor_control_agent import MotorControlAgent
+    from .planning_agent import PlanningAgent
+    from .sensory_agent import SensoryAgent
+
+    return {
+        "sensory": SensoryAgent(),
+        "planning": PlanningAgent(),
+        "manipulation": ManipulationAgent(),
+        "motor_control": MotorControlAgent(),
+        "energy": EnergyManagementAgent(),
+    }
+
+
+def robot_state(agent_registry):
+    """
+    Read the battery level and position reported by a robot's agents.
+    Args:
+        agent_registry (dict): Agent type -> agent instance.
+
+    Returns:
+        dict: Battery level (%) and position [x, y, z], where available.
+    """
+    state = {}
+    if "energy" in agent_registry:
+        state["battery_level"] = float(agent_registry["energy"].current_battery_level)
+    if "motor_control" in agent_registry:
+        state["position"] = [float(v) for v in agent_registry["motor_control"].current_position]
+    return state
+
+
+def run_robot_worker(robot_id, agent_factory, inbox, outbox, position=None, battery_level=None):
+    """
+    Worker process loop for one robot: builds the robot's agents and executes assigned commands.
+    Args:
+        robot_id (str): Robot identifier.
+        agent_factory (function): Picklable callable returning the robot's agent registry.
+        inbox (multiprocessing.Queue): Incoming (job id, command) pairs; None stops the worker.
+        outbox (multiprocessing.Queue): Outgoing (robot id, job id, task statuses, robot state) results.
+        position (list): Initial robot position [x, y, z] (the agents' default if None).
+        battery_level (float): Initial battery level (%) (the agents' default if None).
+
+    Returns:
+        None
+    """
+    central_agent = CentralCognitiveAgent(name=f"Central Cognitive Agent [{robot_id}]")
+    for agent_type, agent_instance in agent_factory().items():
+        central_agent.register_agent(agent_type, agent_instance)
+    # Start the agents from the state the coordinator was given, so the startup report confirms it
+    if position is not None and "motor_control" in central_agent.agent_registry:
+        central_agent.agent_registry["motor_control"].current_position = np.asarray(position, dtype=float)
+    if battery_level is not None and "energy" in central_agent.agent_registry:
+        central_agent.agent_registry["energy"].current_battery_level = float(battery_level)
+    outbox.put((robot_id, None, {}, robot_state(central_agent.agent_registry)))
+
+    while True:
+        message = inbox.get()
+        if message is None:
+            break
+        job_id, command = message
+        try:
+            central_agent.parse_command(command)
+            statuses = central_agent.execute_workflow()
+            if "energy" in central_agent.agent_registry:
+                central_agent.agent_registry["energy"].perform_task({"task_type": "workflow"})
+        except Exception as e:
+            central_agent.log(f"Command '{command}' failed: {e}")
+            statuses = {"error": str(e)}
+        outbox.put((robot_id, job_id, statuses, robot_state(central_agent.agent_registry)))
+
+
+class FleetCoordinator:
+    """
+    Fleet Coordinator: Drives several robots, each with its own agent registry running in a worker process.
+    Every command is assigned to one robot (its subtasks act on the same body), choosing the robot with the
+    lowest cost based on its current load, battery level and distance to the command's target location.
+    A robot whose worker exits (e.g., its agents fail to start) is taken out of selection and its pending
+    commands fail.
+    """
+
+    def __init__(self, name="Fleet Coordinator", load_weight=1.0, battery_weight=2.0, distance_weight=0.5,
+                 min_battery_level=10.0, poll_interval=0.2):
+        self.name = name
+        self.load_weight = load_weight  # Cost per command already queued on a robot
+        self.battery_weight = battery_weight  # Cost of a fully depleted battery
+        self.distance_weight = distance_weight  # Cost per meter between robot and target
+        self.min_battery_level = min_battery_level  # Robots at or below this level receive no commands
+        self.poll_interval = poll_interval  # Seconds between checks for robot workers that exited
+        self.command_parser = CommandParser()
+        # Forked workers would inherit the collector thread's locks, possibly held mid-operation
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._context = multiprocessing.get_context(method)
+        self.robot_ids = []
+        self.workers = {}
+        self.inboxes = {}
+        self.outbox = self._context.Queue()
+        self.loads = np.zeros(0)
+        self.battery_levels = np.zeros(0)
+        self.positions = np.zeros((0, 3))
+        self.results = {}  # Job id -> result dict
+        self.job_ids = itertools.count(1)
+        self.pending_jobs = set()
+        self.job_robots = {}  # Pending job id -> robot id
+        self.started_robots = set()  # Robots whose worker has sent its startup report
+        self.failed_robots = set()  # Robots whose worker exited unexpectedly
+        self._lock = threading.Condition()
+        self._collector = None
+        self._stopping = False
+
+    def log(self, message):
+        """Log messages with the coordinator's name."""
+        print(f"[{self.name}] {message}")
+
+    def add_robot(self, robot_id, agent_factory=default_robot_agents, position=(0.0, 0.0, 0.0), battery_level=100.0):
+        """
+        Start a worker process for a robot.
+        Args:
+            robot_id (str): Robot identifier.
+            agent_factory (function): Picklable callable returning the robot's agent registry.
+            position (list): Initial robot position [x, y, z], updated from the robot's reports.
+            battery_level (float): Initial battery level (%), updated from the robot's reports.
+
+        Returns:
+            None
+        """
+        inbox = self._context.Queue()
+        worker = self._context.Process(target=run_robot_worker,
+                                       args=(robot_id, agent_factory, inbox, self.outbox, list(position), battery_level),
+                                       name=f"robot-{robot_id}", daemon=True)
+        worker.start()
+        with self._lock:
+            self.robot_ids.append(robot_id)
+            self.workers[robot_id] = worker
+            self.inboxes[robot_id] = inbox
+            self.loads = np.append(self.loads, 0.0)
+            self.battery_levels = np.append(self.battery_levels, float(battery_level))
+            self.positions = np.vstack([self.positions, np.asarray(position, dtype=float)])
+        if self._collector is None:
+            self._collector = threading.Thread(target=self.collect_results, name="fleet-collector", daemon=True)
+            self._collector.start()
+        self.log(f"Robot '{robot_id}' started.")
+
+    def select_robot(self, target=None):
+        """
+        Choose the robot with the lowest assignment cost among the running robots.
+        Args:
+            target (list): Target location [x, y, z] of the command, if known.
+
+        Returns:
+            int: Index of the selected robot.
+        """
+        costs = self.load_weight * self.loads + self.battery_weight * (1.0 - self.battery_levels / 100.0)
+        if target is not None:
+            costs = costs + self.distance_weight * np.linalg.norm(self.positions - np.asarray(target, dtype=float), axis=1)
+        costs = np.where(self.battery_levels > self.min_battery_level, costs, np.inf)
+        costs[[i for i, robot_id in enumerate(self.robot_ids) if robot_id in self.failed_robots]] = np.inf
+        if not np.isfinite(costs).any():
+            raise RuntimeError("No running robot has enough battery to accept commands.")
+        return int(np.argmin(costs))
+
+    def submit(self, command):
+        """
+        Assign a command to a robot and send it to the robot's worker.
+        Args:
+            command (str): User command.
+
+        Returns:
+            int: Job id used to look up the result.
+        """
+        target = self.command_parser.parse(command)["destination"]
+        with self._lock:
+            index = self.select_robot(target)
+            self.loads[index] += 1
+            job_id = next(self.job_ids)
+            self.pending_jobs.add(job_id)
+            robot_id = self.robot_ids[index]
+            self.job_robots[job_id] = robot_id
+        self.inboxes[robot_id].put((job_id, command))
+        return job_id
+
+    def submit_commands(self, commands):
+        """
+        Assign a batch of commands to robots.
+        Args:
+            commands (list): User commands.
+
+        Returns:
+            list: Job ids, one per command.
+        """
+        job_ids = [self.submit(command) for command in commands]
+        self.log(f"Dispatched {len(job_ids)} commands to {len(self.robot_ids)} robots.")
+        return job_ids
+
+    def collect_results(self):
+        """Background loop recording results, updating robot load, battery and position, and detecting robot
+        workers that exited."""
+        exited = set()
+        while True:
+            try:
+                message = self.outbox.get(timeout=self.poll_interval)
+            except queue.Empty:
+                # A worker flushes its results before exiting, so a worker already seen exited before an empty
+                # poll has no results left to deliver
+                self.fail_robots(exited)
+                exited = {robot_id for robot_id, worker in list(self.workers.items())
+                          if not worker.is_alive() and robot_id not in self.failed_robots}
+                continue
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            robot_id, job_id, statuses, state = message
+            with self._lock:
+                index = self.robot_ids.index(robot_id)
+                if job_id is None:
+                    self.started_robots.add(robot_id)
+                else:
+                    self.loads[index] -= 1
+                    self.results[job_id] = {"robot_id": robot_id, "statuses": statuses}
+                    self.pending_jobs.discard(job_id)
+                    self.job_robots.pop(job_id, None)
+                if "battery_level" in state:
+                    self.battery_levels[index] = state["battery_level"]
+                if "position" in state:
+                    self.positions[index] = state["position"]
+                self._lock.notify_all()
+
+    def fail_robots(self, robot_ids):
+        """
+        Take robots whose worker exited out of selection and fail their pending commands.
+        Args:
+            robot_ids (set): Robot identifiers.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._stopping:
+                return
+            for robot_id in robot_ids:
+                exitcode = self.workers[robot_id].exitcode
+                self.failed_robots.add(robot_id)
+                self.loads[self.robot_ids.index(robot_id)] = 0
+                jobs = [job_id for job_id, job_robot in self.job_robots.items() if job_robot == robot_id]
+                for job_id in jobs:
+                    error = f"Robot '{robot_id}' stopped (exit code {exitcode})"
+                    self.results[job_id] = {"robot_id": robot_id, "statuses": {"error": error}}
+                    self.pending_jobs.discard(job_id)
+                    del self.job_robots[job_id]
+                self.log(f"Robot '{robot_id}' worker exited with code {exitcode}; {len(jobs)} pending commands failed.")
+            if robot_ids:
+                self._lock.notify_all()
+
+    def wait_for_robots(self, timeout=None):
+        """
+        Wait until every robot's worker has started and reported its state, or exited.
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            bool: True if all robots started and are running, False on timeout or if a robot's worker exited.
+        """
+        with self._lock:
+            self._lock.wait_for(lambda: self.started_robots | self.failed_robots >= set(self.robot_ids), timeout=timeout)
+            return self.started_robots >= set(self.robot_ids) and not self.failed_robots
+
+    def wait_for_jobs(self, timeout=None):
+        """
+        Wait until every submitted command has finished (or failed because its robot's worker exited).
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            bool: True if all jobs finished, False on timeout.
+        """
+        with self._lock:
+            return self._lock.wait_for(lambda: not self.pending_jobs, timeout=timeout)
+
+    def robot_status(self):
+        """
+        Report the current load, battery level and position of every robot.
+        Returns:
+            dict: Robot id -> status.
+        """
+        with self._lock:
+            return {
+                robot_id: {
+                    "load": int(self.loads[i]),
+                    "battery_level": float(self.battery_levels[i]),
+                    "position": self.positions[i].tolist(),
+                    "running": robot_id not in self.failed_robots,
+                }
+                for i, robot_id in enumerate(self.robot_ids)
+            }
+
+    def shutdown(self, timeout=5.0):
+        """
+        Stop all robot workers and the result collector.
+        Args:
+            timeout (float): Time to wait for each worker to exit.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._stopping = True  # Workers exiting from here on are expected to
+        for inbox in self.inboxes.values():
+            inbox.put(None)
+        for robot_id, worker in self.workers.items():
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+        self.outbox.put(None)
+        if self._collector is not None:
+            self._collector.join(timeout)
+        self.log("All robots stopped.")
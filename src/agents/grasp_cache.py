@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class GraspPlanCache:
+    """
+    Grasp Plan Cache: Stores grasp plans in the object's own frame, keyed by object type and dimensions,
+    so repeated objects (e.g., the same SKU on a production line) skip grasp planning entirely.
+    Cached plans are transformed to the object's current pose on lookup. The cache is bounded with
+    least-recently-used eviction and can be persisted to disk to survive restarts.
+    """
+
+    def __init__(self, max_size=1024, precision=4, path=None):
+        self.max_size = max_size  # Maximum number of cached plans
+        self.precision = precision  # Decimal places used when keying dimensions (4 = 0.1 mm)
+        self.path = path  # Optional JSON file used by save() and loaded on construction
+        self.entries = OrderedDict()  # (object_type, dimensions) -> (grip_offset, approach_vector), oldest first
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def make_key(self, object_type, dimensions):
+        """
+        Build the cache key for an object.
+        Args:
+            object_type (str): Object type or SKU.
+            dimensions (list): Object dimensions [length, width, height] in meters.
+
+        Returns:
+            tuple: Hashable key of the object type and rounded dimensions.
+        """
+        return (object_type, tuple(round(float(d), self.precision) for d in dimensions))
+
+    def lookup(self, object_type, dimensions, position, rotation):
+        """
+        Look up a cached plan and transform it to the object's current pose.
+        Args:
+            object_type (str): Object type or SKU.
+            dimensions (list): Object dimensions [length, width, height] in meters.
+            position (np.array): Current object position [x, y, z].
+            rotation (np.array): Current object orientation as a 3x3 rotation matrix.
+
+        Returns:
+            dict: Grasp configuration (grip point and approach vector), or None on a cache miss.
+        """
+        key = self.make_key(object_type, dimensions)
+        with self._lock:
+            plan = self.entries.get(key)
+            if plan is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        grip_offset, approach_vector = plan
+        return {
+            "grip_point": np.asarray(position, dtype=float) + rotation @ grip_offset,
+            "approach_vector": rotation @ approach_vector,
+        }
+
+    def store(self, object_type, dimensions, position, rotation, grasp_config):
+        """
+        Store a world-frame grasp plan, converting it to the object's frame.
+        Args:
+            object_type (str): Object type or SKU.
+            dimensions (list): Object dimensions [length, width, height] in meters.
+            position (np.array): Object position the plan was computed for.
+            rotation (np.array): Object orientation (3x3 rotation matrix) the plan was computed for.
+            grasp_config (dict): Grasp configuration including grip point and approach vector.
+
+        Returns:
+            None
+        """
+        grip_offset = rotation.T @ (np.asarray(grasp_config["grip_point"], dtype=float) - np.asarray(position, dtype=float))
+        approach_vector = rotation.T @ np.asarray(grasp_config["approach_vector"], dtype=float)
+        self.put(self.make_key(object_type, dimensions), grip_offset, approach_vector)
+
+    def put(self, key, grip_offset, approach_vector):
+        """
+        Insert an object-frame plan, evicting the least recently used plan when full.
+        Args:
+            key (tuple): Cache key from make_key().
+            grip_offset (np.array): Grip point relative to the object origin, in the object frame.
+            approach_vector (np.array): Approach vector in the object frame.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.entries[key] = (np.asarray(grip_offset, dtype=float), np.asarray(approach_vector, dtype=float))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def save(self, path=None):
+        """
+        Persist the cache to a JSON file (written atomically).
+        Args:
+            path (str): Destination file; defaults to the cache's path.
+
+        Returns:
+            str: Path the cache was written to.
+        """
+        path = path or self.path
+        with self._lock:
+            records = [
+                {
+                    "object_type": object_type,
+                    "dimensions": list(dimensions),
+                    "grip_offset": grip_offset.tolist(),
+                    "approach_vector": approach_vector.tolist(),
+                }
+                for (object_type, dimensions), (grip_offset, approach_vector) in self.entries.items()
+            ]
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"precision": self.precision, "entries": records}, f)
+        os.replace(temp_path, path)
+        return path
+
+    def load(self, path=None):
+        """
+        Load cached plans from a JSON file written by save(), keeping their recency order.
+        Args:
+            path (str): Source file; defaults to the cache's path.
+
+        Returns:
+            int: Number of plans loaded.
+        """
+        with open(path or self.path) as f:
+            data = json.load(f)
+        for record in data["entries"]:
+            key = self.make_key(record["object_type"], record["dimensions"])
+            self.put(key, record["grip_offset"], record["approach_vector"])
+        return len(data["entries"])
+
+    def __len__(self):
+        return len(self.entries)
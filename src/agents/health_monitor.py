@@ -0,0 +1,134 @@
+import itertools
+import threading
+
+from utils.clock import RealClock
+from utils.latency_histogram import LatencyHistogram
+
+
+class AgentHealthMonitor:
+    """
+    Agent Health Monitor: Tracks heartbeats, in-flight tasks and rolling perform_task latency percentiles
+    per agent. An agent is marked degraded when a task runs past the task timeout or heartbeats stop,
+    so the scheduler can route work around it. Recording is O(1) and lock-light to keep the task hot path fast.
+    """
+
+    def __init__(self, clock=None, task_timeout=30.0, heartbeat_timeout=None):
+        self.clock = clock or RealClock()
+        self.task_timeout = task_timeout  # Seconds after which a running task marks its agent degraded
+        self.heartbeat_timeout = heartbeat_timeout  # Seconds without heartbeat before degrading (None disables)
+        self.agents = {}  # Agent type -> health record
+        self.tokens = itertools.count()
+        self._lock = threading.Lock()
+
+    def register(self, agent_type):
+        """
+        Start monitoring an agent.
+        Args:
+            agent_type (str): Type of the agent.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.agents[agent_type] = {
+                "last_heartbeat": self.clock.now(),
+                "in_flight": {},  # Token -> start time
+                "timed_out": False,  # Last finished task exceeded the task timeout
+                "completed": 0,
+                "failed": 0,
+                "latency": LatencyHistogram(clock=self.clock),
+            }
+
+    def heartbeat(self, agent_type):
+        """
+        Record a heartbeat from an agent.
+        Args:
+            agent_type (str): Type of the agent.
+
+        Returns:
+            None
+        """
+        self.agents[agent_type]["last_heartbeat"] = self.clock.now()
+
+    def task_started(self, agent_type):
+        """
+        Record the start of a task.
+        Args:
+            agent_type (str): Type of the agent running the task.
+
+        Returns:
+            tuple: Token to pass to task_finished().
+        """
+        token = next(self.tokens)
+        start_time = self.clock.now()
+        with self._lock:
+            self.agents[agent_type]["in_flight"][token] = start_time
+        return (agent_type, token, start_time)
+
+    def task_finished(self, token, success=True):
+        """
+        Record the end of a task; a finished task also counts as a heartbeat.
+        Args:
+            token (tuple): Token returned by task_started().
+            success (bool): Whether the task succeeded.
+
+        Returns:
+            float: Task latency in seconds.
+        """
+        agent_type, key, start_time = token
+        now = self.clock.now()
+        latency = now - start_time
+        record = self.agents[agent_type]
+        with self._lock:
+            record["in_flight"].pop(key, None)
+            record["last_heartbeat"] = now
+            record["timed_out"] = latency > self.task_timeout
+            record["completed" if success else "failed"] += 1
+        record["latency"].record(latency)
+        return latency
+
+    def status(self, agent_type):
+        """
+        Get the health status of an agent.
+        Args:
+            agent_type (str): Type of the agent.
+
+        Returns:
+            str: "healthy", "degraded" or "unknown".
+        """
+        record = self.agents.get(agent_type)
+        if record is None:
+            return "unknown"
+        now = self.clock.now()
+        with self._lock:
+            oldest_start = min(record["in_flight"].values(), default=now)
+        if record["timed_out"] or now - oldest_start > self.task_timeout:
+            return "degraded"
+        if self.heartbeat_timeout is not None and now - record["last_heartbeat"] > self.heartbeat_timeout:
+            return "degraded"
+        return "healthy"
+
+    def is_available(self, agent_type):
+        """Return False if the agent is degraded."""
+        return self.status(agent_type) != "degraded"
+
+    def report(self):
+        """
+        Summarize the health of every monitored agent.
+        Returns:
+            dict: Agent type -> status, in-flight count, task counts and p50/p95/p99 latency (s).
+        """
+        report = {}
+        for agent_type, record in list(self.agents.items()):
+            percentiles = record["latency"].percentiles((50, 95, 99))
+            report[agent_type] = {
+                "status": self.status(agent_type),
+                "in_flight": len(record["in_flight"]),
+                "completed": record["completed"],
+                "failed": record["failed"],
+                "seconds_since_heartbeat": self.clock.now() - record["last_heartbeat"],
+                "p50": percentiles[50],
+                "p95": percentiles[95],
+                "p99": percentiles[99],
+            }
+        return report
@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class BatchInferenceServer:
+    """
+    Batch Inference Server: In-process worker that collects concurrent inference requests into micro-batches
+    and runs each batch with a single model call. A batch is dispatched when it reaches the maximum batch size
+    or when its oldest request has waited the maximum wait time, so batching adds bounded latency while
+    throughput per CPU core grows with load. Batches run on a fixed budget of worker threads, and callers
+    get a Future for every request.
+    """
+
+    def __init__(self, model, max_batch_size=16, max_wait=0.01, num_threads=1, name="Batch Inference Server"):
+        self.name = name
+        self.model = model  # Callable mapping a list of inputs (plus shared keyword arguments) to a list of outputs
+        self.max_batch_size = max_batch_size  # Requests per model call
+        self.max_wait = max_wait  # Maximum seconds the oldest request waits for the batch to fill
+        self.num_threads = num_threads  # Batches running concurrently (CPU thread budget)
+        self.requests = deque()  # (input, kwargs key, kwargs, future, arrival time)
+        self.batches = 0
+        self.items = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="inference")
+        self._slots = threading.Semaphore(num_threads)  # Batches are only formed when a thread can run them
+        self._dispatcher = threading.Thread(target=self._run_dispatcher, name="inference-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, item, **kwargs):
+        """
+        Queue one inference request.
+        Args:
+            item (object): Model input (e.g., a text).
+            **kwargs: Model options (e.g., max_length); only requests with equal options share a batch.
+
+        Returns:
+            Future: Resolves to the model output for the item.
+        """
+        future = Future()
+        key = tuple(sorted(kwargs.items()))
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Inference server is closed")
+            self.requests.append((item, key, kwargs, future, time.monotonic()))
+            self._condition.notify()
+        return future
+
+    def submit_many(self, items, **kwargs):
+        """
+        Queue several inference requests with the same options.
+        Args:
+            items (list): Model inputs.
+            **kwargs: Model options.
+
+        Returns:
+            list: One Future per item.
+        """
+        return [self.submit(item, **kwargs) for item in items]
+
+    def _run_dispatcher(self):
+        while True:
+            self._slots.acquire()
+            with self._condition:
+                while not self.requests and not self._closed:
+                    self._condition.wait()
+                if not self.requests:
+                    self._slots.release()
+                    return
+                # Wait for the batch to fill, but never past the oldest request's deadline
+                deadline = self.requests[0][4] + self.max_wait
+                while len(self.requests) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._take_batch()
+            self._executor.submit(self._run_batch, batch)
+
+    def _take_batch(self):
+        # The oldest request decides the model options; matching requests join it, others keep their place
+        key = self.requests[0][1]
+        batch, skipped = [], deque()
+        while self.requests and len(batch) < self.max_batch_size:
+            request = self.requests.popleft()
+            (batch if request[1] == key else skipped).append(request)
+        skipped.extend(self.requests)
+        self.requests = skipped
+        return batch
+
+    def _run_batch(self, batch):
+        try:
+            batch = [request for request in batch if request[3].set_running_or_notify_cancel()]  # Drop cancelled requests
+            if not batch:
+                return
+            futures = [request[3] for request in batch]
+            try:
+                outputs = self.model([request[0] for request in batch], **batch[0][2])
+                if len(outputs) != len(batch):
+                    raise ValueError(f"Model returned {len(outputs)} outputs for a batch of {len(batch)}")
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                return
+            with self._condition:
+                self.batches += 1
+                self.items += len(batch)
+            for future, output in zip(futures, outputs):
+                future.set_result(output)
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        """
+        Report batching statistics.
+        Returns:
+            dict: Batches run, items served, mean batch size and queued requests.
+        """
+        with self._condition:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "queued": len(self.requests),
+            }
+
+    def close(self):
+        """
+        Serve the queued requests and stop the worker threads.
+        Returns:
+            None
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
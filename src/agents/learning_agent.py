@@ -1,7 +1,20 @@
+import copy
+import multiprocessing
+import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import time
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestRegressor  # For simulated learning
 import random
+import threading
+from utils.clock import RealClock
+from utils.latency_histogram import LatencyHistogram
+from .model_checkpoint import MappedForest, ModelCheckpointStore
+from .replay_buffer import ReplayBuffer
+from .reward_evaluation import BanditSampler, RewardEvaluator
+from .training_worker import TrainingWorker
 
 
 class LearningAgent:
@@ -10,11 +23,55 @@ class LearningAgent:
     human feedback, and transfer learning.
     """
 
-    def __init__(self, name="Learning Agent"):
+    def __init__(self, name="Learning Agent", online=True, retrain_every=25, retrain_interval=None, min_samples=11,
+                 window=500, trees_per_update=10, max_trees=100, clock=None, replay_buffer=None, background_training=True,
+                 reward_workers=0, checkpoint_dir=None, keep_checkpoints=5):
         self.name = name
-        self.reward_history = []  # Stores rewards for reinforcement learning
-        self.task_model = RandomForestRegressor()  # Example ML model for task performance
-        self.task_data = []  # Stores task-specific features and outcomes
+        self.clock = clock or RealClock()
+        # Bounded columnar store of task features, outcomes and rewards (replaces unbounded lists)
+        self.replay_buffer = replay_buffer if replay_buffer is not None else ReplayBuffer(capacity=10000)
+        # Online mode grows the forest incrementally (warm start) from recent data instead of refitting it on the
+        # whole history after every sample, so the cost of an update doesn't grow with the history
+        self.online = online
+        self.retrain_every = retrain_every  # Retrain after this many new samples
+        self.retrain_interval = retrain_interval  # Also retrain when this many seconds have passed (None disables)
+        self.min_samples = min_samples  # Samples needed before training; the first model is trained once reached
+        self.window = window  # Most recent samples used by each incremental update
+        self.trees_per_update = trees_per_update  # Trees added by each incremental update
+        self.max_trees = max_trees  # The oldest trees are retired beyond this
+        if online:
+            self.task_model = RandomForestRegressor(n_estimators=trees_per_update, warm_start=True)
+        else:
+            self.task_model = RandomForestRegressor()  # Example ML model for task performance
+        self._untrained_model = clone(self.task_model)  # Training restarts from it when a checkpoint can't be rebuilt
+        self.samples_since_training = 0
+        self.last_training_time = self.clock.now()
+        # Training runs on a worker thread that builds a new model and swaps it in when finished, so
+        # tasks never wait for training and inference never sees a partially trained model
+        self.background_training = background_training
+        self._training_worker = None  # TrainingWorker, started on first use
+        self.model_version = 0  # Incremented whenever a newly trained model is published
+        self._model_lock = threading.Lock()  # Serializes publishing and replacing the task model
+        self.training_count = 0
+        self.training_requests = 0
+        self.last_training_duration = None  # Seconds taken by the last training
+        self.training_durations = LatencyHistogram(min_latency=1e-3, max_latency=3600.0, window=3600.0, clock=self.clock)
+        # Picklable reward functions (e.g., module-level functions) that aren't vectorized are evaluated in a
+        # process pool of this many workers (0 disables)
+        self.reward_workers = reward_workers
+        self._reward_pool = None  # ProcessPoolExecutor, started on first use
+        self._reward_evaluators = OrderedDict()  # Evaluators of deterministic reward functions, keeping their caches
+        self._picklable_functions = OrderedDict()  # Reward function -> whether it can be sent to the reward pool
+        self.reward_evaluations = 0  # Reward function evaluations requested by reinforcement learning
+        # Every published model is checkpointed here, and a new agent starts from the newest checkpoint
+        # (memory-mapped, so startup doesn't depend on the size of the forest)
+        self.checkpoints = ModelCheckpointStore(checkpoint_dir, keep=keep_checkpoints) if checkpoint_dir else None
+        self.checkpoint_version = None  # Checkpoint of the current model
+        if self.checkpoints is not None and self.checkpoints.latest_version() is not None:
+            try:
+                self.load_checkpoint()
+            except Exception as e:  # e.g., a pickled model saved by another scikit-learn version
+                self.log(f"Checkpoint not loaded, starting from an untrained model: {e}")
 
     def log(self, message):
         """Log messages with the agent's name."""
@@ -35,37 +92,326 @@ class LearningAgent:
         self.log(f"Human feedback received: {feedback}")
         return feedback
 
-    def update_task_model(self, task_features, task_outcome):
+    @property
+    def reward_history(self):
+        """Rewards of the samples in the replay buffer (rewards for reinforcement learning)."""
+        rewards = self.replay_buffer.recent()["rewards"]
+        return rewards[~np.isnan(rewards)]
+
+    def update_task_model(self, task_features, task_outcome, reward=None):
         """
         Update the task model using new data.
         Args:
             task_features (list): Features describing the task (e.g., difficulty, object type).
             task_outcome (float): Performance metric or reward for the task.
+            reward (float): Reward received for the task, if any.
 
         Returns:
             None
         """
         self.log("Updating task model with new data...")
-        self.task_data.append((task_features, task_outcome))
-        if len(self.task_data) > 10:  # Only train when sufficient data is available
-            features, outcomes = zip(*self.task_data)
-            self.task_model.fit(features, outcomes)
-            self.log("Task model updated successfully.")
+        self.replay_buffer.add(task_features, task_outcome, np.nan if reward is None else reward, self.clock.now())
+        self.samples_since_training += 1
+        if self.should_retrain():
+            self.request_training()
+
+    def should_retrain(self):
+        """
+        Decide whether enough new data (or time) has accumulated to update the model.
+        Returns:
+            bool: True if the model should be retrained now.
+        """
+        if len(self.replay_buffer) < self.min_samples or self.samples_since_training == 0:
+            return False  # Only train when sufficient data is available
+        if not self.online:
+            return True
+        if self.model_version == 0 and self.training_requests == 0:
+            return True  # The first model is trained as soon as there is enough data
+        if self.samples_since_training >= self.retrain_every:
+            return True
+        return self.retrain_interval is not None and self.clock.now() - self.last_training_time >= self.retrain_interval
+
+    @property
+    def training_worker(self):
+        """Background training worker, started on first use."""
+        if self._training_worker is None:
+            self._training_worker = TrainingWorker(self.train_model, name=f"{self.name} training", log=self.log)
+        return self._training_worker
+
+    def request_training(self):
+        """
+        Train the model on a snapshot of the training data, on the background worker if enabled. A persistent
+        replay buffer is flushed first, so a crash loses at most the samples since the last training request.
+        Returns:
+            None
+        """
+        self.replay_buffer.flush()
+        data = self.replay_buffer.recent(self.window if self.online else None)  # Copy, unaffected by new samples
+        self.training_requests += 1
+        self.samples_since_training = 0
+        self.last_training_time = self.clock.now()
+        if self.background_training:
+            self.training_worker.submit(data)
+        else:
+            self.train_model(data)
+
+    def train_model(self, data):
+        """
+        Train the task model and publish the new version.
+        Online, trees fitted on the most recent samples are added to the forest and the oldest trees beyond
+        max_trees are retired, so each update costs the same no matter how long the history is.
+        Args:
+            data (dict): Training columns ("features" and "outcomes") from the replay buffer.
+
+        Returns:
+            object: Published model.
+        """
+        start_time = time.perf_counter()
+        trained_from = self.task_model
+        if isinstance(trained_from, MappedForest) and trained_from.rebuildable:
+            base, rebuilt = trained_from.to_estimator(), True  # A checkpointed model is rebuilt to keep training
+        elif isinstance(trained_from, MappedForest):
+            # Saved by another scikit-learn version: it keeps serving predictions until a new model is trained
+            base, rebuilt = clone(self._untrained_model), True
+        else:
+            base, rebuilt = trained_from, False
+        if not self.online:
+            model = clone(base) if self.background_training else base
+            model.fit(data["features"], data["outcomes"])
+        else:
+            # In the background the published model is never modified in place: a copy is trained and swapped in
+            model = copy.deepcopy(base) if self.background_training and not rebuilt else base
+            if hasattr(model, "estimators_"):
+                model.n_estimators = len(model.estimators_) + self.trees_per_update
+            model.fit(data["features"], data["outcomes"])
+            if len(model.estimators_) > self.max_trees:
+                del model.estimators_[:len(model.estimators_) - self.max_trees]
+                model.n_estimators = len(model.estimators_)
+        self.publish_model(model, time.perf_counter() - start_time, trained_from=trained_from)
+        return model
+
+    def publish_model(self, model, training_duration, trained_from=None):
+        """
+        Make a trained model the one used for inference.
+        Args:
+            model (object): Trained model.
+            training_duration (float): Seconds spent training it.
+            trained_from (object): Model the training started from; if the task model was replaced since
+                (e.g., by load_checkpoint), the trained model is stale and is discarded.
+
+        Returns:
+            int: Version of the published model, or None if it was discarded.
+        """
+        with self._model_lock:
+            if trained_from is not None and self.task_model is not trained_from:
+                self.log("Trained model discarded: the task model was replaced while it was training.")
+                return None
+            self.task_model = model  # Single reference swap: readers see the old or the new model, never a partial one
+            self.model_version += 1
+            self.training_count += 1
+            version = self.model_version
+        self.last_training_duration = training_duration
+        self.training_durations.record(training_duration)
+        self.log(f"Task model version {version} published ({len(getattr(model, 'estimators_', []))} trees, "
+                 f"trained in {training_duration * 1000:.0f}ms).")
+        if self.checkpoints is not None:
+            self.save_checkpoint()
+        return version
+
+    def save_checkpoint(self):
+        """
+        Save the current task model as a new checkpoint version.
+        Returns:
+            int: Checkpoint version.
+        """
+        if self.checkpoints is None:
+            raise RuntimeError("No checkpoint directory configured")
+        with self._model_lock:
+            model = self.task_model
+            metadata = {"model_version": self.model_version, "training_count": self.training_count}
+        if isinstance(model, MappedForest):
+            return model.version  # Unchanged since it was loaded
+        version = self.checkpoints.save(model, metadata=metadata)
+        self.checkpoint_version = version
+        self.log(f"Task model version {metadata['model_version']} saved as checkpoint {version}.")
+        return version
+
+    def load_checkpoint(self, version=None):
+        """
+        Use a checkpointed model for inference. Forests are memory-mapped: loading takes about as long for
+        a large forest as a small one, and processes loading the same checkpoint share its memory.
+        Args:
+            version (int): Checkpoint version (the newest if None).
+
+        Returns:
+            object: Loaded model.
+        """
+        if self.checkpoints is None:
+            raise RuntimeError("No checkpoint directory configured")
+        start_time = time.perf_counter()
+        model = self.checkpoints.load(version)
+        manifest = self.checkpoints.manifest(version)
+        with self._model_lock:
+            self.task_model = model  # Training that started from the previous model won't overwrite it
+            self.checkpoint_version = manifest["version"]
+            self.model_version = manifest["metadata"].get("model_version", self.model_version)
+            self.training_count = manifest["metadata"].get("training_count", self.training_count)
+        self.log(f"Task model version {self.model_version} loaded from checkpoint {self.checkpoint_version} "
+                 f"in {(time.perf_counter() - start_time) * 1000:.0f}ms.")
+        return model
+
+    def predict_task_outcome(self, task_features):
+        """
+        Predict the outcome of a task with the latest published model.
+        Args:
+            task_features (list): Features describing the task.
+
+        Returns:
+            float: Predicted outcome, or None before the first model is trained.
+        """
+        model = self.task_model
+        if not isinstance(model, MappedForest) and not hasattr(model, "estimators_"):
+            return None
+        return float(model.predict([task_features])[0])
+
+    def training_metrics(self):
+        """
+        Report model versions and training durations.
+        Returns:
+            dict: Model version, training count, last and p50/p95 training duration (s) and worker state.
+        """
+        percentiles = self.training_durations.percentiles((50, 95))
+        worker = self._training_worker
+        return {
+            "model_version": self.model_version,
+            "trainings": self.training_count,
+            "last_duration": self.last_training_duration,
+            "duration_p50": percentiles[50],
+            "duration_p95": percentiles[95],
+            "training_in_progress": worker.busy() if worker else False,
+            "failed": worker.failed if worker else 0,
+        }
+
+    def wait_for_training(self, timeout=None):
+        """
+        Wait until background training has finished.
+        Args:
+            timeout (float): Maximum seconds to wait (None waits indefinitely).
+
+        Returns:
+            bool: True if no training is running or waiting.
+        """
+        return self._training_worker is None or self._training_worker.wait_until_idle(timeout)
+
+    def close(self):
+        """
+        Finish waiting training, stop the training worker and flush the replay buffer.
+        Returns:
+            None
+        """
+        if self._training_worker is not None:
+            self._training_worker.close()
+            self._training_worker = None
+        self.replay_buffer.flush()
+        if self._reward_pool is not None:
+            self._reward_pool.shutdown()
+            self._reward_pool = None
+
+    def reward_evaluator(self, reward_function, vectorized=False, deterministic=False):
+        """
+        Get an evaluator for a reward function. Evaluators of deterministic reward functions are kept (up to
+        32), so rewards memoized by one decision are reused by the next.
+        Args:
+            reward_function (function): Function to calculate reward for actions.
+            vectorized (bool): The function takes an array of actions and returns an array of rewards.
+            deterministic (bool): The function always returns the same reward for the same state and action.
+
+        Returns:
+            RewardEvaluator: Evaluator of the reward function.
+        """
+        executor = None
+        if not vectorized and self.reward_workers and self._picklable(reward_function):
+            if self._reward_pool is None:
+                # Forked workers would inherit the training thread's locks, possibly held mid-operation
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._reward_pool = ProcessPoolExecutor(max_workers=self.reward_workers,
+                                                        mp_context=multiprocessing.get_context(method))
+            executor = self._reward_pool
+        if not deterministic:
+            return RewardEvaluator(reward_function, vectorized=vectorized, executor=executor)
+        key = (reward_function, vectorized)
+        evaluator = self._reward_evaluators.get(key)
+        if evaluator is None:
+            evaluator = RewardEvaluator(reward_function, vectorized=vectorized, executor=executor, deterministic=True)
+            self._reward_evaluators[key] = evaluator
+            while len(self._reward_evaluators) > 32:
+                self._reward_evaluators.popitem(last=False)
+        self._reward_evaluators.move_to_end(key)
+        return evaluator
+
+    def _picklable(self, reward_function):
+        # Lambdas and local functions can't be sent to worker processes, so they are evaluated in this process.
+        # The answer is remembered per function (up to 32), as pickling one can be as slow as evaluating it.
+        try:
+            picklable = self._picklable_functions.get(reward_function)
+            hashable = True
+        except TypeError:  # Unhashable callables are checked every time
+            picklable, hashable = None, False
+        if picklable is None:
+            try:
+                pickle.dumps(reward_function)
+                picklable = True
+            except (pickle.PicklingError, AttributeError, TypeError):
+                picklable = False
+            if hashable:
+                self._picklable_functions[reward_function] = picklable
+                while len(self._picklable_functions) > 32:
+                    self._picklable_functions.popitem(last=False)
+        return picklable
 
-    def reinforcement_learning(self, action_space, reward_function):
+    def reinforcement_learning(self, action_space, reward_function, vectorized=False, deterministic=False, state=None,
+                               budget=None, strategy="ucb", batch_size=8):
         """
         Use reinforcement learning to improve task performance.
+        Rewards are evaluated in batches (vectorized, or in the reward process pool). With a budget, a bandit
+        spends it on the most promising actions, which suits noisy rewards and action spaces too large to evaluate
+        exhaustively.
         Args:
             action_space (list): List of possible actions.
             reward_function (function): Function to calculate reward for actions.
+            vectorized (bool): The reward function takes an array of actions and returns an array of rewards.
+            deterministic (bool): The reward function always returns the same reward for the same state and
+                action, so rewards can be memoized.
+            state (object): Hashable state the rewards depend on (keys memoized rewards).
+            budget (int): Number of reward evaluations for the bandit, at least 1 (None evaluates every action
+                once).
+            strategy (str): Bandit strategy when sampling, "ucb" or "thompson".
+            batch_size (int): Actions evaluated per bandit round.
 
         Returns:
             str: Optimal action based on the reward.
         """
+        if budget is not None and budget < 1:
+            raise ValueError(f"Reinforcement learning needs a budget of at least one evaluation, got {budget}")
         self.log("Performing reinforcement learning...")
-        rewards = [reward_function(action) for action in action_space]
-        optimal_action = action_space[np.argmax(rewards)]
-        self.log(f"Optimal action determined: {optimal_action} with reward {max(rewards)}")
+        evaluator = self.reward_evaluator(reward_function, vectorized=vectorized, deterministic=deterministic)
+        if budget is None:
+            rewards = evaluator.evaluate(action_space, state)
+            self.reward_evaluations += len(action_space)
+            best = int(np.argmax(rewards))
+            best_reward = rewards[best]
+        else:
+            sampler = BanditSampler(len(action_space), strategy=strategy)
+            spent = 0
+            while spent < budget:
+                indices = sampler.select(min(batch_size, budget - spent))
+                rewards = evaluator.evaluate([action_space[i] for i in indices], state)
+                sampler.update(indices, rewards)
+                spent += len(indices)
+            self.reward_evaluations += spent
+            best, best_reward = sampler.best()
+        optimal_action = action_space[best]
+        self.log(f"Optimal action determined: {optimal_action} with reward {best_reward}")
         return optimal_action
 
     def transfer_learning(self, source_task_model, new_task_data):
@@ -76,11 +422,22 @@ class LearningAgent:
             new_task_data (list): Data for the new task (features, outcomes).
 
         Returns:
-            RandomForestRegressor: Updated model adapted to the new task.
+            RandomForestRegressor: Updated model adapted to the new task (the source model is left unchanged).
         """
         self.log("Starting transfer learning...")
         features, outcomes = zip(*new_task_data)
-        target_task_model = source_task_model
+        if isinstance(source_task_model, MappedForest) and source_task_model.rebuildable:
+            target_task_model = source_task_model.to_estimator()
+        elif isinstance(source_task_model, MappedForest):
+            self.log(f"Checkpoint {source_task_model.version} can't be rebuilt (saved with scikit-learn "
+                     f"{source_task_model.sklearn_version}); training a new model on the new task only.")
+            target_task_model = clone(self._untrained_model)
+        elif getattr(source_task_model, "warm_start", False):
+            target_task_model = copy.deepcopy(source_task_model)  # Keeps the source trees and adds new ones
+        else:
+            target_task_model = clone(source_task_model)  # Fitting replaces every tree, so only parameters are copied
+        if getattr(target_task_model, "warm_start", False) and hasattr(target_task_model, "estimators_"):
+            target_task_model.n_estimators = len(target_task_model.estimators_) + self.trees_per_update
         target_task_model.fit(features, outcomes)
         self.log("Transfer learning completed successfully.")
         return target_task_model
@@ -99,8 +456,8 @@ class LearningAgent:
         task_features = [random.random() for _ in range(5)]  # Example task features
         feedback = self.simulate_human_feedback(task_type)
 
-        # Update task model with feedback
-        self.update_task_model(task_features, feedback)
+        # Update task model with feedback, which is also the task's reward
+        self.update_task_model(task_features, feedback, reward=feedback)
 
         # Use reinforcement learning for optimization
         action_space = ["Action A", "Action B", "Action C"]
@@ -115,7 +472,7 @@ class LearningAgent:
         Returns:
             float: Average reward over the history.
         """
-        if not self.reward_history:
+        if len(self.reward_history) == 0:
             self.log("No performance data available.")
             return 0.0
         average_reward = np.mean(self.reward_history)
@@ -1,6 +1,8 @@
+import asyncio
 import numpy as np
-import time
 from scipy.spatial.transform import Rotation as R
+from utils.clock import RealClock
+from .grasp_cache import GraspPlanCache
 
 
 class ManipulationAgent:
@@ -9,8 +11,14 @@ class ManipulationAgent:
     Utilizes state-of-the-art techniques for object recognition, grasp planning, and motion execution.
     """
 
-    def __init__(self, name="Manipulation Agent"):
+    def __init__(self, name="Manipulation Agent", clock=None, grasp_cache=None):
         self.name = name
+        self.grasp_cache = grasp_cache  # Optional GraspPlanCache reused across repeated objects
+        self.clock = clock or RealClock()  # Use a VirtualClock to simulate motion without blocking
+        self.reach_duration = 1.0  # Simulated time (s) for reaching the grip point
+        self.gripper_close_duration = 0.5  # Simulated time (s) for closing the gripper
+        self.move_duration = 1.0  # Simulated time (s) for moving an object to its destination
+        self.max_gripper_opening = 0.15  # Widest object span (m) the gripper can close around
 
     def log(self, message):
         """Log messages with the agent's name."""
@@ -37,11 +45,13 @@ class ManipulationAgent:
             self.log(f"Object '{object_name}' not found!")
             raise ValueError(f"Unable to recognize object: {object_name}")
 
-    def plan_grasp(self, object_metadata):
+    def plan_grasp(self, object_metadata, object_type=None):
         """
         Plan the grasping strategy using object's metadata and grasp planning algorithms.
         Args:
             object_metadata (dict): Metadata of the object (position, orientation, dimensions).
+            object_type (str): Optional object type or SKU; when a grasp cache is configured, plans for
+                the same type and dimensions are reused instead of recomputed.
 
         Returns:
             dict: Grasp configuration including grip point and approach vector.
@@ -50,16 +60,71 @@ class ManipulationAgent:
         position = np.array(object_metadata["position"])
         orientation = R.from_euler('xyz', object_metadata["orientation"]).as_matrix()
 
-        # Example grasp planning using contact points and optimal force application
-        grip_point = position + np.array([0, 0, object_metadata["dimensions"][2] / 2])
+        use_cache = self.grasp_cache is not None and object_type is not None
+        if use_cache:
+            grasp_config = self.grasp_cache.lookup(object_type, object_metadata["dimensions"], position, orientation)
+            if grasp_config is not None:
+                self.log(f"Reusing cached grasp for '{object_type}' at grip point {grasp_config['grip_point']}.")
+                return grasp_config
+
+        # Example grasp planning using contact points and optimal force application: grip the top face of the
+        # object, offset along the object's own Z-axis so the plan moves with the object's pose
+        grip_point = position + orientation @ np.array([0, 0, object_metadata["dimensions"][2] / 2])
         approach_vector = -orientation[:, 2]  # Approach along the negative Z-axis of the object
         grasp_config = {
             "grip_point": grip_point,
             "approach_vector": approach_vector
         }
+        if use_cache:
+            self.grasp_cache.store(object_type, object_metadata["dimensions"], position, orientation, grasp_config)
         self.log(f"Grasp planned at grip point {grip_point} with approach vector {approach_vector}.")
         return grasp_config
 
+    def plan_grasps_batch(self, positions, orientations, dimensions, top_k=5):
+        """
+        Plan and rank many grasp candidates in one vectorized pass.
+        Candidates can be many objects or many candidate orientations for one object: inputs broadcast
+        against each other, so a single position and dimensions can be paired with N orientations.
+        Args:
+            positions (array-like): Object positions, shape (N, 3) or (3,).
+            orientations (array-like): Euler angles per candidate, shape (N, 3) or (3,), same convention as plan_grasp.
+            dimensions (array-like): Object dimensions [length, width, height], shape (N, 3) or (3,).
+            top_k (int): Number of ranked grasps to return.
+
+        Returns:
+            list: Up to top_k grasp configurations (candidate index, grip point, approach vector, score), best first.
+        """
+        positions, orientations, dimensions = np.broadcast_arrays(
+            np.atleast_2d(np.asarray(positions, dtype=float)),
+            np.atleast_2d(np.asarray(orientations, dtype=float)),
+            np.atleast_2d(np.asarray(dimensions, dtype=float)),
+        )
+        rotations = R.from_euler('xyz', orientations).as_matrix()  # (N, 3, 3)
+
+        grip_points = positions + rotations[:, :, 2] * (dimensions[:, 2:3] / 2)  # Top face, in the object's frame
+        approach_vectors = -rotations[:, :, 2]
+
+        # Quality: prefer top-down approaches and objects that leave margin inside the gripper opening
+        alignment = np.clip(-approach_vectors[:, 2], 0.0, 1.0)
+        grip_width = np.minimum(dimensions[:, 0], dimensions[:, 1])
+        margin = np.clip(1.0 - grip_width / self.max_gripper_opening, 0.0, 1.0)
+        scores = alignment * margin
+
+        if top_k <= 0 or len(scores) == 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k] if top_k < len(scores) else np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        self.log(f"Scored {len(scores)} grasp candidates; best score {scores[best[0]]:.3f}.")
+        return [
+            {
+                "index": int(i),
+                "grip_point": grip_points[i],
+                "approach_vector": approach_vectors[i],
+                "score": float(scores[i]),
+            }
+            for i in best
+        ]
+
     def execute_grasp(self, grasp_config):
         """
         Execute the grasp using the robot's end effector.
@@ -70,15 +135,34 @@ class ManipulationAgent:
             bool: True if the grasp was successful, False otherwise.
         """
         self.log("Executing grasp...")
+        start_time = self.clock.now()
         grip_point = grasp_config["grip_point"]
         approach_vector = grasp_config["approach_vector"]
 
         # Simulate robotic arm movement (forward kinematics/motion planning)
-        time.sleep(1)  # Simulated time for reaching the grip point
+        self.clock.sleep(self.reach_duration)  # Simulated time for reaching the grip point
         self.log(f"Approached grip point at {grip_point} with vector {approach_vector}.")
         self.log("Closing gripper...")
-        time.sleep(0.5)  # Simulate gripper closure
-        self.log("Grasp executed successfully!")
+        self.clock.sleep(self.gripper_close_duration)  # Simulate gripper closure
+        self.log(f"Grasp executed successfully in {self.clock.now() - start_time:.2f}s!")
+        return True
+
+    async def execute_grasp_async(self, grasp_config):
+        """
+        Execute the grasp without blocking the event loop.
+        Args:
+            grasp_config (dict): Grasp configuration including grip point and approach vector.
+
+        Returns:
+            bool: True if the grasp was successful, False otherwise.
+        """
+        self.log("Executing grasp...")
+        start_time = self.clock.now()
+        await self.clock.sleep_async(self.reach_duration)
+        self.log(f"Approached grip point at {grasp_config['grip_point']} with vector {grasp_config['approach_vector']}.")
+        self.log("Closing gripper...")
+        await self.clock.sleep_async(self.gripper_close_duration)
+        self.log(f"Grasp executed successfully in {self.clock.now() - start_time:.2f}s!")
         return True
 
     def move_object(self, destination):
@@ -91,24 +175,33 @@ class ManipulationAgent:
             bool: True if the object was successfully moved, False otherwise.
         """
         self.log(f"Moving object to destination: {destination}")
-        time.sleep(1)  # Simulated time for motion planning and execution
-        self.log(f"Object successfully moved to {destination}.")
+        start_time = self.clock.now()
+        self.clock.sleep(self.move_duration)  # Simulated time for motion planning and execution
+        self.log(f"Object successfully moved to {destination} in {self.clock.now() - start_time:.2f}s.")
         return True
 
-    def perform_task(self, details):
+    async def move_object_async(self, destination):
         """
-        Perform the full manipulation task: recognize, grasp, and move the object.
+        Move the object to a specified destination without blocking the event loop.
         Args:
-            details (dict): Task details, including object name and destination.
+            destination (list): 3D coordinates of the target location.
 
         Returns:
-            bool: True if the task was successful, False otherwise.
+            bool: True if the object was successfully moved, False otherwise.
         """
-        object_name = details.get("object", "unknown object")
-        destination = details.get("destination", [0, 0, 0])
+        self.log(f"Moving object to destination: {destination}")
+        start_time = self.clock.now()
+        await self.clock.sleep_async(self.move_duration)
+        self.log(f"Object successfully moved to {destination} in {self.clock.now() - start_time:.2f}s.")
+        return True
 
-        # Simulated sensory data for object recognition
-        sensory_data = {
+    def simulate_sensory_data(self):
+        """
+        Simulate the sensory data used for object recognition.
+        Returns:
+            dict: Detected objects with position, orientation and dimensions.
+        """
+        return {
             "target": {
                 "position": [0.5, 0.3, 0.1],
                 "orientation": [0, 0, 90],  # Euler angles (degrees)
@@ -116,12 +209,30 @@ class ManipulationAgent:
             }
         }
 
+    def perform_task(self, details):
+        """
+        Perform the full manipulation task: recognize, grasp, and move the object.
+        Args:
+            details (dict): Task details, including object name, destination and optionally the
+                object_metadata produced by an upstream recognition task.
+
+        Returns:
+            bool: True if the task was successful, False otherwise.
+        """
+        object_name = details.get("object", details.get("object_name", "unknown object"))
+        destination = details.get("destination", [0, 0, 0])
+
+        # Simulated sensory data for object recognition
+        sensory_data = self.simulate_sensory_data()
+
         try:
-            # Recognize object
-            object_metadata = self.recognize_object(object_name, sensory_data)
+            # Recognize object, unless an upstream recognition task already provided its metadata
+            object_metadata = details.get("object_metadata")
+            if object_metadata is None:
+                object_metadata = self.recognize_object(object_name, sensory_data)
 
             # Plan grasp
-            grasp_config = self.plan_grasp(object_metadata)
+            grasp_config = self.plan_grasp(object_metadata, object_type=object_name)
 
             # Execute grasp
             if not self.execute_grasp(grasp_config):
@@ -140,3 +251,146 @@ class ManipulationAgent:
             self.log(f"Task failed: {e}")
             return False
 
+    def perform_task_async(self, details, timeout=None):
+        """
+        Start the full manipulation task on the running asyncio event loop without blocking the caller.
+        Several agents (e.g., one per arm) can run concurrently in the same loop.
+        Args:
+            details (dict): Task details, including object name and destination.
+            timeout (float): Optional time limit in seconds, measured on the agent's clock.
+
+        Returns:
+            ManipulationHandle: Awaitable handle yielding True if the task was successful, False otherwise.
+        """
+        return ManipulationHandle(self, details, timeout)
+
+    async def run_task_stages(self, details, publish):
+        """
+        Run the recognize, plan, grasp and move stages, publishing progress before each stage.
+        Args:
+            details (dict): Task details, including object name and destination.
+            publish (function): Callback receiving the stage name and extra event fields.
+
+        Returns:
+            bool: True if the task was successful, False otherwise.
+        """
+        object_name = details.get("object", details.get("object_name", "unknown object"))
+        destination = details.get("destination", [0, 0, 0])
+        sensory_data = self.simulate_sensory_data()
+
+        try:
+            publish("recognizing", object=object_name)
+            object_metadata = details.get("object_metadata")
+            if object_metadata is None:
+                object_metadata = self.recognize_object(object_name, sensory_data)
+
+            publish("planning")
+            grasp_config = self.plan_grasp(object_metadata, object_type=object_name)
+
+            publish("grasping")
+            if not await self.execute_grasp_async(grasp_config):
+                self.log("Grasp failed!")
+                publish("failed", error="grasp failed")
+                return False
+
+            publish("moving", destination=destination)
+            if not await self.move_object_async(destination):
+                self.log("Failed to move object!")
+                publish("failed", error="move failed")
+                return False
+
+            self.log("Task completed successfully!")
+            publish("completed")
+            return True
+
+        except Exception as e:
+            self.log(f"Task failed: {e}")
+            publish("failed", error=str(e))
+            return False
+
+
+class ManipulationHandle:
+    """
+    Awaitable handle for a manipulation task running on the asyncio event loop.
+    Await the handle for the task result, iterate `events()` for progress updates, or call `cancel()`.
+    """
+
+    TERMINAL_STAGES = ("completed", "failed", "cancelled", "timed_out")
+
+    def __init__(self, agent, details, timeout=None):
+        self.agent = agent
+        self.stage = "pending"
+        self._events = asyncio.Queue()
+        self._task = asyncio.ensure_future(self._run(details, timeout))
+        self._task.add_done_callback(self._on_done)
+
+    def publish(self, stage, **info):
+        """
+        Record a progress event for the task.
+        Args:
+            stage (str): Stage name (e.g., "grasping", "completed").
+            **info: Extra event fields.
+
+        Returns:
+            None
+        """
+        self.stage = stage
+        self._events.put_nowait({"stage": stage, "time": self.agent.clock.now(), **info})
+
+    async def _run(self, details, timeout):
+        work = asyncio.ensure_future(self.agent.run_task_stages(details, self.publish))
+        waiters = [work]
+        if timeout is not None:
+            waiters.append(asyncio.ensure_future(self.agent.clock.sleep_async(timeout)))
+        try:
+            done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            for waiter in waiters:
+                waiter.cancel()
+            self.agent.log("Task cancelled.")
+            raise
+        for waiter in waiters[1:]:
+            waiter.cancel()
+        if work in done:
+            return work.result()
+
+        work.cancel()
+        self.agent.log(f"Task timed out after {timeout}s.")
+        self.publish("timed_out", timeout=timeout)
+        return False
+
+    def _on_done(self, task):
+        # Also covers tasks cancelled before they started running
+        if task.cancelled() and self.stage not in self.TERMINAL_STAGES:
+            self.publish("cancelled")
+
+    def __await__(self):
+        return self._task.__await__()
+
+    async def events(self):
+        """
+        Iterate over progress events until the task reaches a terminal stage.
+        Returns:
+            AsyncIterator[dict]: Events with the stage name, clock time and extra fields.
+        """
+        while True:
+            event = await self._events.get()
+            yield event
+            if event["stage"] in self.TERMINAL_STAGES:
+                return
+
+    def cancel(self):
+        """
+        Request cancellation of the task; awaiting the handle then raises asyncio.CancelledError.
+        Returns:
+            bool: True if the task was still running, False otherwise.
+        """
+        return self._task.cancel()
+
+    def done(self):
+        """
+        Check whether the task has finished.
+        Returns:
+            bool: True if the task completed, failed, timed out or was cancelled.
+        """
+        return self._task.done()
@@ -0,0 +1,244 @@
+import copy
+import json
+import os
+import pickle
+import re
+import shutil
+import time
+import uuid
+
+import numpy as np
+import sklearn
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+from sklearn.tree._tree import Tree
+
+
+class MappedForest:
+    """
+    Mapped Forest: Read-only view of a checkpointed forest regressor. The node and leaf-value arrays of all
+    trees stay in memory-mapped files, so loading only reads the checkpoint's headers, pages are read on
+    first use, and every process that loads the same checkpoint shares one copy in the OS page cache.
+    Predictions traverse the mapped arrays directly, whatever scikit-learn version saved them; to_estimator()
+    rebuilds a scikit-learn forest when one is needed (e.g., to keep training), which needs the same version.
+    """
+
+    def __init__(self, path):
+        self.path = path  # Checkpoint version directory
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest["version"]
+        self.n_trees = self.manifest["n_trees"]
+        self.sklearn_version = self.manifest["sklearn_version"]  # Version of scikit-learn that saved the forest
+        # Only the version that pickled the forest's parameters and fitted attributes can restore them
+        self.rebuildable = self.sklearn_version == sklearn.__version__
+        self.nodes = np.load(os.path.join(path, "nodes.npy"), mmap_mode="r")  # Nodes of all trees, tree after tree
+        self.values = np.load(os.path.join(path, "values.npy"), mmap_mode="r")  # Leaf values, aligned with nodes
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))  # First node of each tree, plus the total
+        self.max_depths = np.load(os.path.join(path, "max_depths.npy"))
+
+    def predict(self, X):
+        """
+        Predict with the average of the trees, like the forest it was saved from.
+        Args:
+            X (array): Samples, shape (n_samples, n_features).
+
+        Returns:
+            np.array: Predictions, shape (n_samples,) (or (n_samples, n_outputs) for multi-output forests).
+        """
+        X = np.asarray(X, dtype=np.float32)  # Trees split on float32 features
+        left, right = self.nodes["left_child"], self.nodes["right_child"]
+        feature, threshold = self.nodes["feature"], self.nodes["threshold"]
+        missing_go_to_left = self.nodes["missing_go_to_left"] if "missing_go_to_left" in self.nodes.dtype.names else None
+        rows = np.arange(len(X))[:, None]
+        roots = self.offsets[:-1]
+        node = np.repeat(roots[None, :], len(X), axis=0)  # Current node of every (sample, tree) pair
+        for _ in range(int(self.max_depths.max(initial=0))):
+            child = left[node]
+            internal = child != -1
+            if not internal.any():
+                break
+            value = X[rows, np.where(internal, feature[node], 0)]
+            go_left = value <= threshold[node]
+            if missing_go_to_left is not None:
+                go_left = np.where(np.isnan(value), missing_go_to_left[node].astype(bool), go_left)
+            node = np.where(internal, np.where(go_left, child, right[node]) + roots, node)
+        predictions = self.values[node, :, 0].mean(axis=1)
+        return predictions[:, 0] if predictions.shape[1] == 1 else predictions
+
+    def to_estimator(self):
+        """
+        Rebuild the scikit-learn forest (copying the trees into memory). Raises ValueError if the forest was
+        saved by another scikit-learn version (see rebuildable).
+        Returns:
+            object: Fitted forest, independent of the checkpoint files.
+        """
+        if not self.rebuildable:
+            raise ValueError(f"Checkpoint {self.version} was saved with scikit-learn {self.sklearn_version}, "
+                             f"not {sklearn.__version__}: its forest can predict but not be rebuilt")
+        with open(os.path.join(self.path, "skeleton.pkl"), "rb") as f:
+            model = pickle.load(f)
+        n_classes = np.ones(model.n_outputs_, dtype=np.intp)
+        for i, estimator in enumerate(model.estimators_):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            tree = Tree(model.n_features_in_, n_classes, model.n_outputs_)
+            tree.__setstate__({
+                "max_depth": int(self.max_depths[i]),
+                "node_count": int(end - start),
+                "nodes": np.ascontiguousarray(self.nodes[start:end]),
+                "values": np.ascontiguousarray(self.values[start:end]),
+            })
+            estimator.tree_ = tree
+        return model
+
+
+class ModelCheckpointStore:
+    """
+    Model Checkpoint Store: Versioned model checkpoints in a directory (v000001, v000002, ...). Forest
+    regressors are stored as flat NumPy arrays that load memory-mapped (see MappedForest); other models are
+    pickled. Each version is written to a temporary directory and renamed into place, so readers never see
+    a partial checkpoint, and only the newest versions are kept. Several processes can save to the same
+    directory: a writer that loses the race for a version number takes the next one.
+    """
+
+    VERSION_PATTERN = re.compile(r"^v(\d+)$")
+
+    def __init__(self, directory, keep=5):
+        if keep is not None and keep < 1:
+            raise ValueError(f"At least one checkpoint version must be kept, got keep={keep}")
+        self.directory = directory
+        self.keep = keep  # Number of versions kept, at least 1 (None keeps all)
+        os.makedirs(directory, exist_ok=True)
+
+    def versions(self):
+        """
+        List the saved checkpoint versions.
+        Returns:
+            list: Versions, oldest first.
+        """
+        matches = (self.VERSION_PATTERN.match(name) for name in os.listdir(self.directory))
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    def latest_version(self):
+        """Return the newest checkpoint version, or None if there is none."""
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def path(self, version):
+        """Return the directory of a checkpoint version."""
+        return os.path.join(self.directory, f"v{version:06d}")
+
+    def save(self, model, metadata=None):
+        """
+        Save a model as a new checkpoint version.
+        Args:
+            model (object): Fitted model.
+            metadata (dict): JSON-serializable details stored in the manifest (e.g., training counters).
+
+        Returns:
+            int: Version of the checkpoint.
+        """
+        temp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")  # Private to this writer
+        os.makedirs(temp_path)
+        try:
+            version = self._write(model, metadata, temp_path)
+        except BaseException:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            raise
+        self._prune()
+        return version
+
+    def _write(self, model, metadata, temp_path):
+        manifest = {
+            "created": time.time(),
+            "model_class": f"{type(model).__module__}.{type(model).__name__}",
+            "sklearn_version": sklearn.__version__,
+            "metadata": metadata or {},
+        }
+        if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)) and hasattr(model, "estimators_"):
+            manifest.update(self._save_forest(model, temp_path), format="forest")
+        else:
+            with open(os.path.join(temp_path, "model.pkl"), "wb") as f:
+                pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            manifest["format"] = "pickle"
+        version = (self.latest_version() or 0) + 1
+        while True:
+            manifest["version"] = version
+            with open(os.path.join(temp_path, "manifest.json"), "w") as f:
+                json.dump(manifest, f)
+            try:
+                # Renaming onto an existing (never empty) version directory fails, so a version is taken only once
+                os.rename(temp_path, self.path(version))
+                return version
+            except OSError:
+                if not os.path.exists(self.path(version)):
+                    raise
+                version = max(version, self.latest_version() or 0) + 1  # Another writer took this version
+
+    @staticmethod
+    def _save_forest(model, path):
+        # Every tree is read through its pickling state, whose arrays are plain copies of the tree's buffers
+        states = [estimator.tree_.__getstate__() for estimator in model.estimators_]
+        counts = [state["node_count"] for state in states]
+        np.save(os.path.join(path, "nodes.npy"), np.concatenate([state["nodes"] for state in states]))
+        np.save(os.path.join(path, "values.npy"), np.concatenate([state["values"] for state in states]))
+        np.save(os.path.join(path, "offsets.npy"), np.concatenate([[0], np.cumsum(counts)]).astype(np.int64))
+        np.save(os.path.join(path, "max_depths.npy"), np.array([state["max_depth"] for state in states], dtype=np.int64))
+        # The forest without its trees: parameters and fitted attributes needed to rebuild it
+        skeleton = copy.copy(model)
+        skeleton.estimators_ = []
+        for estimator in model.estimators_:
+            estimator = copy.copy(estimator)
+            del estimator.tree_
+            skeleton.estimators_.append(estimator)
+        with open(os.path.join(path, "skeleton.pkl"), "wb") as f:
+            pickle.dump(skeleton, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return {"n_trees": len(states), "n_features": model.n_features_in_, "n_outputs": model.n_outputs_}
+
+    def manifest(self, version=None):
+        """
+        Read the manifest of a checkpoint.
+        Args:
+            version (int): Checkpoint version (the newest if None).
+
+        Returns:
+            dict: Manifest (version, format, model class, metadata, ...).
+        """
+        version = self._resolve(version)
+        with open(os.path.join(self.path(version), "manifest.json")) as f:
+            return json.load(f)
+
+    def load(self, version=None):
+        """
+        Load a checkpoint. Forests are memory-mapped rather than read. Pickled models are only loaded by the
+        scikit-learn version that saved them (ValueError otherwise), as pickles don't carry across versions.
+        Args:
+            version (int): Checkpoint version (the newest if None).
+
+        Returns:
+            object: MappedForest for forest checkpoints, otherwise the unpickled model.
+        """
+        version = self._resolve(version)
+        path = self.path(version)
+        manifest = self.manifest(version)
+        if manifest["format"] == "forest":
+            return MappedForest(path)
+        if manifest["sklearn_version"] != sklearn.__version__:
+            raise ValueError(f"Checkpoint {version} was saved with scikit-learn {manifest['sklearn_version']}, "
+                             f"not {sklearn.__version__}")
+        with open(os.path.join(path, "model.pkl"), "rb") as f:
+            return pickle.load(f)
+
+    def _resolve(self, version):
+        if version is None:
+            version = self.latest_version()
+            if version is None:
+                raise FileNotFoundError(f"No model checkpoints in '{self.directory}'")
+        return version
+
+    def _prune(self):
+        if self.keep is None:
+            return
+        # Processes still using a removed version keep their mapping (on POSIX the files live until unmapped)
+        versions = self.versions()
+        for version in versions[:len(versions) - self.keep]:
+            shutil.rmtree(self.path(version), ignore_errors=True)
@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.spatial import cKDTree
 from scipy.spatial.transform import Rotation as R
 
 
@@ -18,6 +19,7 @@ class MotorControlAgent:
             "joint_3": (-90, 90),
         }
         self.joint_angles = {key: 0 for key in self.joint_limits}  # Initial joint angles
+        self.collision_clearance = 0.05  # Minimum distance (m) kept between the swept path and obstacles
 
     def log(self, message):
         """Log messages with the agent's name."""
@@ -125,15 +127,80 @@ class MotorControlAgent:
         self.log(f"Moved successfully to {self.current_position} with orientation {self.current_orientation.as_euler('xyz', degrees=True)}")
         return True
 
-    def trajectory_execution(self, trajectory_points):
+    def check_trajectory_collision(self, trajectory_points, obstacles, clearance=None):
+        """
+        Check the swept volume of a trajectory against obstacle points in a single vectorized pass.
+        Each segment between consecutive waypoints (starting from the current position) is treated as a
+        capsule of radius `clearance`. Obstacle points are indexed with a KD-tree so that only points near
+        a segment are tested against it.
+        Args:
+            trajectory_points (list): List of waypoints, each containing position [x, y, z] and orientation [roll, pitch, yaw].
+            obstacles (list or np.array): Obstacle points as (x, y, z) coordinates (e.g., from SensoryAgent.detect_obstacles).
+            clearance (float): Minimum allowed distance in meters between the path and any obstacle.
+
+        Returns:
+            dict: First colliding segment (index, start, end, obstacle, distance), or None if the path is clear.
+        """
+        clearance = self.collision_clearance if clearance is None else clearance
+        obstacles = np.asarray(obstacles, dtype=float).reshape(-1, 3)
+        if len(trajectory_points) == 0 or len(obstacles) == 0:
+            return None
+
+        waypoints = np.array([self.current_position] + [point["position"] for point in trajectory_points], dtype=float)
+        starts, ends = waypoints[:-1], waypoints[1:]
+        segments = ends - starts
+
+        # Broad phase: every obstacle within half a segment length (plus clearance) of the segment midpoint
+        tree = cKDTree(obstacles)
+        radii = np.linalg.norm(segments, axis=1) / 2 + clearance
+        candidates = tree.query_ball_point((starts + ends) / 2, r=radii)
+        counts = np.fromiter((len(c) for c in candidates), dtype=np.intp, count=len(candidates))
+        if counts.sum() == 0:
+            return None
+        segment_idx = np.repeat(np.arange(len(candidates)), counts)
+        obstacle_idx = np.concatenate([c for c in candidates if c]).astype(np.intp)
+
+        # Narrow phase: exact point-to-segment distance for all candidate pairs at once
+        seg = segments[segment_idx]
+        rel = obstacles[obstacle_idx] - starts[segment_idx]
+        seg_len_sq = np.einsum("ij,ij->i", seg, seg)
+        t = np.clip(np.einsum("ij,ij->i", rel, seg) / np.where(seg_len_sq > 0, seg_len_sq, 1.0), 0.0, 1.0)
+        distances = np.linalg.norm(rel - t[:, None] * seg, axis=1)
+        hits = np.flatnonzero(distances < clearance)
+        if len(hits) == 0:
+            return None
+
+        # Pairs are grouped by ascending segment index, so the first hit is the first colliding segment
+        hit = hits[0]
+        index = int(segment_idx[hit])
+        return {
+            "segment_index": index,
+            "start": starts[index].tolist(),
+            "end": ends[index].tolist(),
+            "obstacle": obstacles[obstacle_idx[hit]].tolist(),
+            "distance": float(distances[hit]),
+        }
+
+    def trajectory_execution(self, trajectory_points, obstacles=None):
         """
         Execute a trajectory consisting of multiple waypoints.
         Args:
             trajectory_points (list): List of waypoints, each containing position [x, y, z] and orientation [roll, pitch, yaw].
+            obstacles (list or np.array): Optional obstacle points; if given, the whole trajectory is
+                validated against them before any joint is moved.
 
         Returns:
             bool: True if the entire trajectory was executed successfully, False otherwise.
         """
+        if obstacles is not None:
+            self.log(f"Validating trajectory of {len(trajectory_points)} waypoints against {len(obstacles)} obstacle points...")
+            collision = self.check_trajectory_collision(trajectory_points, obstacles)
+            if collision is not None:
+                self.log(f"Trajectory rejected: segment {collision['segment_index']} from {collision['start']} to "
+                         f"{collision['end']} passes {collision['distance']:.3f} m from obstacle {collision['obstacle']}.")
+                return False
+            self.log("Trajectory is collision-free.")
+
         self.log("Starting trajectory execution...")
         for point in trajectory_points:
             target_position = point["position"]
@@ -159,11 +226,19 @@ class MotorControlAgent:
         if task_type == "movement":
             target_position = details.get("destination", [0, 0, 0])
             target_orientation = details.get("orientation", [0, 0, 0])  # Default to no rotation
+            path = details.get("path")  # Waypoints planned by an upstream planning task, if any
+            if path:
+                trajectory_points = [
+                    {"position": list(waypoint) + [0] * (3 - len(waypoint)), "orientation": target_orientation}
+                    for waypoint in path
+                ]
+                if not self.trajectory_execution(trajectory_points, obstacles=details.get("obstacles")):
+                    return False
             return self.move_to_position(target_position, target_orientation)
 
         elif task_type == "trajectory":
             trajectory_points = details.get("trajectory", [])
-            return self.trajectory_execution(trajectory_points)
+            return self.trajectory_execution(trajectory_points, obstacles=details.get("obstacles"))
 
         else:
             self.log(f"Unknown task type '{task_type}'.")
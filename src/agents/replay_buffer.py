@@ -0,0 +1,174 @@
+import json
+import os
+import time
+
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Replay Buffer: Fixed-capacity columnar store of experience (features, outcomes, rewards, timestamps) in
+    preallocated NumPy arrays, so memory stays flat however long the robot runs. When full, new samples
+    overwrite the oldest ones (ring) or replace random ones so the buffer stays a uniform sample of
+    everything seen (reservoir). Sampling and training reads are vectorized, and the columns can be
+    memory-mapped files that persist across restarts; samples added after the last flush() are lost on a
+    crash.
+    """
+
+    POLICIES = ("ring", "reservoir")
+    COLUMNS = ("features", "outcomes", "rewards", "timestamps", "sequence")
+
+    def __init__(self, capacity=10000, feature_dim=None, policy="ring", path=None, seed=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown replacement policy: {policy}")
+        self.capacity = capacity  # Maximum number of stored samples
+        self.feature_dim = feature_dim  # Inferred from the first sample if None
+        self.policy = policy
+        self.path = path  # Directory of memory-mapped columns (None keeps them in memory)
+        self.size = 0  # Number of stored samples
+        self.seen = 0  # Number of samples ever added
+        self.rng = np.random.default_rng(seed)
+        self.columns = None  # Column name -> array, allocated on the first sample
+        if path and os.path.exists(os.path.join(path, "state.json")):
+            self._open()
+        elif path and any(os.path.exists(os.path.join(path, f"{name}.npy")) for name in self.COLUMNS):
+            # Without their state the columns can't be read, and allocating new ones would overwrite them
+            raise FileExistsError(f"Replay buffer columns in '{path}' have no state.json; move or delete them first")
+
+    def _allocate(self, feature_dim):
+        self.feature_dim = feature_dim
+        shapes = {
+            "features": ((self.capacity, feature_dim), np.float64),
+            "outcomes": ((self.capacity,), np.float64),
+            "rewards": ((self.capacity,), np.float64),
+            "timestamps": ((self.capacity,), np.float64),
+            "sequence": ((self.capacity,), np.int64),  # Insertion number of each sample
+        }
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            self.columns = {
+                name: np.lib.format.open_memmap(os.path.join(self.path, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+                for name, (shape, dtype) in shapes.items()
+            }
+            self.flush()  # The state is written with the columns, so they are never left without it
+        else:
+            self.columns = {name: np.zeros(shape, dtype=dtype) for name, (shape, dtype) in shapes.items()}
+
+    def _open(self):
+        with open(os.path.join(self.path, "state.json")) as f:
+            state = json.load(f)
+        self.capacity, self.feature_dim, self.policy = state["capacity"], state["feature_dim"], state["policy"]
+        self.size, self.seen = state["size"], state["seen"]
+        self.columns = {name: np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r+") for name in self.COLUMNS}
+
+    def add(self, features, outcome, reward=np.nan, timestamp=None):
+        """
+        Add one sample.
+        Args:
+            features (list): Feature vector.
+            outcome (float): Observed outcome.
+            reward (float): Reward (NaN if none).
+            timestamp (float): Time of the sample (now if None).
+
+        Returns:
+            int: Slot the sample was stored in, or -1 if the reservoir skipped it.
+        """
+        slots = self.add_batch([features], [outcome], [reward], None if timestamp is None else [timestamp])
+        return int(slots[0])
+
+    def add_batch(self, features, outcomes, rewards=None, timestamps=None):
+        """
+        Add many samples with vectorized writes.
+        Args:
+            features (array): Feature vectors, shape (n, feature_dim).
+            outcomes (array): Outcomes, shape (n,).
+            rewards (array): Rewards (NaN if None).
+            timestamps (array): Sample times (now if None).
+
+        Returns:
+            np.array: Slot of each sample (-1 where the reservoir skipped it).
+        """
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        count = len(features)
+        if self.columns is None:
+            self._allocate(features.shape[1])
+        sequence = self.seen + np.arange(count)
+        if self.policy == "ring":
+            slots = sequence % self.capacity
+        else:
+            # Reservoir sampling: the first samples fill the buffer, then sample i replaces a random slot
+            # with probability capacity / (i + 1)
+            slots = np.where(sequence < self.capacity, sequence, self.rng.integers(0, sequence + 1))
+            slots[slots >= self.capacity] = -1
+        stored = slots >= 0
+        values = {
+            "features": features,
+            "outcomes": np.asarray(outcomes, dtype=np.float64),
+            "rewards": np.full(count, np.nan) if rewards is None else np.asarray(rewards, dtype=np.float64),
+            "timestamps": np.full(count, time.time()) if timestamps is None else np.asarray(timestamps, dtype=np.float64),
+            "sequence": sequence,
+        }
+        for name, column in self.columns.items():
+            column[slots[stored]] = values[name][stored]
+        self.seen += count
+        self.size = min(self.seen, self.capacity)
+        return slots
+
+    def sample(self, batch_size):
+        """
+        Draw a uniform random mini-batch (with replacement).
+        Args:
+            batch_size (int): Number of samples.
+
+        Returns:
+            dict: Column name -> array of the sampled rows.
+        """
+        if self.size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        indices = self.rng.integers(0, self.size, batch_size)
+        return {name: column[indices] for name, column in self.columns.items()}
+
+    def recent(self, count=None):
+        """
+        Get the most recently added stored samples, oldest first.
+        Args:
+            count (int): Number of samples (all stored samples if None).
+
+        Returns:
+            dict: Column name -> array of the rows.
+        """
+        count = self.size if count is None else min(count, self.size)
+        if self.size == 0 or count == 0:
+            return {name: self._empty(name) for name in self.COLUMNS}
+        if self.policy == "ring":
+            indices = np.arange(self.seen - count, self.seen) % self.capacity
+        else:
+            sequence = self.columns["sequence"][:self.size]
+            indices = np.argpartition(sequence, self.size - count)[self.size - count:]
+            indices = indices[np.argsort(sequence[indices])]
+        return {name: column[indices] for name, column in self.columns.items()}
+
+    def _empty(self, name):
+        if name == "features":
+            return np.empty((0, self.feature_dim or 0))
+        return np.empty(0, dtype=np.int64 if name == "sequence" else np.float64)
+
+    def flush(self):
+        """
+        Write memory-mapped columns and the buffer state to disk.
+        Returns:
+            None
+        """
+        if not self.path or self.columns is None:
+            return
+        for column in self.columns.values():
+            column.flush()
+        state = {"capacity": self.capacity, "feature_dim": self.feature_dim, "policy": self.policy,
+                 "size": self.size, "seen": self.seen}
+        temp_path = os.path.join(self.path, "state.json.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(temp_path, os.path.join(self.path, "state.json"))
+
+    def __len__(self):
+        return self.size
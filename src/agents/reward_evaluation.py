@@ -0,0 +1,161 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class RewardEvaluator:
+    """
+    Reward Evaluator: Evaluates a reward function over a batch of actions in one call. Vectorized reward
+    functions receive the whole action array; other reward functions (e.g., simulation rollouts) are spread
+    over a process pool when one is given. Rewards of deterministic reward functions are memoized per
+    (state, action), so repeated decisions only evaluate new pairs.
+    """
+
+    def __init__(self, reward_function, vectorized=False, executor=None, deterministic=False, cache_size=100000):
+        self.reward_function = reward_function  # action -> reward, or action array -> reward array if vectorized
+        self.vectorized = vectorized
+        self.executor = executor  # Optional concurrent.futures executor (e.g., a ProcessPoolExecutor)
+        self.deterministic = deterministic  # Same (state, action) always gives the same reward, so it can be cached
+        self.cache_size = cache_size  # Maximum number of memoized rewards
+        self.cache = OrderedDict()  # (state, action) -> reward, least recently used first
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def evaluate(self, actions, state=None):
+        """
+        Evaluate the rewards of a batch of actions.
+        Args:
+            actions (list): Actions to evaluate.
+            state (object): Hashable state the rewards depend on (only used to key memoized rewards).
+
+        Returns:
+            np.array: Reward per action.
+        """
+        rewards = np.empty(len(actions))
+        if self.deterministic:
+            pending = []
+            with self._lock:
+                for i, action in enumerate(actions):
+                    key = (state, self._action_key(action))
+                    if key in self.cache:
+                        self.cache.move_to_end(key)
+                        rewards[i] = self.cache[key]
+                    else:
+                        pending.append(i)
+                self.hits += len(actions) - len(pending)
+                self.misses += len(pending)
+        else:
+            pending = list(range(len(actions)))
+        if not pending:
+            return rewards
+
+        batch = [actions[i] for i in pending]
+        rewards[pending] = self._evaluate_uncached(batch)
+        if self.deterministic:
+            with self._lock:
+                for i in pending:
+                    self.cache[(state, self._action_key(actions[i]))] = rewards[i]
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return rewards
+
+    @staticmethod
+    def _action_key(action):
+        # NumPy actions (e.g., rows of an action array) are keyed by their contents
+        return (action.dtype.str, action.shape, action.tobytes()) if isinstance(action, np.ndarray) else action
+
+    def _evaluate_uncached(self, actions):
+        if self.vectorized:
+            return np.asarray(self.reward_function(np.asarray(actions)), dtype=float)
+        if self.executor is not None and len(actions) > 1:
+            workers = getattr(self.executor, "_max_workers", None) or os.cpu_count() or 1
+            chunksize = max(1, len(actions) // (4 * workers))  # Few large chunks keep IPC overhead low
+            return np.fromiter(self.executor.map(self.reward_function, actions, chunksize=chunksize), dtype=float, count=len(actions))
+        return np.fromiter((self.reward_function(action) for action in actions), dtype=float, count=len(actions))
+
+
+class BanditSampler:
+    """
+    Bandit Sampler: Chooses which actions to evaluate when the action space is too large to evaluate
+    exhaustively. UCB1 favors actions whose upper confidence bound is highest; Thompson sampling draws
+    from a Gaussian posterior of each action's mean reward. Batches of distinct actions are selected per
+    round so they can be evaluated in parallel.
+    """
+
+    STRATEGIES = ("ucb", "thompson")
+
+    def __init__(self, n_actions, strategy="ucb", exploration=2.0, prior_std=1.0, seed=None):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown bandit strategy: {strategy}")
+        self.strategy = strategy
+        self.exploration = exploration  # UCB exploration weight
+        self.prior_std = prior_std  # Thompson: reward spread assumed before observations
+        self.counts = np.zeros(n_actions)
+        self.sums = np.zeros(n_actions)
+        self.squares = np.zeros(n_actions)
+        self.rng = np.random.default_rng(seed)
+
+    def select(self, batch_size=1):
+        """
+        Select distinct actions to evaluate next.
+        Args:
+            batch_size (int): Number of actions.
+
+        Returns:
+            np.array: Action indices.
+        """
+        batch_size = min(batch_size, len(self.counts))
+        untried = np.flatnonzero(self.counts == 0)
+        if len(untried):
+            # Every action is tried once before statistics are used
+            chosen = self.rng.permutation(untried)[:batch_size]
+            if len(chosen) == batch_size:
+                return chosen
+        else:
+            chosen = np.empty(0, dtype=int)
+        tried = self.counts > 0
+        means = np.divide(self.sums, self.counts, out=np.zeros_like(self.sums), where=tried)
+        if self.strategy == "ucb":
+            total = max(self.counts.sum(), 1.0)
+            scores = means + np.sqrt(self.exploration * np.log(total) / np.maximum(self.counts, 1))
+        else:
+            variances = np.divide(self.squares, self.counts, out=np.zeros_like(self.sums), where=tried) - means ** 2
+            # Spread of each action's rewards (the prior until two observations exist), shrinking with observations
+            std = np.where(self.counts > 1, np.sqrt(np.maximum(variances, 0.0)), self.prior_std)
+            scores = self.rng.normal(means, std / np.sqrt(np.maximum(self.counts, 1)))
+        scores[~tried] = -np.inf
+        scores[chosen] = -np.inf
+        remaining = batch_size - len(chosen)
+        best = np.argpartition(-scores, remaining - 1)[:remaining]
+        return np.concatenate([chosen, best])
+
+    def update(self, indices, rewards):
+        """
+        Record observed rewards.
+        Args:
+            indices (np.array): Action indices.
+            rewards (np.array): Observed reward per index.
+
+        Returns:
+            None
+        """
+        rewards = np.asarray(rewards, dtype=float)
+        np.add.at(self.counts, indices, 1)
+        np.add.at(self.sums, indices, rewards)
+        np.add.at(self.squares, indices, rewards ** 2)
+
+    def best(self):
+        """
+        Get the action with the highest mean observed reward. Raises ValueError before any reward is observed.
+        Returns:
+            tuple: (action index, mean reward).
+        """
+        tried = self.counts > 0
+        if not tried.any():
+            raise ValueError("No action has been evaluated yet")
+        means = np.where(tried, self.sums / np.maximum(self.counts, 1), -np.inf)
+        index = int(np.argmax(means))
+        return index, float(means[index])
@@ -1,5 +1,4 @@
 import numpy as np
-import cv2
 import random
 from scipy.spatial.transform import Rotation as R
 
@@ -30,6 +29,7 @@ class SensoryAgent:
                 "bounding_box": [50, 50, 150, 150],  # x_min, y_min, x_max, y_max
                 "position": [0.5, 0.3, 0.1],  # x, y, z in meters
                 "orientation": [0, 0, 90],  # Euler angles in degrees
+                "dimensions": [0.1, 0.1, 0.2],  # Length, width, height in meters
                 "confidence": 0.95  # Detection confidence
             }
         }
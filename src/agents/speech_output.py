@@ -0,0 +1,275 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+from collections import deque
+
+
+def audio_duration(path):
+    """
+    Get the duration of an audio file.
+    Args:
+        path (str): Audio file path.
+
+    Returns:
+        float: Duration in seconds for WAV files, None for other formats.
+    """
+    if not path.endswith(".wav"):
+        return None
+    with wave.open(path, "rb") as audio:
+        return audio.getnframes() / audio.getframerate()
+
+
+class NullAudioSink:
+    """
+    Audio sink that plays nothing (e.g., headless servers and tests). It records what was played and, in
+    real-time mode, takes as long as the audio would, so queueing and preemption behave like a speaker.
+    """
+
+    def __init__(self, realtime=False):
+        self.realtime = realtime  # Block for the audio's duration while "playing"
+        self.played = []  # Audio files played to the end
+        self.stopped = []  # Audio files interrupted by stop()
+        self._stop = threading.Event()
+        self._armed = False  # An utterance is playing or about to play, so stop() applies to it
+        self._lock = threading.Lock()
+
+    def prepare(self):
+        """Arm the sink for the next utterance, so a stop() issued before its playback begins still interrupts it."""
+        with self._lock:
+            self._stop.clear()
+            self._armed = True
+
+    def play(self, path):
+        """Play an audio file to the end; returns False if stop() interrupted it."""
+        with self._lock:
+            if not self._armed:  # Not prepared: stop requests from before this utterance don't apply
+                self._stop.clear()
+                self._armed = True
+        try:
+            duration = audio_duration(path) if self.realtime else None
+            interrupted = self._stop.wait(duration) if duration else self._stop.is_set()
+        finally:
+            with self._lock:
+                self._armed = False
+                self._stop.clear()
+        (self.stopped if interrupted else self.played).append(path)
+        return not interrupted
+
+    def stop(self):
+        """Interrupt the utterance being played (or prepared); does nothing between utterances."""
+        with self._lock:
+            if self._armed:
+                self._stop.set()
+
+
+class FileAudioSink(NullAudioSink):
+    """Audio sink that copies every played utterance into a directory, in order (e.g., to review headless runs)."""
+
+    def __init__(self, directory, realtime=False):
+        super().__init__(realtime)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def play(self, path):
+        finished = super().play(path)
+        if finished:
+            shutil.copyfile(path, os.path.join(self.directory, f"{len(self.played):06d}_{os.path.basename(path)}"))
+        return finished
+
+
+class SystemAudioSink:
+    """Audio sink that plays through the platform's command-line player (start, afplay, aplay, mpg123 or ffplay)."""
+
+    def __init__(self):
+        self._process = None
+        self._armed = False  # An utterance is playing or about to play, so stop() applies to it
+        self._stop_requested = False
+        self._lock = threading.Lock()
+
+    def prepare(self):
+        """Arm the sink for the next utterance, so a stop() issued before its playback begins still interrupts it."""
+        with self._lock:
+            self._stop_requested = False
+            self._armed = True
+
+    @staticmethod
+    def player_command(path):
+        """
+        Build the command that plays an audio file on this platform.
+        Args:
+            path (str): Audio file path.
+
+        Returns:
+            list: Command line, or None if no supported player is installed.
+        """
+        if sys.platform.startswith("win"):
+            return ["cmd", "/c", "start", "/wait", "", path]
+        if sys.platform == "darwin":
+            return ["afplay", path]
+        players = [["aplay", "-q"]] if path.endswith(".wav") else []
+        players += [["mpg123", "-q"], ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]]
+        for player in players:
+            if shutil.which(player[0]):
+                return player + [path]
+        return None
+
+    @classmethod
+    def available(cls):
+        """Return True if a player for MP3 audio is installed."""
+        return cls.player_command("speech.mp3") is not None
+
+    def play(self, path):
+        """Play an audio file to the end; returns False if stop() interrupted it."""
+        command = self.player_command(path)
+        if command is None:
+            raise RuntimeError(f"No audio player available for '{path}'")
+        with self._lock:
+            if not self._armed:  # Not prepared: stop requests from before this utterance don't apply
+                self._stop_requested = False
+                self._armed = True
+            # Started under the lock, so a concurrent stop() either prevents or terminates this process
+            process = None if self._stop_requested else subprocess.Popen(command, stdout=subprocess.DEVNULL,
+                                                                        stderr=subprocess.DEVNULL)
+            self._process = process
+        try:
+            if process is not None:
+                process.wait()
+        finally:
+            with self._lock:
+                interrupted = self._stop_requested
+                self._armed = self._stop_requested = False
+                self._process = None
+        return not interrupted
+
+    def stop(self):
+        """Interrupt the utterance being played (or prepared); does nothing between utterances."""
+        with self._lock:
+            if not self._armed:
+                return
+            self._stop_requested = True
+            if self._process is not None and self._process.poll() is None:
+                self._process.terminate()
+
+
+class SpeechOutputQueue:
+    """
+    Speech Output Queue: Plays utterances on a dedicated worker thread so callers return as soon as audio is
+    queued. The queue is bounded; when it is full, new utterances are dropped (safety announcements instead
+    drop the oldest queued utterance). Safety announcements preempt the utterance being played and are
+    spoken before everything else in the queue.
+    """
+
+    PRIORITIES = ("safety", "normal")  # Highest first
+
+    def __init__(self, sink, max_queue=32):
+        self.sink = sink  # Object with play(path) (blocking), stop() and optionally prepare()
+        self.max_queue = max_queue  # Maximum number of queued utterances
+        self.queues = {priority: deque() for priority in self.PRIORITIES}
+        self.current = None  # (path, priority) being played
+        self._preempting = False  # The current utterance was interrupted by a safety announcement
+        self.counters = {"played": 0, "dropped": 0, "preempted": 0, "failed": 0}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="speech-output", daemon=True)
+        self._worker.start()
+
+    def enqueue(self, path, priority="normal"):
+        """
+        Queue an utterance for playback without waiting for it to play.
+        Args:
+            path (str): Audio file path.
+            priority (str): "safety" to preempt other speech, or "normal".
+
+        Returns:
+            bool: False if the utterance was dropped because the queue is full.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Speech output queue is closed")
+            if len(self) >= self.max_queue:
+                if priority != "safety" or not self.queues["normal"]:
+                    self.counters["dropped"] += 1
+                    return False
+                self.queues["normal"].popleft()
+                self.counters["dropped"] += 1
+            self.queues[priority].append(path)
+            if priority == "safety" and self.current is not None and self.current[1] != "safety" and not self._preempting:
+                self._preempting = True
+                self.sink.stop()
+            self._condition.notify_all()
+            return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not len(self) and not self._closed:
+                    self._condition.wait()
+                if not len(self):
+                    return
+                priority = next(priority for priority in self.PRIORITIES if self.queues[priority])
+                path = self.queues[priority].popleft()
+                self.current = (path, priority)
+                # Armed while holding the queue's lock, so a safety announcement queued from now on interrupts
+                # this utterance even if playback hasn't started yet
+                prepare = getattr(self.sink, "prepare", None)
+                if prepare is not None:
+                    prepare()
+            finished = None
+            try:
+                finished = self.sink.play(path)
+                outcome = "played"
+            except Exception:
+                outcome = "failed"
+            with self._condition:
+                if self._preempting:
+                    # Sinks report whether the utterance finished before the stop reached it
+                    if outcome == "played" and finished is not True:
+                        outcome = "preempted"
+                    self._preempting = False
+                self.current = None
+                self.counters[outcome] += 1
+                self._condition.notify_all()
+
+    def wait_until_idle(self, timeout=None):
+        """
+        Wait until every queued utterance has been played.
+        Args:
+            timeout (float): Maximum seconds to wait (None waits indefinitely).
+
+        Returns:
+            bool: True if the queue is idle.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while len(self) or self.current is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def close(self, drain=True):
+        """
+        Stop the playback worker.
+        Args:
+            drain (bool): Play the queued utterances first; otherwise drop them and stop current playback.
+
+        Returns:
+            None
+        """
+        with self._condition:
+            self._closed = True
+            if not drain:
+                for queue in self.queues.values():
+                    self.counters["dropped"] += len(queue)
+                    queue.clear()
+                self.sink.stop()
+            self._condition.notify_all()
+        self._worker.join()
+
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues.values())
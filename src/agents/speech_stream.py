@@ -0,0 +1,106 @@
+import queue
+import threading
+import time
+
+PHRASE_END = ".!?;:,"  # Punctuation that ends a spoken phrase
+
+
+def segment_phrases(tokens, min_words=3, max_words=12):
+    """
+    Group streamed text chunks into phrases that can be spoken on their own.
+    A phrase ends at punctuation once it has at least min_words words, or after max_words words.
+    Args:
+        tokens (iterable): Text chunks as generated (e.g., words with their leading or trailing spaces).
+        min_words (int): Minimum words before punctuation ends a phrase (avoids choppy speech).
+        max_words (int): Maximum words per phrase.
+
+    Yields:
+        str: Phrases in order.
+    """
+    buffer = ""
+    for token in tokens:
+        buffer += token
+        phrase = buffer.strip()
+        word_count = len(phrase.split())
+        if (phrase and phrase[-1] in PHRASE_END and word_count >= min_words) or word_count >= max_words:
+            yield phrase
+            buffer = ""
+    if buffer.strip():
+        yield buffer.strip()
+
+
+class SpeechStream:
+    """
+    Speech Stream: Speaks text while it is still being generated. Streamed tokens are segmented into phrases on
+    one thread, and a background worker synthesizes and plays each phrase as soon as it is complete, so the
+    first audio starts after the first phrase instead of after the whole response has been generated and
+    synthesized.
+    """
+
+    def __init__(self, tokens, synthesize, play, min_words=3, max_words=12):
+        self.synthesize = synthesize  # Phrase -> audio file path
+        self.play = play  # Plays (or queues) an audio file
+        self.phrases = []  # Phrases in the order they were spoken
+        self.audio_paths = []  # Audio file per phrase
+        self.error = None  # First exception raised by generation or synthesis
+        self.start_time = time.monotonic()
+        self.first_audio_time = None
+        self.end_time = None
+        self._phrase_queue = queue.Queue()
+        self._producer = threading.Thread(target=self._produce, args=(tokens, min_words, max_words), daemon=True)
+        self._speaker = threading.Thread(target=self._speak, daemon=True)
+        self._producer.start()
+        self._speaker.start()
+
+    def _produce(self, tokens, min_words, max_words):
+        try:
+            for phrase in segment_phrases(tokens, min_words, max_words):
+                self._phrase_queue.put(phrase)
+        except Exception as e:
+            self.error = self.error or e
+        finally:
+            self._phrase_queue.put(None)  # End of stream
+
+    def _speak(self):
+        while True:
+            phrase = self._phrase_queue.get()
+            if phrase is None:
+                break
+            if self.error is not None:
+                continue  # Drain the stream without speaking after a failure
+            try:
+                audio_path = self.synthesize(phrase)
+                self.play(audio_path)
+            except Exception as e:
+                self.error = e
+                continue
+            if self.first_audio_time is None:
+                self.first_audio_time = time.monotonic()
+            self.phrases.append(phrase)
+            self.audio_paths.append(audio_path)
+        self.end_time = time.monotonic()
+
+    @property
+    def time_to_first_audio(self):
+        """Seconds from the start of the stream until the first phrase played (None before then)."""
+        return None if self.first_audio_time is None else self.first_audio_time - self.start_time
+
+    def done(self):
+        """Return True once every phrase has been spoken."""
+        return self.end_time is not None
+
+    def wait(self, timeout=None):
+        """
+        Wait until every phrase has been spoken.
+        Args:
+            timeout (float): Maximum seconds to wait (None waits indefinitely).
+
+        Returns:
+            str: Full spoken text.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._producer.join(timeout)
+        self._speaker.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if self.error is not None:
+            raise self.error
+        return " ".join(self.phrases)
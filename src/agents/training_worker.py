@@ -0,0 +1,107 @@
+import threading
+import time
+
+
+class TrainingWorker:
+    """
+    Training Worker: Runs model training jobs on a background thread so learning never blocks task execution.
+    Jobs run one at a time; a job submitted while another is waiting replaces it, since training on the newest
+    data makes the older job redundant. The training function is responsible for publishing its result.
+    """
+
+    def __init__(self, train, name="training-worker", log=None):
+        self.train = train  # Called with each job on the worker thread
+        self.name = name
+        self._owner_log = log  # Owner's log function (e.g., the agent's log), used instead of printing directly
+        self.pending = None  # Job waiting to run
+        self.running = False
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0  # Jobs replaced by a newer job before they ran
+        self.last_error = None
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def log(self, message):
+        """Log messages through the owner, or with the worker's name."""
+        if self._owner_log is not None:
+            self._owner_log(message)
+        else:
+            print(f"[{self.name}] {message}")
+
+    def submit(self, job):
+        """
+        Schedule a training job.
+        Args:
+            job (object): Job passed to the training function (e.g., a snapshot of training data).
+
+        Returns:
+            None
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Training worker is closed")
+            if self.pending is not None:
+                self.coalesced += 1
+            self.pending = job
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self.pending is None and not self._closed:
+                    self._condition.wait()
+                if self.pending is None:
+                    return
+                job, self.pending = self.pending, None
+                self.running = True
+            error = None
+            try:
+                self.train(job)
+            except Exception as e:
+                error = e
+                self.log(f"Training failed: {e!r}")
+            with self._condition:
+                self.running = False
+                if error is None:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                    self.last_error = error
+                self._condition.notify_all()
+
+    def busy(self):
+        """Return True while a job is running or waiting."""
+        with self._condition:
+            return self.running or self.pending is not None
+
+    def wait_until_idle(self, timeout=None):
+        """
+        Wait until no job is running or waiting.
+        Args:
+            timeout (float): Maximum seconds to wait (None waits indefinitely).
+
+        Returns:
+            bool: True if the worker is idle.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self.running or self.pending is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def close(self):
+        """
+        Finish the waiting job and stop the worker thread.
+        Returns:
+            None
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
@@ -0,0 +1,167 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+import wave
+from collections import OrderedDict
+
+
+class GTTSSynthesizer:
+    """Synthesizes speech to MP3 with Google Text-to-Speech; the voice selects the accent (gTTS top-level domain)."""
+
+    suffix = ".mp3"
+
+    def __call__(self, text, lang, voice, path):
+        from gtts import gTTS
+        gTTS(text=text, lang=lang, tld=voice or "com").save(path)
+
+
+class OfflineSynthesizer:
+    """
+    Offline stand-in for a TTS engine (e.g., for tests and robots without network access): writes a WAV tone
+    whose length is proportional to the text, so playback and caching behave like real synthesized speech.
+    """
+
+    suffix = ".wav"
+
+    def __init__(self, sample_rate=8000, seconds_per_character=0.01):
+        self.sample_rate = sample_rate
+        self.seconds_per_character = seconds_per_character
+        self.calls = 0  # Number of utterances synthesized
+
+    def __call__(self, text, lang, voice, path):
+        self.calls += 1
+        frames = int(self.sample_rate * self.seconds_per_character * max(len(text), 1))
+        samples = (int(3000 * math.sin(2 * math.pi * 440 * i / self.sample_rate)) for i in range(frames))
+        with wave.open(path, "wb") as audio:
+            audio.setnchannels(1)
+            audio.setsampwidth(2)
+            audio.setframerate(self.sample_rate)
+            audio.writeframes(b"".join(struct.pack("<h", sample) for sample in samples))
+
+
+class SpeechAudioCache:
+    """
+    Speech Audio Cache: Content-addressed on-disk cache of synthesized speech keyed by (text, language, voice).
+    Robots repeat a small set of utterances, so a repeated utterance is served from disk with near-zero
+    synthesis latency. The cache is bounded in bytes with least-recently-used eviction, survives restarts
+    (its index is rebuilt from the directory) and can be pre-warmed with known phrases.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, synthesizer=None):
+        self.directory = directory  # Holds one audio file per cached utterance
+        self.max_bytes = max_bytes  # Maximum total size of cached audio
+        self.synthesizer = synthesizer or GTTSSynthesizer()  # Callable (text, lang, voice, path) with a file suffix
+        self.entries = OrderedDict()  # File name -> size in bytes, least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._last_touch = 0  # Last file time set (ns), kept strictly increasing to preserve the LRU order
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        # Rebuild the LRU order from file times left by earlier runs (hits refresh them)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(self.synthesizer.suffix):
+                stat = entry.stat()
+                files.append((stat.st_mtime_ns, entry.name, stat.st_size))
+                self._last_touch = max(self._last_touch, stat.st_mtime_ns)
+        for _, file_name, size in sorted(files):
+            self.entries[file_name] = size
+            self.total_bytes += size
+        self._evict()  # The byte budget may be smaller than in earlier runs
+
+    def make_key(self, text, lang="en", voice=None):
+        """
+        Build the content address of an utterance.
+        Args:
+            text (str): Text to speak.
+            lang (str): Language code.
+            voice (str): Voice or accent (None for the default).
+
+        Returns:
+            str: Cache file name.
+        """
+        digest = hashlib.sha256("\0".join((text, lang, voice or "")).encode("utf-8")).hexdigest()
+        return digest + self.synthesizer.suffix
+
+    def get_audio(self, text, lang="en", voice=None):
+        """
+        Get the audio file of an utterance, synthesizing and caching it on a miss.
+        Args:
+            text (str): Text to speak.
+            lang (str): Language code.
+            voice (str): Voice or accent (None for the default).
+
+        Returns:
+            str: Path of the cached audio file.
+        """
+        file_name = self.make_key(text, lang, voice)
+        path = os.path.join(self.directory, file_name)
+        with self._lock:
+            if file_name in self.entries and os.path.exists(path):
+                self.entries.move_to_end(file_name)
+                self.hits += 1
+                self._touch(path)
+                return path
+            self.misses += 1
+        # Synthesize outside the lock and publish atomically, so readers never see a partial file
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            self.synthesizer(text, lang, voice, temp_path)
+            os.replace(temp_path, path)
+            with self._lock:
+                self._touch(path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        with self._lock:
+            self.total_bytes -= self.entries.pop(file_name, 0)
+            self.entries[file_name] = os.path.getsize(path)
+            self.total_bytes += self.entries[file_name]
+            self._evict()
+        return path
+
+    def _touch(self, path):
+        # File times record the recency order across restarts; the clock's resolution may be too coarse to
+        # order back-to-back uses, so times are forced to increase
+        self._last_touch = max(time.time_ns(), self._last_touch + 1)
+        os.utime(path, ns=(self._last_touch, self._last_touch))
+
+    def _evict(self):
+        # The newest entry is never evicted, even if it alone exceeds the budget
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            file_name, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(os.path.join(self.directory, file_name))
+            except FileNotFoundError:
+                pass
+
+    def prewarm(self, phrases, lang="en", voice=None):
+        """
+        Synthesize known phrases ahead of time so their first use is served from the cache.
+        Args:
+            phrases (list): Texts to cache.
+            lang (str): Language code.
+            voice (str): Voice or accent (None for the default).
+
+        Returns:
+            int: Number of phrases that had to be synthesized.
+        """
+        misses = self.misses
+        for phrase in phrases:
+            self.get_audio(phrase, lang, voice)
+        return self.misses - misses
+
+    def contains(self, text, lang="en", voice=None):
+        """Return True if the utterance is cached."""
+        return self.make_key(text, lang, voice) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,249 @@
+import builtins
+import json
+import os
+import threading
+
+import numpy as np
+
+# Types that can appear in journaled tasks (e.g., the expected type of a declared input), by qualified name
+JOURNAL_TYPES = {f"builtins.{name}": value for name, value in vars(builtins).items()
+                 if isinstance(value, type) and not issubclass(value, BaseException)}
+JOURNAL_TYPES["numpy.ndarray"] = np.ndarray
+
+
+def _encode_value(value):
+    # JSON fallback for values found in task details and results
+    if isinstance(value, type):
+        name = f"{value.__module__}.{value.__qualname__}"
+        if JOURNAL_TYPES.get(name) is not value:
+            raise TypeError(f"Type {name} cannot be written to the workflow journal")
+        return {"__type__": name}
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": value.tolist(), "dtype": value.dtype.str, "shape": list(value.shape)}
+    if isinstance(value, np.generic):
+        return value.item()  # NumPy scalars
+    raise TypeError(f"Object of type {type(value).__name__} cannot be written to the workflow journal")
+
+
+def _decode_value(value):
+    if "__type__" in value and len(value) == 1:
+        name = value["__type__"]
+        name = name if "." in name else f"builtins.{name}"
+        if name not in JOURNAL_TYPES:
+            raise ValueError(f"Unknown type '{name}' in the workflow journal")
+        return JOURNAL_TYPES[name]
+    if "__ndarray__" in value:
+        return np.asarray(value["__ndarray__"], dtype=np.dtype(value["dtype"])).reshape(value["shape"])
+    return value
+
+
+class WorkflowJournal:
+    """
+    Workflow Journal: Append-only on-disk log of task state transitions (queued, re-prioritized, completed,
+    failed, skipped) with periodic snapshots, so a restarted process resumes a long mission instead of
+    starting over. Records are appended to an in-memory buffer and written in batches by a background
+    thread, so journaling adds almost no latency per delegated task. Each snapshot truncates the log,
+    and recovery loads the latest snapshot and replays only the records written after it. Task values
+    must be JSON data, NumPy arrays or builtin types; anything else is rejected when it is recorded. A record
+    may list fields it couldn't store as "unrecorded": a completed task without its result is run again on
+    resume, and a queued task without its details can't be resumed.
+    """
+
+    def __init__(self, directory, snapshot_interval=1000, flush_interval=0.05, sync=False):
+        self.directory = directory  # Holds journal.log and snapshot.json
+        self.snapshot_interval = snapshot_interval  # Records between snapshots
+        self.flush_interval = flush_interval  # Maximum seconds a record waits in the buffer
+        self.sync = sync  # fsync every batch (durable across power loss, slower)
+        self.log_path = os.path.join(directory, "journal.log")
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        os.makedirs(directory, exist_ok=True)
+        self.tasks, self.sequence = self.recover()  # Task id -> {"priority", "task", "status", "result"}
+        self.written = self.sequence  # Sequence number of the last record written to disk
+        self.applied = self.sequence  # Sequence number of the last record applied to the task table
+        self.records_since_snapshot = 0
+        self.pending = []  # Records waiting to be written
+        self._condition = threading.Condition()
+        self._io_lock = threading.Lock()  # Serializes file writes, snapshots and reads of the task table
+        self._closed = False
+        self._file = open(self.log_path, "a")
+        self._writer = threading.Thread(target=self._run_writer, name="workflow-journal", daemon=True)
+        self._writer.start()
+
+    def record(self, event, task_id, **fields):
+        """
+        Append a task state transition to the journal; the record is written asynchronously.
+        Args:
+            event (str): "queued", "priority", "completed", "failed", "skipped" or "retired".
+            task_id (str): Id of the task.
+            **fields: Event data ("priority" and "task" for queued tasks, "result" for completed tasks whose output
+                downstream tasks consume, "unrecorded" for the names of fields left out).
+
+        Returns:
+            int: Sequence number of the record.
+        """
+        # Encoded here so unsupported values fail in the caller rather than in the writer thread
+        encoded = json.dumps({"event": event, "id": task_id, **fields}, separators=(",", ":"), default=_encode_value)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Journal is closed")
+            self.sequence += 1
+            record = {"seq": self.sequence, "event": event, "id": task_id, **fields}
+            self.pending.append((record, f'{{"seq":{self.sequence},{encoded[1:]}\n'))
+            self._condition.notify()
+            return self.sequence
+
+    def _run_writer(self):
+        while True:
+            with self._condition:
+                if not self.pending and not self._closed:
+                    self._condition.wait()
+                if self.pending and not self._closed:
+                    # Give concurrent tasks a moment to add to the batch
+                    self._condition.wait(self.flush_interval)
+                batch, self.pending = self.pending, []
+                closed = self._closed
+            if batch:
+                self._write_batch(batch)
+            if closed and not batch:
+                return
+
+    def _write_batch(self, batch):
+        with self._io_lock:
+            self._file.write("".join(line for _, line in batch))
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+            for record, _ in batch:
+                self.apply(self.tasks, record)
+            self.applied = batch[-1][0]["seq"]
+            self.records_since_snapshot += len(batch)
+            if self.records_since_snapshot >= self.snapshot_interval:
+                self._write_snapshot()
+        with self._condition:
+            self.written = batch[-1][0]["seq"]
+            self._condition.notify_all()
+
+    def _write_snapshot(self):
+        # The snapshot is written atomically before the log is truncated; records it already covers are
+        # skipped on replay, so a crash between the two steps is harmless
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"seq": self.applied, "tasks": self.tasks}, f, separators=(",", ":"), default=_encode_value)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self._file.close()
+        self._file = open(self.log_path, "w")
+        self.records_since_snapshot = 0
+
+    @staticmethod
+    def apply(tasks, record):
+        """
+        Apply one journal record to a task state table.
+        Args:
+            tasks (dict): Task id -> task state, updated in place.
+            record (dict): Journal record.
+
+        Returns:
+            None
+        """
+        event, task_id = record["event"], record["id"]
+        unrecorded = record.get("unrecorded", ())
+        if event == "queued":
+            # A task holding a value the journal can't store is queued without its details (and not resumed)
+            tasks[task_id] = {"priority": record.get("priority", 0), "task": record.get("task"), "status": "queued",
+                              "result": None}
+        elif event == "retired":
+            tasks.pop(task_id, None)  # The task's workflow has finished
+        elif task_id not in tasks:
+            return
+        elif event == "priority":
+            tasks[task_id]["priority"] = record["priority"]
+        elif "result" in unrecorded:
+            tasks[task_id]["status"] = "queued"  # Its result is needed downstream but wasn't journaled: run it again
+        else:
+            tasks[task_id]["status"] = event
+            tasks[task_id]["result"] = record.get("result")
+
+    def recover(self):
+        """
+        Rebuild the task state from the latest snapshot and the journal records written after it.
+        Returns:
+            tuple: (task id -> {"priority", "task", "status", "result"}, sequence number of the last record).
+        """
+        tasks, sequence = {}, 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f, object_hook=_decode_value)
+            tasks, sequence = snapshot["tasks"], snapshot["seq"]
+        if os.path.exists(self.log_path):
+            with open(self.log_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line, object_hook=_decode_value)
+                    except json.JSONDecodeError:
+                        break  # Torn final write from a crash
+                    if record["seq"] > sequence:
+                        self.apply(tasks, record)
+                        sequence = record["seq"]
+        return tasks, sequence
+
+    def pending_tasks(self):
+        """
+        Get the recovered tasks that have not completed, in priority order (tasks whose details weren't
+        journaled are left out).
+        Returns:
+            list: (priority, task) pairs.
+        """
+        self.flush()
+        with self._io_lock:
+            entries = [state for state in self.tasks.values() if state["status"] != "completed" and state["task"] is not None]
+        return [(state["priority"], state["task"]) for state in sorted(entries, key=lambda state: state["priority"])]
+
+    def completed_results(self):
+        """
+        Get the journaled results of completed tasks.
+        Returns:
+            dict: Task id -> result.
+        """
+        self.flush()
+        with self._io_lock:
+            return {task_id: state["result"] for task_id, state in self.tasks.items() if state["status"] == "completed"}
+
+    def flush(self, timeout=None):
+        """
+        Wait until every record appended so far is written to disk.
+        Args:
+            timeout (float): Maximum seconds to wait (None waits indefinitely).
+
+        Returns:
+            bool: True if all records were written.
+        """
+        with self._condition:
+            target = self.sequence
+            self._condition.notify()
+            return self._condition.wait_for(lambda: self.written >= target, timeout)
+
+    def snapshot(self):
+        """
+        Write a snapshot now and truncate the journal.
+        Returns:
+            None
+        """
+        self.flush()
+        with self._io_lock:
+            self._write_snapshot()
+
+    def close(self):
+        """
+        Write the remaining records and stop the writer thread.
+        Returns:
+            None
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        self._file.close()
@@ -0,0 +1,55 @@
+"""
+Import-time benchmark: measures startup time and memory of a fresh interpreter importing different
+subsets of the agents package. Run from the `src` directory:
+
+    python -m benchmarks.import_time
+"""
+import os
+import subprocess
+import sys
+
+SCENARIOS = {
+    "motor/planning only": "import agents.motor_control_agent, agents.planning_agent",
+    "central + motor/planning": "from agents import CentralCognitiveAgent, MotorControlAgent, PlanningAgent",
+    "all agents": "import agents; agents.preload()",
+}
+
+PROBE = """
+import resource, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def measure(statement, repeats=3):
+    """
+    Import modules in fresh interpreters and report the best import time and peak memory.
+    Args:
+        statement (str): Import statement to run.
+        repeats (int): Number of fresh interpreters to measure.
+
+    Returns:
+        tuple: (import time in seconds, peak resident memory in MB).
+    """
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement)],
+            cwd=src_dir, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        samples.append((float(output[-2]), int(output[-1]) / 1024))
+    return min(samples)
+
+
+if __name__ == "__main__":
+    print(f"{'scenario':<28}{'import time':>14}{'peak RSS':>12}")
+    for scenario, statement in SCENARIOS.items():
+        try:
+            seconds, megabytes = measure(statement)
+        except subprocess.CalledProcessError as e:
+            print(f"{scenario:<28}{'failed':>14}  {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{scenario:<28}{seconds * 1000:>11.0f} ms{megabytes:>9.0f} MB")
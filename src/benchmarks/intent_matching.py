@@ -0,0 +1,76 @@
+"""
+Intent-matching benchmark: measures how many utterances per second the intent matcher classifies, one
+at a time (match) and as a batch (match_batch, which matches repeated utterances once), compared with the
+previous per-keyword substring scan, on logs of distinct utterances and on replayed chat logs where
+utterances repeat. Per utterance, the matcher runs at about the speed of the substring scan (within
+roughly 20% either way, depending on the machine), but unlike the scan it doesn't misclassify words that
+merely contain a keyword; match_batch is only faster when utterances repeat. Run from the `src` directory:
+
+    python -m benchmarks.intent_matching [utterance count]
+"""
+import random
+import sys
+import time
+
+from agents.intent_matcher import IntentMatcher
+
+WORDS = ["the", "robot", "door", "cup", "please", "table", "kitchen", "now", "again", "today", "that", "was",
+         "what", "how", "why", "do", "perform", "execute", "good", "bad", "suggest", "open", "doing", "window"]
+
+
+def substring_intent(user_input):
+    """Previous intent detection: lowercases per keyword list and scans for substrings."""
+    if any(keyword in user_input.lower() for keyword in ["what", "how", "why"]):
+        return "query"
+    elif any(keyword in user_input.lower() for keyword in ["do", "perform", "execute"]):
+        return "command"
+    elif any(keyword in user_input.lower() for keyword in ["good", "bad", "suggest"]):
+        return "feedback"
+    else:
+        return "unknown"
+
+
+def make_utterances(count, distinct=None, seed=0):
+    """
+    Generate synthetic chat-log utterances.
+    Args:
+        count (int): Number of utterances.
+        distinct (int): Number of distinct utterances to draw from (all distinct if None).
+        seed (int): Random seed.
+
+    Returns:
+        list: Utterances of 4 to 16 words.
+    """
+    rng = random.Random(seed)
+    vocabulary = [" ".join(rng.choices(WORDS, k=rng.randint(4, 16))).capitalize() + "."
+                  for _ in range(distinct or count)]
+    return vocabulary if distinct is None else rng.choices(vocabulary, k=count)
+
+
+def throughput(classify, utterances):
+    """
+    Measure classification throughput.
+    Args:
+        classify (function): Maps a list of utterances to their intents.
+        utterances (list): Utterances to classify.
+
+    Returns:
+        float: Utterances per second.
+    """
+    start = time.perf_counter()
+    classify(utterances)
+    return len(utterances) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    matcher = IntentMatcher()
+    print(f"{'log':<22}{'substring scan':>18}{'match':>18}{'match_batch':>18}{'disagreements':>15}")
+    for log, utterances in (("distinct utterances", make_utterances(count)),
+                            ("replayed chat log", make_utterances(count, distinct=2000))):
+        substring_rate = throughput(lambda texts: [substring_intent(text) for text in texts], utterances)
+        match_rate = throughput(lambda texts: [matcher.match(text) for text in texts], utterances)
+        batch_rate = throughput(matcher.match_batch, utterances)
+        # Disagreements are substring false positives such as "do" inside "door" or "doing"
+        disagreements = sum(substring_intent(text) != intent for text, intent in zip(utterances, matcher.match_batch(utterances)))
+        print(f"{log:<22}{substring_rate:>14,.0f} /s {match_rate:>14,.0f} /s {batch_rate:>14,.0f} /s{disagreements:>15,}")
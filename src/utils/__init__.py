@@ -1,3 +1,6 @@
 from .logger import Logger
+from .clock import RealClock, VirtualClock
+from .indexed_priority_queue import IndexedPriorityQueue
+from .latency_histogram import LatencyHistogram
 
-__all__ = ["Logger"]
+__all__ = ["Logger", "RealClock", "VirtualClock", "IndexedPriorityQueue", "LatencyHistogram"]
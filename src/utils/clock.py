@@ -0,0 +1,146 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+
+class RealClock:
+    """
+    Real-time clock: time follows the system's monotonic clock and sleeps block the calling thread.
+    """
+
+    def now(self):
+        """
+        Get the current time.
+        Returns:
+            float: Current time in seconds.
+        """
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        """
+        Block the calling thread for the given duration.
+        Args:
+            seconds (float): Duration in seconds.
+
+        Returns:
+            None
+        """
+        time.sleep(seconds)
+
+    async def sleep_async(self, seconds):
+        """
+        Suspend the calling coroutine for the given duration without blocking the event loop.
+        Args:
+            seconds (float): Duration in seconds.
+
+        Returns:
+            None
+        """
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Virtual clock for discrete-event simulation: sleeping advances simulated time instantly instead of
+    waiting on the wall clock, so agents still report realistic durations while simulations run at full speed.
+    """
+
+    def __init__(self, start=0.0, settle_passes=8):
+        self.settle_passes = settle_passes  # Idle event-loop passes required before async sleepers are woken
+        self._now = float(start)
+        self._lock = threading.Lock()
+        self._sleepers = []  # Heap of (wake_time, sequence, future) for suspended coroutines
+        self._sequence = itertools.count()
+        self._wakeup_scheduled = False
+        self._activity = 0  # Incremented whenever a sleeper is added, woken or cancelled
+        self._seen_activity = 0
+        self._quiet_passes = 0
+
+    def now(self):
+        """
+        Get the current simulated time.
+        Returns:
+            float: Simulated time in seconds.
+        """
+        with self._lock:
+            return self._now
+
+    def sleep(self, seconds):
+        """
+        Advance simulated time by the given duration without blocking.
+        Args:
+            seconds (float): Duration in seconds.
+
+        Returns:
+            None
+        """
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """
+        Advance simulated time.
+        Args:
+            seconds (float): Duration in seconds (negative values are ignored).
+
+        Returns:
+            float: Simulated time after advancing.
+        """
+        with self._lock:
+            self._now += max(0.0, seconds)
+            return self._now
+
+    async def sleep_async(self, seconds):
+        """
+        Suspend the calling coroutine until simulated time reaches now + seconds.
+        Concurrent coroutines are woken in order of their wake-up times, so simulated time advances
+        to the next pending event rather than by the sum of all sleeps.
+        Args:
+            seconds (float): Duration in seconds.
+
+        Returns:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(self._record_activity)
+        with self._lock:
+            heapq.heappush(self._sleepers, (self._now + max(0.0, seconds), next(self._sequence), future))
+            self._activity += 1
+            schedule = not self._wakeup_scheduled
+            self._wakeup_scheduled = True
+        if schedule:
+            loop.call_soon(self._wake_next, loop)
+        await future
+
+    def _record_activity(self, future):
+        with self._lock:
+            self._activity += 1
+
+    def _wake_next(self, loop):
+        """
+        Advance simulated time to the earliest pending wake-up and resume every coroutine due at that time.
+        Time only advances after `settle_passes` event-loop passes without new sleeps, wake-ups or
+        cancellations, so resumed coroutines can react (e.g., cancel a timed-out stage) first.
+        """
+        due = []
+        with self._lock:
+            if self._activity != self._seen_activity:
+                self._seen_activity = self._activity
+                self._quiet_passes = 0
+            elif self._quiet_passes < self.settle_passes:
+                self._quiet_passes += 1
+            else:
+                while self._sleepers and self._sleepers[0][2].cancelled():
+                    heapq.heappop(self._sleepers)
+                if self._sleepers:
+                    self._now = max(self._now, self._sleepers[0][0])
+                    while self._sleepers and self._sleepers[0][0] <= self._now:
+                        due.append(heapq.heappop(self._sleepers)[2])
+            self._wakeup_scheduled = bool(self._sleepers) or bool(due)
+        for future in due:
+            if not future.done():
+                future.set_result(None)
+        if self._wakeup_scheduled:
+            loop.call_soon(self._wake_next, loop)
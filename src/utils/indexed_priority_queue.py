@@ -0,0 +1,172 @@
+import itertools
+import threading
+
+
+class IndexedPriorityQueue:
+    """
+    Indexed binary min-heap keyed by item id.
+    Supports O(log n) priority updates by key, bulk re-prioritization through a predicate, and keeps
+    FIFO order among equal priorities. Items themselves are never compared, so unorderable items
+    (e.g., task dicts) can share a priority. The put/get/empty interface mirrors queue.PriorityQueue.
+    """
+
+    def __init__(self, key=None):
+        self.key = key or (lambda item: item["id"])  # Extracts the unique key of an item
+        self._heap = []  # Entries [priority, sequence, key, item]
+        self._index = {}  # Key -> position of its entry in the heap
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def put(self, entry):
+        """
+        Add an item, or replace the item and priority of an existing key.
+        Args:
+            entry (tuple): (priority, item) pair.
+
+        Returns:
+            None
+        """
+        priority, item = entry
+        key = self.key(item)
+        with self._lock:
+            if key in self._index:
+                position = self._index[key]
+                self._heap[position][3] = item
+                self._set_priority(position, priority)
+                return
+            self._heap.append([priority, next(self._sequence), key, item])
+            self._index[key] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+
+    def get(self):
+        """
+        Remove and return the item with the lowest priority (oldest first among ties).
+        Returns:
+            tuple: (priority, item) pair.
+        """
+        with self._lock:
+            if not self._heap:
+                raise IndexError("get from an empty priority queue")
+            return self._remove_at(0)
+
+    def update(self, key, priority):
+        """
+        Change the priority of a queued item in O(log n).
+        Args:
+            key (object): Key of the item.
+            priority (int): New priority (lower runs first).
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._set_priority(self._index[key], priority)
+
+    def reprioritize(self, predicate, priority):
+        """
+        Set the priority of every queued item matching a predicate, restoring the heap once.
+        Args:
+            predicate (function): Called with each item; returns True if the item should be updated.
+            priority (int): New priority for matching items.
+
+        Returns:
+            int: Number of items updated.
+        """
+        with self._lock:
+            updated = 0
+            for entry in self._heap:
+                if entry[0] != priority and predicate(entry[3]):
+                    entry[0] = priority
+                    updated += 1
+            if updated:
+                for position in reversed(range(len(self._heap) // 2)):
+                    self._sift_down(position)
+            return updated
+
+    def remove(self, key):
+        """
+        Remove a queued item by key.
+        Args:
+            key (object): Key of the item.
+
+        Returns:
+            tuple: (priority, item) pair of the removed item.
+        """
+        with self._lock:
+            return self._remove_at(self._index[key])
+
+    def priority(self, key):
+        """
+        Get the current priority of a queued item.
+        Args:
+            key (object): Key of the item.
+
+        Returns:
+            int: Priority of the item.
+        """
+        with self._lock:
+            return self._heap[self._index[key]][0]
+
+    def empty(self):
+        """Return True if the queue has no items."""
+        return not self._heap
+
+    def qsize(self):
+        """Return the number of queued items."""
+        return len(self._heap)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def _set_priority(self, position, priority):
+        old_priority = self._heap[position][0]
+        self._heap[position][0] = priority
+        if priority < old_priority:
+            self._sift_up(position)
+        elif priority > old_priority:
+            self._sift_down(position)
+
+    def _remove_at(self, position):
+        last = self._heap.pop()
+        if position < len(self._heap):
+            removed = self._heap[position]
+            self._heap[position] = last
+            self._index[last[2]] = position
+            self._sift_down(position)
+            self._sift_up(self._index[last[2]])
+        else:
+            removed = last
+        del self._index[removed[2]]
+        return removed[0], removed[3]
+
+    def _less(self, a, b):
+        return (a[0], a[1]) < (b[0], b[1])
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._index[heap[i][2]] = i
+        self._index[heap[j][2]] = j
+
+    def _sift_up(self, position):
+        while position > 0:
+            parent = (position - 1) // 2
+            if not self._less(self._heap[position], self._heap[parent]):
+                break
+            self._swap(position, parent)
+            position = parent
+
+    def _sift_down(self, position):
+        size = len(self._heap)
+        while True:
+            smallest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and self._less(self._heap[child], self._heap[smallest]):
+                    smallest = child
+            if smallest == position:
+                return
+            self._swap(position, smallest)
+            position = smallest
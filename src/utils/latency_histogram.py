@@ -0,0 +1,78 @@
+import math
+import threading
+
+import numpy as np
+
+from .clock import RealClock
+
+
+class LatencyHistogram:
+    """
+    Rolling latency histogram with bounded memory.
+    Latencies are counted in logarithmically spaced buckets (a few percent relative error), split into
+    time slots covering a rolling window, so percentiles reflect recent behavior and memory stays constant
+    no matter how many samples are recorded.
+    """
+
+    def __init__(self, min_latency=1e-6, max_latency=100.0, growth=1.05, window=60.0, slots=6, clock=None):
+        self.min_latency = min_latency  # Smallest resolved latency (s); faster samples share the first bucket
+        self.growth = growth  # Ratio between consecutive bucket bounds
+        self.log_growth = math.log(growth)
+        self.bucket_count = int(math.ceil(math.log(max_latency / min_latency) / self.log_growth)) + 1
+        self.slot_duration = window / slots  # Seconds covered by each time slot
+        self.clock = clock or RealClock()
+        self.counts = np.zeros((slots, self.bucket_count), dtype=np.int64)
+        self.current_slot = int(self.clock.now() // self.slot_duration)
+        self._lock = threading.Lock()
+
+    def _rotate(self):
+        slot = int(self.clock.now() // self.slot_duration)
+        if slot != self.current_slot:
+            # Clear slots that have fallen out of the window since the last sample
+            for expired in range(self.current_slot + 1, min(slot, self.current_slot + len(self.counts)) + 1):
+                self.counts[expired % len(self.counts)] = 0
+            self.current_slot = slot
+
+    def record(self, latency):
+        """
+        Record one latency sample.
+        Args:
+            latency (float): Latency in seconds.
+
+        Returns:
+            None
+        """
+        bucket = 0
+        if latency > self.min_latency:
+            bucket = min(int(math.log(latency / self.min_latency) / self.log_growth) + 1, self.bucket_count - 1)
+        with self._lock:
+            self._rotate()
+            self.counts[self.current_slot % len(self.counts), bucket] += 1
+
+    def percentiles(self, quantiles=(50, 95, 99)):
+        """
+        Estimate latency percentiles over the rolling window.
+        Args:
+            quantiles (tuple): Percentiles to compute (0-100).
+
+        Returns:
+            dict: Percentile -> latency in seconds (upper bucket bound), or None without samples.
+        """
+        with self._lock:
+            self._rotate()
+            totals = self.counts.sum(axis=0)
+        cumulative = np.cumsum(totals)
+        count = int(cumulative[-1])
+        if count == 0:
+            return {q: None for q in quantiles}
+        result = {}
+        for q in quantiles:
+            bucket = int(np.searchsorted(cumulative, max(1, math.ceil(count * q / 100.0))))
+            result[q] = self.min_latency * self.growth ** bucket
+        return result
+
+    def count(self):
+        """Return the number of samples in the rolling window."""
+        with self._lock:
+            self._rotate()
+            return int(self.counts.sum())
@@ -1,12 +1,49 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+import agents
 from agents.sensory_agent import SensoryAgent
 from agents.manipulation_agent import ManipulationAgent
+from agents.grasp_cache import GraspPlanCache
+from agents.agent_process import AgentProcessProxy, decode_message, encode_message
 from agents.energy_management_agent import EnergyManagementAgent
 from agents.motor_control_agent import MotorControlAgent
+from agents.communication_agent import CommunicationAgent
+from agents.inference_server import BatchInferenceServer
+from agents.intent_matcher import IntentMatcher
+from agents.learning_agent import LearningAgent
+from agents.model_checkpoint import ModelCheckpointStore
+from agents.replay_buffer import ReplayBuffer
+from agents.reward_evaluation import BanditSampler
+from agents.training_worker import TrainingWorker
+from agents.speech_output import FileAudioSink, NullAudioSink
+from agents.speech_stream import segment_phrases
+from agents.tts_cache import OfflineSynthesizer, SpeechAudioCache
+from utils.clock import VirtualClock
+
+
+def distance_reward(action):
+    """Module-level (picklable) reward function for process pool evaluation."""
+    return -abs(action - 42)
 
 
 class TestAgents(unittest.TestCase):
 
+    def temporary_directory(self):
+        """Create a temporary directory that is removed when the test finishes."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return directory.name
+
     def test_sensory_agent_object_recognition(self):
         sensory_agent = SensoryAgent()
         task_details = {
@@ -27,6 +64,104 @@ class TestAgents(unittest.TestCase):
         result = manipulation_agent.perform_task(task_details)
         self.assertTrue(result)
 
+    def test_manipulation_agent_virtual_clock(self):
+        clock = VirtualClock()
+        manipulation_agent = ManipulationAgent(clock=clock)
+        grasp_config = {"grip_point": [0.5, 0.3, 0.2], "approach_vector": [0, 0, -1]}
+        start = time.monotonic()
+        self.assertTrue(manipulation_agent.execute_grasp(grasp_config))
+        self.assertTrue(manipulation_agent.move_object([1, 2, 0]))
+        self.assertAlmostEqual(clock.now(), 2.5)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_manipulation_agent_concurrent_async_tasks(self):
+        clock = VirtualClock()
+        arms = [ManipulationAgent(name=f"Arm {i}", clock=clock) for i in range(2)]
+        details = {"object": "target", "destination": [1, 2, 0]}
+
+        async def run():
+            handles = [arm.perform_task_async(details) for arm in arms]
+            stages = [event["stage"] async for event in handles[0].events()]
+            return stages, await asyncio.gather(*handles)
+
+        stages, results = asyncio.run(run())
+        self.assertEqual(results, [True, True])
+        self.assertEqual(stages, ["recognizing", "planning", "grasping", "moving", "completed"])
+        self.assertAlmostEqual(clock.now(), 2.5)  # Arms ran concurrently, not back to back
+
+    def test_manipulation_agent_async_timeout_and_cancel(self):
+        clock = VirtualClock()
+        manipulation_agent = ManipulationAgent(clock=clock)
+        details = {"object": "target", "destination": [1, 2, 0]}
+
+        async def run():
+            timed_out = manipulation_agent.perform_task_async(details, timeout=1.2)
+            self.assertFalse(await timed_out)
+            self.assertEqual(timed_out.stage, "timed_out")
+
+            cancelled = manipulation_agent.perform_task_async(details)
+            async for event in cancelled.events():
+                if event["stage"] == "grasping":
+                    cancelled.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await cancelled
+            self.assertEqual(cancelled.stage, "cancelled")
+
+        asyncio.run(run())
+        self.assertAlmostEqual(clock.now(), 1.2)
+
+    def test_manipulation_agent_batch_grasp_planning(self):
+        manipulation_agent = ManipulationAgent()
+        metadata = {"position": [0.5, 0.3, 0.1], "orientation": [0, 0, 90], "dimensions": [0.1, 0.1, 0.2]}
+        single = manipulation_agent.plan_grasp(metadata)
+        orientations = np.array([[0, 0, 90], [np.pi, 0, 0], [0.3, 0.2, 0.0]])
+        ranked = manipulation_agent.plan_grasps_batch(metadata["position"], orientations, metadata["dimensions"], top_k=2)
+
+        self.assertEqual([grasp["index"] for grasp in ranked], [0, 2])  # Index 1 approaches from below
+        self.assertGreater(ranked[0]["score"], ranked[1]["score"])
+        all_grasps = manipulation_agent.plan_grasps_batch(metadata["position"], orientations, metadata["dimensions"], top_k=3)
+        by_index = {grasp["index"]: grasp for grasp in all_grasps}
+        np.testing.assert_allclose(by_index[0]["grip_point"], single["grip_point"])
+        np.testing.assert_allclose(by_index[0]["approach_vector"], single["approach_vector"])
+
+        too_wide = manipulation_agent.plan_grasps_batch([0, 0, 0], [0, 0, 0], [0.5, 0.5, 0.1])
+        self.assertEqual(too_wide[0]["score"], 0.0)
+
+    def test_manipulation_agent_grasp_plan_cache(self):
+        cache = GraspPlanCache(max_size=2)
+        manipulation_agent = ManipulationAgent(grasp_cache=cache)
+        metadata = {"position": [0.5, 0.3, 0.1], "orientation": [0, 0, 0], "dimensions": [0.1, 0.1, 0.2]}
+        planned = manipulation_agent.plan_grasp(metadata, object_type="sku-1")
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        moved = dict(metadata, position=[1.0, 0.0, 0.0], orientation=[np.pi / 2, 0, 0])
+        cached = manipulation_agent.plan_grasp(moved, object_type="sku-1")
+        self.assertEqual(cache.hits, 1)
+        np.testing.assert_allclose(cached["grip_point"], [1.0, -0.1, 0.0], atol=1e-9)
+        np.testing.assert_allclose(cached["approach_vector"], [0.0, 1.0, 0.0], atol=1e-9)
+
+        fresh = ManipulationAgent().plan_grasp(moved)  # A cache hit matches planning from scratch at the new pose
+        np.testing.assert_allclose(cached["grip_point"], fresh["grip_point"], atol=1e-9)
+        np.testing.assert_allclose(cached["approach_vector"], fresh["approach_vector"], atol=1e-9)
+
+        rotated_first = ManipulationAgent(grasp_cache=GraspPlanCache())
+        rotated_first.plan_grasp(moved, object_type="sku-1")
+        hit = rotated_first.plan_grasp(metadata, object_type="sku-1")  # Same result whichever pose was seen first
+        np.testing.assert_allclose(hit["grip_point"], planned["grip_point"], atol=1e-9)
+        np.testing.assert_allclose(hit["approach_vector"], planned["approach_vector"], atol=1e-9)
+
+        manipulation_agent.plan_grasp(dict(metadata, dimensions=[0.2, 0.1, 0.2]), object_type="sku-2")
+        manipulation_agent.plan_grasp(dict(metadata, dimensions=[0.3, 0.1, 0.2]), object_type="sku-3")
+        self.assertEqual(len(cache), 2)  # sku-1 evicted as least recently used
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "grasps.json")
+            cache.save(path)
+            restored = GraspPlanCache(path=path)
+            self.assertEqual(list(restored.entries), list(cache.entries))
+            hit = restored.lookup("sku-3", [0.3, 0.1, 0.2], metadata["position"], np.eye(3))
+            np.testing.assert_allclose(hit["grip_point"], planned["grip_point"])
+
     def test_energy_management_agent_battery_monitoring(self):
         energy_agent = EnergyManagementAgent()
         energy_agent.current_battery_level = 50.0
@@ -43,6 +178,416 @@ class TestAgents(unittest.TestCase):
         result = motor_control_agent.perform_task(task_details)
         self.assertTrue(result)
 
+    def test_motor_control_agent_trajectory_collision_check(self):
+        motor_control_agent = MotorControlAgent()
+        trajectory = [
+            {"position": [1.0, 0.0, 0.0], "orientation": [0, 0, 0]},
+            {"position": [1.0, 1.0, 0.0], "orientation": [0, 0, 0]},
+            {"position": [2.0, 1.0, 0.0], "orientation": [0, 0, 0]},
+        ]
+        obstacles = [[5.0, 5.0, 5.0], [1.02, 0.5, 0.0], [1.5, 1.0, 0.01]]
+        collision = motor_control_agent.check_trajectory_collision(trajectory, obstacles, clearance=0.05)
+        self.assertEqual(collision["segment_index"], 1)
+        self.assertEqual(collision["obstacle"], [1.02, 0.5, 0.0])
+        self.assertIsNone(motor_control_agent.check_trajectory_collision(trajectory, [[5.0, 5.0, 5.0]]))
+
+        task_details = {"task_type": "trajectory", "trajectory": trajectory, "obstacles": obstacles}
+        self.assertFalse(motor_control_agent.perform_task(task_details))
+        self.assertEqual(motor_control_agent.current_position.tolist(), [0.0, 0.0, 0.0])
+
+    def test_agent_process_proxy(self):
+        message = {"points": np.arange(20000, dtype=np.float64).reshape(-1, 4), "label": "scan"}
+        decoded = decode_message(encode_message(message, shared_memory_threshold=1024))
+        np.testing.assert_array_equal(decoded["points"], message["points"])
+        if os.path.isdir("/dev/shm"):
+            blocks_before = set(os.listdir("/dev/shm"))
+            with self.assertRaises(Exception):
+                encode_message([message["points"], lambda: None], shared_memory_threshold=1024)  # Fails after the array
+            self.assertEqual(set(os.listdir("/dev/shm")), blocks_before)  # Its shared memory block was unlinked
+
+        proxy = AgentProcessProxy(SensoryAgent)
+        try:
+            self.assertEqual(proxy.name, "Sensory Agent")
+            lidar_data = np.full((50000, 3), 5.0)
+            lidar_data[:3] = 0.01
+            self.assertEqual(len(proxy.call("detect_obstacles", lidar_data, threshold=0.2)), 3)
+            result = proxy.perform_task({"task_type": "object_recognition", "object_name": "target_object"})
+            self.assertIn("position", result)
+            with self.assertRaises(ValueError):
+                proxy.perform_task({"task_type": "unknown"})
+        finally:
+            proxy.close()
+        self.assertFalse(proxy.process.is_alive())
+
+    def test_lazy_package_imports(self):
+        probe = ("import sys, agents; agents.MotorControlAgent; "
+                 "print(sorted(m for m in ('transformers', 'gtts', 'sklearn', 'agents.learning_agent') if m in sys.modules))")
+        src_dir = os.path.dirname(os.path.dirname(os.path.abspath(agents.__file__)))
+        output = subprocess.run([sys.executable, "-c", probe], cwd=src_dir, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "[]")
+
+    def test_communication_agent_defers_model_loading(self):
+        communication_agent = CommunicationAgent()
+        self.assertIsNone(communication_agent._sentiment_analyzer)
+        communication_agent.sentiment_analyzer = lambda texts, **kwargs: [{"label": "POSITIVE", "score": 0.9} for _ in texts]
+        analysis = communication_agent.analyze_user_input("That was good")
+        self.assertEqual(analysis["intent"], "feedback")
+        self.assertIsNone(communication_agent._text_generator)
+        communication_agent.close()
+
+    def test_inference_server_batches_concurrent_requests(self):
+        batch_sizes = []
+
+        def model(texts, suffix="!"):
+            batch_sizes.append(len(texts))
+            if "fail" in texts:
+                raise ValueError("Simulated inference failure")
+            return [text + suffix for text in texts]
+
+        server = BatchInferenceServer(model, max_batch_size=4, max_wait=0.2, num_threads=2)
+        futures = server.submit_many([f"text {i}" for i in range(6)])
+        questions = server.submit_many(["why", "how"], suffix="?")
+        self.assertEqual([future.result(timeout=5) for future in futures], [f"text {i}!" for i in range(6)])
+        self.assertEqual([future.result(timeout=5) for future in questions], ["why?", "how?"])
+        self.assertEqual(sorted(batch_sizes), [2, 2, 4])  # Requests with different options never share a batch
+        self.assertEqual(server.stats()["mean_batch_size"], 8 / 3)
+        with self.assertRaises(ValueError):
+            server.submit("fail").result(timeout=5)
+        server.close()
+
+    def test_streamed_generation_runs_on_the_inference_server(self):
+        running, overlaps = [], []
+
+        class StreamingGenerator:
+            """Stand-in for the generation pipeline that streams a few words."""
+            tokenizer = None
+
+            def __call__(self, prompts, batch_size, max_length, streamer):
+                overlaps.append(len(running))
+                running.append(prompts)
+                for word in ("I ", "can ", "help."):
+                    time.sleep(0.01)
+                    streamer.on_finalized_text(word)
+                running.remove(prompts)
+                if prompts == ["fail"]:
+                    raise ValueError("Simulated generation failure")
+                streamer.end()
+                return [[{"generated_text": prompt + " I can help."}] for prompt in prompts]
+
+        communication_agent = CommunicationAgent(inference_threads=1)
+        self.addCleanup(communication_agent.close)
+        communication_agent.text_generator = StreamingGenerator()
+        streams = [communication_agent.stream_text(f"Prompt {i}.") for i in range(3)]
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            texts = list(executor.map(lambda stream: "".join(stream), streams))
+        self.assertEqual(texts, [f"Prompt {i}. I can help." for i in range(3)])
+        self.assertEqual(overlaps, [0, 0, 0])  # Streams wait for the server's single inference thread
+        self.assertEqual(communication_agent.inference_server("generation").stats()["items"], 3)
+        with self.assertRaises(ValueError):
+            "".join(communication_agent.stream_text("fail"))
+
+    def test_speech_cache_reuses_audio_and_evicts_least_recently_used(self):
+        directory = self.temporary_directory()
+        synthesizer = OfflineSynthesizer()
+        communication_agent = CommunicationAgent(speech_cache=SpeechAudioCache(directory, synthesizer=synthesizer))
+        self.addCleanup(communication_agent.close)
+        self.assertEqual(communication_agent.prewarm_speech(), len(CommunicationAgent.RESPONSES))
+        path = communication_agent.speech_cache.get_audio(CommunicationAgent.RESPONSES["command"])
+        self.assertEqual(synthesizer.calls, len(CommunicationAgent.RESPONSES))  # Served from the cache
+        self.assertNotEqual(communication_agent.speech_cache.get_audio("Hello", voice="co.uk"),
+                            communication_agent.speech_cache.get_audio("Hello"))
+
+        # Restarted cache keeps its entries and evicts the least recently used audio beyond its byte budget
+        cache = SpeechAudioCache(directory, max_bytes=os.path.getsize(path) * 2, synthesizer=synthesizer)
+        self.assertEqual(len(cache), 3)
+        self.assertTrue(all(cache.contains(*utterance) for utterance in
+                            [(CommunicationAgent.RESPONSES["command"],), ("Hello",), ("Hello", "en", "co.uk")]))
+        self.assertEqual(sorted(os.listdir(directory)), sorted(cache.entries))
+        cache.get_audio("Hello")
+        self.assertEqual((cache.hits, synthesizer.calls), (1, len(CommunicationAgent.RESPONSES) + 2))
+
+    def test_streaming_speech_plays_first_phrase_before_generation_ends(self):
+        self.assertEqual(list(segment_phrases(["Hi, ", "there. ", "I am ", "fetching ", "the ", "cup, ", "now"], min_words=2)),
+                         ["Hi, there.", "I am fetching the cup,", "now"])
+
+        def slow_tokens():
+            for token in ["Hello, ", "I ", "will ", "help. ", "The ", "cup ", "is ", "on ", "the ", "table."]:
+                time.sleep(0.02)
+                yield token
+
+        played = []
+        communication_agent = CommunicationAgent(speech_cache=SpeechAudioCache(self.temporary_directory(), synthesizer=OfflineSynthesizer()))
+        self.addCleanup(communication_agent.close)
+        communication_agent.play_audio = played.append
+        stream = communication_agent.speak_streaming(slow_tokens())
+        self.assertEqual(stream.wait(timeout=5), "Hello, I will help. The cup is on the table.")
+        self.assertEqual(len(played), 2)
+        self.assertLess(stream.time_to_first_audio, (stream.end_time - stream.start_time) * 0.75)
+
+    def test_intent_matcher_matches_whole_words_and_phrases(self):
+        communication_agent = CommunicationAgent()
+        self.assertEqual(communication_agent.detect_intents(["Open the door", "What should I do?", "That was GOOD", "Execute, please"]),
+                         ["unknown", "query", "feedback", "command"])
+        matcher = IntentMatcher({"greeting": ("hello", "good morning"), "farewell": ("good bye",), "praise": ("good", "thank you")},
+                                default_intent="chat")
+        self.assertEqual(matcher.match_batch(["Good morning, robot", "very good", "Thank you, good bye!", "thank", "very good"]),
+                         ["greeting", "praise", "farewell", "chat", "praise"])
+        distinct = [f"good morning {i}" for i in range(300)] + ["thank you", "good morning 1"]  # Matched without memoizing
+        self.assertEqual(matcher.match_batch(distinct), [matcher.match(text) for text in distinct])
+        # Contractions contain their keyword as a whole word
+        self.assertEqual(communication_agent.detect_intents(["What's the time?", "How's it going", "Why's that", "Don't stop"]),
+                         ["query", "query", "query", "unknown"])
+        self.assertEqual(matcher.match("Good-bye!"), "farewell")
+
+    def test_speech_output_queue_preempts_for_safety_announcements(self):
+        stale = NullAudioSink()
+        stale.stop()  # Nothing is playing, so the next utterance isn't interrupted
+        self.assertTrue(stale.play("first.wav"))
+        stale.prepare()
+        stale.stop()  # Issued after the next utterance was chosen but before it started
+        self.assertFalse(stale.play("second.wav"))
+        self.assertEqual((stale.played, stale.stopped), (["first.wav"], ["second.wav"]))
+
+        sink = NullAudioSink(realtime=True)
+        communication_agent = CommunicationAgent(speech_cache=SpeechAudioCache(self.temporary_directory(), synthesizer=OfflineSynthesizer()),
+                                                 audio_sink=sink, max_speech_queue=2)
+        start = time.monotonic()
+        long_audio = communication_agent.text_to_speech("This is a long response that takes a while to say. " * 3)
+        self.assertLess(time.monotonic() - start, 0.5)  # Returns once the utterance is queued
+        while communication_agent.speech_output.current is None:
+            time.sleep(0.01)
+        queued = [communication_agent.text_to_speech(f"Queued response {i}.") for i in range(2)]
+        self.assertFalse(communication_agent.play_audio(long_audio))  # Queue full
+        warning = communication_agent.announce_safety("Stand clear.")
+        self.assertTrue(communication_agent.speech_output.wait_until_idle(timeout=10))
+
+        self.assertEqual(sink.stopped, [long_audio])
+        self.assertEqual(sink.played, [warning, queued[1]])  # The safety announcement dropped the oldest queued response
+        self.assertEqual(communication_agent.speech_output.counters, {"played": 2, "dropped": 2, "preempted": 1, "failed": 0})
+        communication_agent.close()
+
+        directory = self.temporary_directory()
+        file_sink = FileAudioSink(directory)
+        communication_agent = CommunicationAgent(speech_cache=SpeechAudioCache(self.temporary_directory(), synthesizer=OfflineSynthesizer()),
+                                                 audio_sink=file_sink)
+        communication_agent.text_to_speech("Hello.")
+        communication_agent.close()
+        self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_learning_agent_updates_model_incrementally(self):
+        clock = VirtualClock()
+        learning_agent = LearningAgent(retrain_every=20, retrain_interval=60, window=40, trees_per_update=5, max_trees=15, clock=clock,
+                                       background_training=False)
+        rng = np.random.default_rng(0)
+        for features in rng.random((100, 5)):
+            learning_agent.update_task_model(features.tolist(), 2 * features[0])
+        self.assertEqual(learning_agent.training_count, 5)
+        self.assertEqual(len(learning_agent.task_model.estimators_), 15)  # Oldest trees retired
+
+        learning_agent.update_task_model([0.5] * 5, 1.0)
+        self.assertEqual(learning_agent.training_count, 5)
+        clock.advance(60)
+        learning_agent.update_task_model([0.5] * 5, 1.0)
+        self.assertEqual(learning_agent.training_count, 6)  # Retrained on schedule
+        self.assertAlmostEqual(learning_agent.task_model.predict([[0.5] * 5])[0], 1.0, delta=0.3)
+
+        # Training waits for min_samples even when retrain_every is smaller, then follows retrain_every
+        learning_agent = LearningAgent(retrain_every=5, min_samples=20, background_training=False)
+        offline_agent = LearningAgent(online=False, min_samples=20, background_training=False)
+        for i, features in enumerate(rng.random((19, 5)).tolist()):
+            learning_agent.update_task_model(features, i)
+            offline_agent.update_task_model(features, i)
+        self.assertEqual((learning_agent.training_count, offline_agent.training_count), (0, 0))
+        learning_agent.update_task_model([0.5] * 5, 1.0)
+        offline_agent.update_task_model([0.5] * 5, 1.0)
+        self.assertEqual((learning_agent.training_count, offline_agent.training_count), (1, 1))
+        for features in rng.random((5, 5)).tolist():
+            learning_agent.update_task_model(features, 1.0)
+        self.assertEqual(learning_agent.training_count, 2)
+
+    def test_replay_buffer_stays_bounded_and_persists(self):
+        path = self.temporary_directory()
+        ring = ReplayBuffer(capacity=4, path=path)
+        ring.add_batch(np.arange(12).reshape(6, 2), np.arange(6), rewards=np.arange(6) * 0.5)
+        recent = ring.recent()
+        self.assertEqual(recent["outcomes"].tolist(), [2, 3, 4, 5])  # Oldest samples overwritten
+        self.assertEqual(recent["features"][-1].tolist(), [10, 11])
+        self.assertEqual(ring.sample(16)["features"].shape, (16, 2))
+        ring.flush()
+        reopened = ReplayBuffer(path=path)
+        self.assertEqual((len(reopened), reopened.seen), (4, 6))
+        self.assertEqual(reopened.recent(2)["rewards"].tolist(), [2.0, 2.5])
+
+        path = self.temporary_directory()
+        learning_agent = LearningAgent(replay_buffer=ReplayBuffer(capacity=100, path=path), background_training=False)
+        self.addCleanup(learning_agent.close)
+        for i in range(30):
+            learning_agent.update_task_model([i] * 5, i)
+        self.assertEqual(len(ReplayBuffer(path=path)), 11)  # After a crash: flushed when the first training was requested
+        learning_agent.close()
+        self.assertEqual(len(ReplayBuffer(path=path)), 30)
+        os.remove(os.path.join(path, "state.json"))
+        with self.assertRaises(FileExistsError):  # Rather than overwriting columns it can't read
+            ReplayBuffer(path=path)
+
+        reservoir = ReplayBuffer(capacity=100, policy="reservoir", seed=0)
+        reservoir.add_batch(np.arange(10000.0)[:, None], np.arange(10000.0))
+        self.assertEqual(len(reservoir), 100)
+        self.assertGreater(reservoir.recent()["outcomes"].mean(), 2500)  # A sample of the whole stream, not its start
+        self.assertEqual(reservoir.recent(3)["sequence"].tolist(), sorted(reservoir.recent(3)["sequence"].tolist()))
+
+        learning_agent = LearningAgent(replay_buffer=ReplayBuffer(capacity=20))
+        self.addCleanup(learning_agent.close)  # Stops its training worker
+        for i in range(30):
+            learning_agent.update_task_model([i] * 5, i, reward=1.0 if i % 2 else None)
+        self.assertEqual(len(learning_agent.replay_buffer), 20)
+        self.assertEqual(len(learning_agent.reward_history), 10)
+        self.assertEqual(learning_agent.evaluate_performance(), 1.0)
+
+    def test_learning_agent_trains_in_background_and_publishes_versions(self):
+        learning_agent = LearningAgent(retrain_every=10, window=50, trees_per_update=5)
+        self.addCleanup(learning_agent.close)
+        initial_model = learning_agent.task_model
+        self.assertIsNone(learning_agent.predict_task_outcome([0.5] * 5))
+        rng = np.random.default_rng(1)
+        for features in rng.random((30, 5)):
+            learning_agent.update_task_model(features.tolist(), 2 * features[0])
+            learning_agent.predict_task_outcome([0.5] * 5)  # Inference never waits for training
+        self.assertTrue(learning_agent.wait_for_training(timeout=30))
+
+        metrics = learning_agent.training_metrics()
+        self.assertEqual(metrics["model_version"], metrics["trainings"])
+        self.assertGreaterEqual(metrics["model_version"], 1)
+        self.assertLessEqual(metrics["model_version"], 3)  # Requests made while training are coalesced
+        self.assertFalse(metrics["training_in_progress"])
+        self.assertGreater(metrics["last_duration"], 0)
+        self.assertFalse(hasattr(initial_model, "estimators_"))  # New versions are trained on a copy, then swapped in
+        self.assertAlmostEqual(learning_agent.predict_task_outcome([0.5] * 5), 1.0, delta=0.4)
+
+        # A model trained from a model that was replaced meanwhile (e.g., by loading a checkpoint) is discarded
+        published = learning_agent.task_model
+        self.assertIsNone(learning_agent.publish_model(initial_model, 0.1, trained_from=initial_model))
+        self.assertIs(learning_agent.task_model, published)
+
+        messages = []
+        worker = TrainingWorker(lambda job: 1 / job, log=messages.append)
+        self.addCleanup(worker.close)
+        worker.submit(0)
+        self.assertTrue(worker.wait_until_idle(timeout=5))
+        self.assertEqual((worker.completed, worker.failed), (0, 1))
+        self.assertIsInstance(worker.last_error, ZeroDivisionError)
+        self.assertEqual(len(messages), 1)  # Failures are logged through the owner
+
+    def test_learning_agent_evaluates_rewards_in_batches(self):
+        learning_agent = LearningAgent(reward_workers=2)
+        self.addCleanup(learning_agent.close)
+        actions = np.arange(1000.0)
+        calls = []
+        vectorized_reward = lambda batch: calls.append(len(batch)) or -np.abs(batch - 42)
+        self.assertEqual(learning_agent.reinforcement_learning(actions, vectorized_reward, vectorized=True), 42)
+        self.assertEqual(calls, [1000])  # One call for the whole action space
+
+        self.assertEqual(learning_agent.reinforcement_learning(list(range(100)), distance_reward, deterministic=True), 42)
+        learning_agent.reinforcement_learning(list(range(100)), distance_reward, deterministic=True)
+        evaluator = learning_agent.reward_evaluator(distance_reward, deterministic=True)
+        self.assertEqual((evaluator.misses, evaluator.hits), (100, 100))  # Second decision served from memoized rewards
+
+        noisy_reward = lambda action: float(action == 7) + np.random.normal(0, 0.1)
+        learning_agent.reward_evaluations = 0
+        for strategy in ("ucb", "thompson"):
+            self.assertEqual(learning_agent.reinforcement_learning(list(range(10)), noisy_reward, budget=60, strategy=strategy), 7)
+        self.assertEqual(learning_agent.reward_evaluations, 120)
+
+        self.assertIsNotNone(learning_agent._reward_pool)  # Module-level functions ran in the pool
+        self.assertNotEqual(learning_agent._reward_pool._mp_context.get_start_method(), "fork")  # Workers don't inherit threads' locks
+        self.assertEqual(learning_agent._picklable_functions, {distance_reward: True, noisy_reward: False})
+        with self.assertRaises(ValueError):
+            learning_agent.reinforcement_learning(list(range(10)), noisy_reward, budget=0)
+        with self.assertRaises(ValueError):
+            BanditSampler(10).best()  # Nothing evaluated: no best action rather than action 0 with reward -inf
+
+    def test_learning_agent_checkpoints_and_warm_starts_models(self):
+        path = self.temporary_directory()
+        learning_agent = LearningAgent(retrain_every=50, trees_per_update=50, max_trees=200, background_training=False,
+                                       checkpoint_dir=path, keep_checkpoints=2)
+        self.addCleanup(learning_agent.close)
+        rng = np.random.default_rng(2)
+        for features in rng.random((150, 5)):
+            learning_agent.update_task_model(features.tolist(), 2 * features[0])
+        self.assertEqual(learning_agent.checkpoints.versions(), [2, 3])  # Older checkpoints pruned
+        samples = rng.random((20, 5))
+        expected = learning_agent.task_model.predict(samples)
+
+        start_time = time.perf_counter()
+        restarted = LearningAgent(trees_per_update=50, max_trees=200, background_training=False, checkpoint_dir=path)
+        self.addCleanup(restarted.close)
+        self.assertLess(time.perf_counter() - start_time, 1.0)
+        self.assertEqual((restarted.model_version, restarted.checkpoint_version), (3, 3))
+        np.testing.assert_allclose(restarted.task_model.predict(samples), expected)  # Served from the memory-mapped checkpoint
+        self.assertAlmostEqual(restarted.predict_task_outcome([0.5] * 5), 1.0, delta=0.3)
+
+        source_model = learning_agent.task_model
+        source_trees = list(source_model.estimators_)
+        adapted = learning_agent.transfer_learning(source_model, [(features.tolist(), features[1]) for features in samples])
+        self.assertIsNot(adapted, source_model)
+        self.assertEqual(source_model.estimators_, source_trees)  # Source model not refitted in place
+        adapted = restarted.transfer_learning(restarted.task_model, [(features.tolist(), features[1]) for features in samples])
+        self.assertEqual(len(adapted.estimators_), 200)  # Checkpointed trees plus trees fitted on the new task
+        np.testing.assert_allclose(restarted.task_model.predict(samples), expected)
+
+        for features in rng.random((50, 5)):
+            restarted.update_task_model(features.tolist(), 2 * features[0])
+        self.assertEqual(len(restarted.task_model.estimators_), 200)  # Training continues from the checkpointed trees
+        self.assertEqual(restarted.checkpoints.latest_version(), 5)  # Two more trainings, each checkpointed
+
+    def test_model_checkpoints_survive_concurrent_writers_and_sklearn_upgrades(self):
+        model = RandomForestRegressor(n_estimators=5, random_state=0).fit(np.random.default_rng(3).random((50, 5)), np.arange(50.0))
+        store = ModelCheckpointStore(self.temporary_directory(), keep=None)
+        # Writers that see the same latest version each get their own
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            versions = list(executor.map(lambda _: store.save(model), range(8)))
+        self.assertEqual(sorted(versions), list(range(1, 9)))
+        self.assertEqual([store.manifest(version)["version"] for version in store.versions()], list(range(1, 9)))
+        self.assertEqual([name for name in os.listdir(store.directory) if name.endswith(".tmp")], [])
+
+        with self.assertRaises(ValueError):
+            ModelCheckpointStore(store.directory, keep=0)
+        ModelCheckpointStore(store.directory, keep=1).save(model)
+        self.assertEqual(store.versions(), [9])
+
+        # Checkpoints saved by another scikit-learn version
+        manifest_path = os.path.join(store.path(9), "manifest.json")
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        with open(manifest_path, "w") as f:
+            json.dump(dict(manifest, sklearn_version="0.0"), f)
+        samples = np.random.default_rng(4).random((10, 5))
+        agent = LearningAgent(trees_per_update=5, background_training=False, checkpoint_dir=store.directory)
+        self.addCleanup(agent.close)
+        self.assertFalse(agent.task_model.rebuildable)
+        np.testing.assert_allclose(agent.task_model.predict(samples), model.predict(samples))  # Still serves predictions
+        with self.assertRaises(ValueError):
+            agent.task_model.to_estimator()
+        adapted = agent.transfer_learning(agent.task_model, [(features.tolist(), 1.0) for features in samples])
+        self.assertEqual(len(adapted.estimators_), 5)  # Trained on the new task alone
+        for features in samples:
+            agent.update_task_model(features.tolist(), 2 * features[0])
+        agent.update_task_model([0.5] * 5, 1.0)
+        self.assertEqual(len(agent.task_model.estimators_), 5)  # Retrained from scratch rather than rebuilt
+        self.assertEqual(agent.checkpoint_version, 10)
+
+        store.save(LinearRegression().fit(samples, samples[:, 0]))
+        manifest_path = os.path.join(store.path(11), "manifest.json")
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        with open(manifest_path, "w") as f:
+            json.dump(dict(manifest, sklearn_version="0.0"), f)
+        with self.assertRaises(ValueError):
+            store.load()
+        agent = LearningAgent(background_training=False, checkpoint_dir=store.directory)  # Starts untrained instead of failing
+        self.addCleanup(agent.close)
+        self.assertIsNone(agent.predict_task_outcome([0.5] * 5))
+
 
 if __name__ == "__main__":
     unittest.main()
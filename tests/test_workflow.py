@@ -1,19 +1,73 @@
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
+import numpy as np
 from agents.central_cognitive_agent import CentralCognitiveAgent
+from agents.admission_control import AdmissionController
+from agents.command_parser import CommandParser
+from agents.fleet_coordinator import FleetCoordinator
 from agents.sensory_agent import SensoryAgent
+from agents.workflow_journal import WorkflowJournal
 from agents.manipulation_agent import ManipulationAgent
 from agents.energy_management_agent import EnergyManagementAgent
 from agents.motor_control_agent import MotorControlAgent
+from utils.clock import VirtualClock
+from utils.indexed_priority_queue import IndexedPriorityQueue
+from utils.latency_histogram import LatencyHistogram
+
+
+class RecordingAgent:
+    """Test agent that records when each task ran."""
+
+    def __init__(self, intervals, duration=0.2, fail=False, result=True):
+        self.intervals = intervals
+        self.duration = duration
+        self.fail = fail
+        self.result = result
+        self.received = None
+
+    def perform_task(self, details):
+        self.received = details
+        start = time.monotonic()
+        time.sleep(self.duration)
+        self.intervals[details["task_type"]] = (start, time.monotonic())
+        if self.fail:
+            raise ValueError("Simulated failure")
+        return self.result
+
+
+def mobile_robot_agents():
+    return {"motor_control": MotorControlAgent(), "energy": EnergyManagementAgent()}
+
+
+def broken_robot_agents():
+    raise RuntimeError("Simulated driver failure")
+
+
+class StalledMotorControlAgent(MotorControlAgent):
+    """Motor control agent that never finishes a task."""
+
+    def perform_task(self, details):
+        time.sleep(600)
+
+
+def stalled_robot_agents():
+    return {"motor_control": StalledMotorControlAgent()}
 
 
 class TestWorkflow(unittest.TestCase):
 
     def setUp(self):
         # Create central agent and register other agents
-        self.central_agent = CentralCognitiveAgent()
+        # Run the workflow in virtual time so simulated motion and charging don't block the tests
+        self.clock = VirtualClock()
+        self.central_agent = CentralCognitiveAgent(clock=self.clock)
         self.sensory_agent = SensoryAgent()
-        self.manipulation_agent = ManipulationAgent()
-        self.energy_agent = EnergyManagementAgent()
+        self.manipulation_agent = ManipulationAgent(clock=self.clock)
+        self.energy_agent = EnergyManagementAgent(clock=self.clock)
         self.motor_control_agent = MotorControlAgent()
 
         self.central_agent.register_agent("sensory", self.sensory_agent)
@@ -40,6 +94,394 @@ class TestWorkflow(unittest.TestCase):
         # Assert that the battery was charged after execution
         self.assertGreaterEqual(self.energy_agent.current_battery_level, 100.0)
 
+    def test_fetch_workflow_runs_independent_tasks_concurrently(self):
+        intervals = {}
+        central_agent = CentralCognitiveAgent()
+        central_agent.register_agent("sensory", RecordingAgent(intervals, result={"position": [0.5, 0.3, 0.1]}))
+        central_agent.register_agent("planning", RecordingAgent(intervals, result=[(0, 0), (1, 2)]))
+        for agent_type in ("manipulation", "motor_control"):
+            central_agent.register_agent(agent_type, RecordingAgent(intervals))
+
+        central_agent.parse_command("fetch the target object to [1, 2, 0]")
+        statuses = central_agent.execute_workflow()
+
+        self.assertEqual(set(statuses.values()), {"completed"})
+        recognition, path_planning = intervals["object_recognition"], intervals["path_planning"]
+        self.assertLess(path_planning[0], recognition[1])  # Independent stages overlapped
+        self.assertGreaterEqual(intervals["grasping"][0], recognition[1])
+        self.assertGreaterEqual(intervals["movement"][0], max(path_planning[1], intervals["grasping"][1]))
+
+    def test_failed_task_skips_dependents(self):
+        intervals = {}
+        central_agent = CentralCognitiveAgent()
+        central_agent.register_agent("sensory", RecordingAgent(intervals, duration=0, fail=True))
+        for agent_type in ("planning", "manipulation", "motor_control"):
+            central_agent.register_agent(agent_type, RecordingAgent(intervals, duration=0))
+
+        central_agent.parse_command("fetch the target object to [1, 2, 0]")
+        statuses = central_agent.execute_workflow()
+
+        self.assertEqual(sorted(statuses.values()), ["completed", "failed", "skipped", "skipped"])
+        self.assertNotIn("grasping", intervals)
+
+    def test_task_returning_false_fails_and_skips_dependents(self):
+        intervals = {}
+        central_agent = CentralCognitiveAgent()
+        central_agent.register_agent("sensory", RecordingAgent(intervals, duration=0, result={"position": [0.5, 0.3, 0.1]}))
+        central_agent.register_agent("planning", RecordingAgent(intervals, duration=0, result=[(0, 0), (1, 2)]))
+        central_agent.register_agent("manipulation", RecordingAgent(intervals, duration=0, result=False))  # Failed grasp
+        central_agent.register_agent("motor_control", RecordingAgent(intervals, duration=0))
+
+        central_agent.parse_command("fetch the target object to [1, 2, 0]")
+        statuses = central_agent.execute_workflow()
+
+        grasp_id = next(task_id for task_id in statuses if task_id.startswith("grasp"))
+        move_id = next(task_id for task_id in statuses if task_id.startswith("move"))
+        self.assertEqual((statuses[grasp_id], statuses[move_id]), ("failed", "skipped"))
+        self.assertNotIn("movement", intervals)
+        self.assertNotIn(grasp_id, central_agent.blackboard)  # The failed result is not passed downstream
+
+    def test_task_outputs_flow_to_downstream_tasks(self):
+        intervals = {}
+        object_metadata = {"position": [0.5, 0.3, 0.1], "point_cloud": np.zeros((10000, 3))}
+        path = [(0, 0), (1, 1), (1, 2)]
+        agents = {
+            "sensory": RecordingAgent(intervals, duration=0, result=object_metadata),
+            "planning": RecordingAgent(intervals, duration=0, result=path),
+            "manipulation": RecordingAgent(intervals, duration=0),
+            "motor_control": RecordingAgent(intervals, duration=0),
+        }
+        central_agent = CentralCognitiveAgent()
+        for agent_type, agent in agents.items():
+            central_agent.register_agent(agent_type, agent)
+
+        central_agent.parse_command("fetch the target object to [1, 2, 0]")
+        central_agent.execute_workflow()
+
+        # Outputs are passed by reference, not copied
+        self.assertIs(agents["manipulation"].received["object_metadata"], object_metadata)
+        self.assertIs(agents["motor_control"].received["path"], path)
+        self.assertEqual(agents["motor_control"].received["destination"], [1, 2, 0])
+
+    def test_fetch_workflow_with_simulated_agents(self):
+        planning_agent = RecordingAgent({}, duration=0, result=[(0, 0), (1, 1)])
+        self.central_agent.register_agent("planning", planning_agent)
+        self.central_agent.parse_command("fetch the target object to [1, 2, 0]")
+        statuses = self.central_agent.execute_workflow()
+
+        self.assertEqual(set(statuses.values()), {"completed"})
+        recognize_id = next(task_id for task_id in statuses if task_id.startswith("recognize"))
+        recognized = self.central_agent.blackboard.outputs[recognize_id]
+        self.assertIn("dimensions", recognized)
+        self.assertEqual(self.motor_control_agent.current_position.tolist(), [1, 2, 0])
+
+    def test_indexed_priority_queue_updates_and_ties(self):
+        queue = IndexedPriorityQueue()
+        for task_id, priority in [("a", 2), ("b", 1), ("c", 2), ("d", 3), ("e", 2)]:
+            queue.put((priority, {"id": task_id, "details": {}}))
+        queue.update("d", 0)
+        queue.update("b", 5)
+        self.assertEqual(queue.reprioritize(lambda task: task["id"] in ("c", "e"), 1), 2)
+        queue.remove("a")
+
+        order = [queue.get()[1]["id"] for _ in range(len(queue))]
+        self.assertEqual(order, ["d", "c", "e", "b"])  # Equal priorities stay in insertion order
+        self.assertTrue(queue.empty())
+
+    def test_critical_tasks_are_prioritized(self):
+        central_agent = CentralCognitiveAgent()
+        central_agent.enqueue_task(3, {"type": "manipulation", "details": {"object_name": "box"}})
+        critical_id = central_agent.enqueue_task(5, {"type": "manipulation", "details": {"object_name": "Critical vial"}})
+        central_agent.prioritize_tasks()
+        self.assertEqual(central_agent.task_queue.priority(critical_id), 0)
+        self.assertEqual(central_agent.task_queue.get()[1]["id"], critical_id)
+
+    def test_command_parser_extracts_intent_object_and_coordinates(self):
+        parser = CommandParser()
+        commands = [
+            "Fetch the target object and deliver it to the location [1, 1, 0].",
+            "Move to position [2, 2.5].",
+            "Please pick up the red cup.",
+            "Dance!",
+            "Fetch the target object and deliver it to the location [1, 1, 0].",
+        ]
+        parsed = parser.parse_commands(commands)
+        self.assertEqual(parsed[0], {"intent": "fetch", "verb": "fetch", "object": "target_object", "destination": [1, 1, 0]})
+        self.assertEqual(parsed[1], {"intent": "move", "verb": "move", "object": None, "destination": [2, 2.5, 0]})
+        self.assertEqual((parsed[2]["verb"], parsed[2]["object"]), ("pick up", "red_cup"))
+        self.assertEqual(parsed[3]["intent"], "unknown")
+        self.assertEqual(parser.cache_info().hits, 1)
+
+        parsed[0]["destination"].append(99)  # Cached results are not shared with callers
+        self.assertEqual(parser.parse(commands[0])["destination"], [1, 1, 0])
+
+    def test_fetch_command_uses_extracted_destination(self):
+        task_ids = self.central_agent.parse_command("Fetch the target object and deliver it to the location [1, 1, 0].")
+        tasks = {}
+        while not self.central_agent.task_queue.empty():
+            task = self.central_agent.task_queue.get()[1]
+            tasks[task["id"]] = task
+        self.assertEqual(list(tasks), task_ids)
+        self.assertEqual(tasks[task_ids[3]]["details"]["destination"], [1, 1, 0])
+        self.assertEqual(tasks[task_ids[0]]["details"]["object_name"], "target_object")
+
+    def test_fleet_coordinator_assigns_commands_by_proximity_and_load(self):
+        fleet = FleetCoordinator()
+        fleet.add_robot("r1", mobile_robot_agents, position=[0, 0, 0])
+        fleet.add_robot("r2", mobile_robot_agents, position=[10, 10, 0], battery_level=80.0)
+        try:
+            self.assertTrue(fleet.wait_for_robots(timeout=60))
+            status = fleet.robot_status()  # Startup reports confirm the initial state instead of resetting it
+            self.assertEqual(status["r2"]["position"], [10.0, 10.0, 0.0])
+            self.assertEqual(status["r2"]["battery_level"], 80.0)
+            self.assertEqual(fleet.select_robot([9, 9, 0]), 1)
+
+            near_r2 = fleet.submit("Move to position [9, 9, 0].")
+            near_r1 = fleet.submit("Move to position [1, 0, 0].")
+            self.assertTrue(fleet.wait_for_jobs(timeout=60))
+            self.assertEqual(fleet.results[near_r2]["robot_id"], "r2")
+            self.assertEqual(fleet.results[near_r1]["robot_id"], "r1")
+            self.assertEqual(set(fleet.results[near_r1]["statuses"].values()), {"completed"})
+
+            status = fleet.robot_status()
+            self.assertEqual(status["r2"]["position"], [9.0, 9.0, 0.0])
+            self.assertLess(status["r1"]["battery_level"], 100.0)
+            self.assertEqual(status["r1"]["load"], 0)
+
+            fleet.loads[:] = [0, 30]  # A heavily loaded robot loses even nearby commands
+            self.assertEqual(fleet.select_robot([9, 9, 0]), 0)
+        finally:
+            fleet.shutdown()
+
+    def test_fleet_coordinator_stops_routing_to_robots_whose_worker_exits(self):
+        fleet = FleetCoordinator(poll_interval=0.05)
+        fleet.add_robot("r1", mobile_robot_agents, position=[0, 0, 0])
+        fleet.add_robot("r2", broken_robot_agents, position=[10, 10, 0])
+        fleet.add_robot("r3", stalled_robot_agents, position=[20, 20, 0])
+        try:
+            self.assertFalse(fleet.wait_for_robots(timeout=60))  # Returns once r2's worker exits, not on timeout
+            self.assertEqual(fleet.failed_robots, {"r2"})
+            self.assertFalse(fleet.robot_status()["r2"]["running"])
+            self.assertEqual(fleet.select_robot([10, 10, 0]), 0)  # r2 is never selected again
+
+            stalled = fleet.submit("Move to position [20, 20, 0].")
+            self.assertEqual(fleet.job_robots[stalled], "r3")
+            fleet.workers["r3"].terminate()
+            self.assertTrue(fleet.wait_for_jobs(timeout=30))  # The job fails with its robot instead of blocking
+            self.assertIn("error", fleet.results[stalled]["statuses"])
+            self.assertEqual(fleet.failed_robots, {"r2", "r3"})
+            self.assertEqual(fleet.robot_status()["r3"]["load"], 0)
+
+            completed = fleet.submit("Move to position [19, 19, 0].")
+            self.assertTrue(fleet.wait_for_jobs(timeout=60))
+            self.assertEqual(fleet.results[completed]["robot_id"], "r1")
+        finally:
+            fleet.shutdown()
+
+    def test_latency_histogram_percentiles_over_rolling_window(self):
+        clock = VirtualClock()
+        histogram = LatencyHistogram(window=10.0, slots=5, clock=clock)
+        for ms in range(1, 101):
+            histogram.record(ms / 1000)
+        percentiles = histogram.percentiles()
+        self.assertAlmostEqual(percentiles[50], 0.050, delta=0.050 * 0.05)
+        self.assertAlmostEqual(percentiles[99], 0.099, delta=0.099 * 0.05)
+        clock.advance(12.0)
+        self.assertEqual(histogram.count(), 0)
+
+    def test_health_monitor_degrades_slow_agent_and_routes_around_it(self):
+        order = []
+
+        class ClockAgent:
+            def __init__(self, label, duration):
+                self.label, self.duration = label, duration
+
+            def perform_task(self, details):
+                order.append(self.label)
+                self.clock.advance(self.duration)
+                return True
+
+        clock = VirtualClock()
+        central_agent = CentralCognitiveAgent(clock=clock)
+        for agent_type, duration in (("planning", 45.0), ("sensory", 0.01)):
+            agent = ClockAgent(agent_type, duration)
+            agent.clock = clock
+            central_agent.register_agent(agent_type, agent)
+
+        central_agent.enqueue_task(1, {"type": "planning", "details": {}})
+        central_agent.execute_workflow()
+        report = central_agent.monitor_agents()
+        self.assertEqual(report["planning"]["status"], "degraded")
+        self.assertEqual(report["planning"]["completed"], 1)
+        self.assertAlmostEqual(report["planning"]["p50"], 45.0, delta=45.0 * 0.05)
+        self.assertEqual(report["sensory"]["status"], "healthy")
+
+        order.clear()
+        central_agent.enqueue_task(1, {"type": "planning", "details": {}})
+        central_agent.enqueue_task(2, {"type": "sensory", "details": {}})
+        central_agent.execute_workflow()
+        self.assertEqual(order, ["sensory", "planning"])  # The degraded agent's task waited
+
+    def test_admission_control_policies_and_rate_limits(self):
+        clock = VirtualClock()
+        rejecting = AdmissionController(max_queue=2, policy="reject", clock=clock)
+        outcomes = [rejecting.offer(f"move to [{i}, 0, 0]") for i in range(3)]
+        self.assertEqual(outcomes, ["admitted", "admitted", "rejected"])
+
+        shedding = AdmissionController(max_queue=2, policy="drop_oldest", clock=clock)
+        outcomes = [shedding.offer(f"move to [{i}, 0, 0]") for i in range(3)]
+        self.assertEqual(outcomes, ["admitted", "admitted", "admitted"])  # The stale command makes room
+        self.assertEqual((shedding.metrics()["dropped"], shedding.metrics()["rejected"]), (1, 0))
+        self.assertEqual([shedding.take()[0] for _ in range(2)], ["move to [1, 0, 0]", "move to [2, 0, 0]"])
+
+        dropping = AdmissionController(max_queue=2, policy="drop_oldest", clock=clock)
+        dropping.offer("move to [1, 0, 0]", "background")
+        dropping.offer("move to [2, 0, 0]")
+        dropping.offer("move to [3, 0, 0]", "critical")
+        clock.advance(0.5)
+        self.assertEqual(dropping.take(), ("move to [3, 0, 0]", "critical"))
+        self.assertEqual(dropping.take(), ("move to [2, 0, 0]", "normal"))
+        self.assertIsNone(dropping.take())
+        metrics = dropping.metrics()
+        self.assertEqual((metrics["dropped"], metrics["max_depth"]), (1, 2))
+        self.assertAlmostEqual(metrics["wait_p50"], 0.5, delta=0.5 * 0.05)
+
+        full = AdmissionController(max_queue=2, policy="drop_oldest", clock=clock, rate_limits={"normal": (1.0, 2)})
+        full.offer("scan 1", "background")
+        full.offer("move to [1, 0, 0]", "critical")
+        self.assertEqual(full.offer("move to [2, 0, 0]"), "admitted")  # Displaces the lower-priority command
+        self.assertEqual(full.offer("scan 2", "background"), "rejected")  # Higher priority is never displaced
+        self.assertEqual(full.offer("move to [3, 0, 0]"), "admitted")  # Displaces the older command of its class
+        self.assertEqual(full.offer("move to [4, 0, 0]"), "rate_limited")  # Nothing dropped without a token
+        self.assertEqual([full.take()[0] for _ in range(2)], ["move to [1, 0, 0]", "move to [3, 0, 0]"])
+        full.offer("move to [5, 0, 0]", "critical")
+        full.offer("move to [6, 0, 0]", "critical")
+        clock.advance(1.0)
+        self.assertEqual(full.offer("move to [7, 0, 0]"), "rejected")  # Only critical commands queued; no token spent
+        full.take()
+        self.assertEqual(full.offer("move to [7, 0, 0]"), "admitted")  # The token the rejection didn't spend
+        metrics = full.metrics()
+        self.assertEqual((metrics["dropped"], metrics["rejected"], metrics["rate_limited"]), (2, 2, 1))
+
+        coalescing = AdmissionController(max_queue=10, policy="coalesce", clock=clock,
+                                         rate_limits={"background": (1.0, 2)})
+        self.assertEqual(coalescing.offer("Fetch the cup"), "admitted")
+        self.assertEqual(coalescing.offer("fetch  the cup"), "coalesced")
+        self.assertEqual([coalescing.offer(f"scan {i}", "background") for i in range(3)],
+                         ["admitted", "admitted", "rate_limited"])
+        clock.advance(1.0)
+        self.assertEqual(coalescing.offer("scan 3", "background"), "admitted")
+        self.assertEqual(len(coalescing), 4)
+
+    def test_commands_pass_admission_before_execution(self):
+        self.central_agent.admission = AdmissionController(max_queue=1, clock=self.clock)
+        self.assertEqual(self.central_agent.submit_command("Move to position [1, 0, 0]."), "admitted")
+        self.assertEqual(self.central_agent.submit_command("Move to position [2, 0, 0]."), "rejected")
+        self.assertEqual(self.central_agent.process_commands(), 1)
+        self.assertEqual(self.motor_control_agent.current_position.tolist(), [1, 0, 0])
+        self.assertTrue(self.central_agent.perform_task("Move to position [2, 0, 0]."))
+        self.assertEqual(self.motor_control_agent.current_position.tolist(), [2, 0, 0])
+
+    def test_workflow_resumes_from_journal_after_restart(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        directory = temp_dir.name
+        intervals = {}
+        journal = WorkflowJournal(directory, flush_interval=0)
+        central_agent = CentralCognitiveAgent(journal=journal)
+        recognize_id, path_id, grasp_id, move_id = central_agent.parse_command("fetch the target object to [1, 2, 0]")
+        journal.snapshot()
+        # Recognition and path planning finish, then the process stops before grasping
+        central_agent.journal_event("completed", recognize_id, result={"position": np.array([0.5, 0.3, 0.1])})
+        central_agent.journal_event("completed", path_id, result=[(0, 0), (1, 1)])
+        journal.close()
+        with open(os.path.join(directory, "journal.log")) as f:
+            self.assertEqual(len(f.readlines()), 2)  # Only the tail after the snapshot is replayed
+
+        restarted = CentralCognitiveAgent(journal=WorkflowJournal(directory))
+        agents = {agent_type: RecordingAgent(intervals, duration=0) for agent_type in ("sensory", "planning", "manipulation", "motor_control")}
+        for agent_type, agent in agents.items():
+            restarted.register_agent(agent_type, agent)
+        statuses = restarted.resume_workflow()
+
+        self.assertEqual(statuses, {grasp_id: "completed", move_id: "completed"})
+        self.assertEqual(set(intervals), {"grasping", "movement"})
+        position = agents["manipulation"].received["object_metadata"]["position"]
+        self.assertIsInstance(position, np.ndarray)  # Arrays are restored as arrays
+        np.testing.assert_array_equal(position, [0.5, 0.3, 0.1])
+        self.assertEqual(agents["motor_control"].received["path"], [[0, 0], [1, 1]])
+        self.assertNotIn(move_id, restarted.parse_command("move to [1, 0, 0]"))
+        restarted.journal.close()
+        with open(os.path.join(directory, "journal.log")) as f:
+            completed = {record["id"]: record for record in map(json.loads, f) if record["event"] == "completed"}
+        self.assertIn("result", completed[path_id])
+        self.assertNotIn("result", completed[grasp_id])  # No downstream input consumes the grasp result
+        reopened = WorkflowJournal(directory)
+        self.assertEqual([task["details"]["destination"] for _, task in reopened.pending_tasks()], [[1, 0, 0]])
+        reopened.close()
+
+    def test_results_the_journal_cannot_store_do_not_abort_the_workflow(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        intervals = {}
+        journal = WorkflowJournal(temp_dir.name, flush_interval=0)
+        self.addCleanup(journal.close)
+        central_agent = CentralCognitiveAgent(journal=journal)
+        handle = threading.Lock()  # e.g., a driver handle returned by the perception stack
+        agents = {
+            "sensory": RecordingAgent(intervals, duration=0, result={"position": [0.5, 0.3, 0.1], "handle": handle}),
+            "planning": RecordingAgent(intervals, duration=0, result=[(0, 0), (1, 2)]),
+            "manipulation": RecordingAgent(intervals, duration=0),
+            "motor_control": RecordingAgent(intervals, duration=0),
+        }
+        for agent_type, agent in agents.items():
+            central_agent.register_agent(agent_type, agent)
+
+        recognize_id, _, grasp_id, _ = central_agent.parse_command("fetch the target object to [1, 2, 0]")
+        statuses = central_agent.execute_workflow()
+
+        self.assertEqual(list(statuses.values()), ["completed"] * 4)
+        self.assertIs(agents["manipulation"].received["object_metadata"]["handle"], handle)
+        self.assertEqual(journal.pending_tasks(), [])  # Every task retired
+        journal.flush()
+        with open(journal.log_path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertIn({"event": "completed", "id": recognize_id, "unrecorded": ["result"]},
+                      [{key: value for key, value in record.items() if key != "seq"} for record in records])
+
+        # Interrupted before the grasp: recognition runs again on resume, as its result wasn't journaled
+        interrupted_id = central_agent.parse_command("fetch the target object to [2, 2, 0]")[0]
+        central_agent.journal_event("completed", interrupted_id, result={"handle": handle})
+        journal.close()
+        reopened = WorkflowJournal(temp_dir.name)
+        self.assertIn(interrupted_id, [task["id"] for _, task in reopened.pending_tasks()])
+        self.assertEqual(reopened.completed_results(), {})
+        reopened.close()
+
+    def test_journal_restores_arrays_and_types_and_rejects_unknown_values(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        journal = WorkflowJournal(temp_dir.name, flush_interval=0)
+        task = {"id": "scan-1", "type": "sensory",
+                "details": {"points": np.zeros((0, 3), dtype=np.float32), "threshold": np.float64(0.2)},
+                "inputs": {"cloud": {"from": "capture-1", "type": np.ndarray}}}
+        journal.record("queued", "scan-1", priority=1, task=task)
+        with self.assertRaises(TypeError):
+            journal.record("queued", "scan-2", priority=1, task={"details": {"agent": object()}})
+        journal.close()
+
+        reopened = WorkflowJournal(temp_dir.name)
+        [(_, restored)] = reopened.pending_tasks()
+        reopened.close()
+        self.assertEqual(restored["details"]["points"].dtype, np.float32)
+        self.assertEqual(restored["details"]["points"].shape, (0, 3))
+        self.assertIs(restored["inputs"]["cloud"]["type"], np.ndarray)
+
+        with open(os.path.join(temp_dir.name, "journal.log"), "a") as f:
+            f.write('{"seq":9,"event":"queued","id":"x","priority":1,"task":{"type":{"__type__":"os.PathLike"}}}\n')
+        with self.assertRaisesRegex(ValueError, "Unknown type"):
+            WorkflowJournal(temp_dir.name)
+
 
 if __name__ == "__main__":
     unittest.main()